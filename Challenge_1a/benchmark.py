@@ -0,0 +1,276 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\benchmark.py
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import fitz # PyMuPDF
+from utils.logger import setup_logger
+from utils.heading_classifier import HeadingClassifier
+from utils.layout_cascade import LayoutCascade
+from utils.line_cache import LineCache
+from utils.metrics import STAGES, DocumentMetrics
+from process_pdfs import analyze_pdf, write_output
+from json_schema import build_validator, load_schema
+
+logger = setup_logger()
+
+# Metrics where a larger value is a regression, and those where a smaller one is
+HIGHER_IS_WORSE = ["p50_latency_s", "p99_latency_s"]
+LOWER_IS_WORSE = ["docs_per_sec", "lines_per_sec"]
+
+WORDS = (
+    "the of and to in data system process review model document report section "
+    "results analysis method value library digital service plan access budget "
+    "training project quality board content support network evaluation research"
+).split()
+
+HEADING_STYLES = {
+    "H1": (20, "hebo"),
+    "H2": (16, "hebo"),
+    "H3": (13, "hebo"),
+}
+BODY_STYLE = (10, "helv")
+
+
+def generate_synthetic_pdf(pdf_path, pages, heading_density, seed=0):
+    """
+    Writes a synthetic PDF with known headings, fully offline.
+
+    Each page holds body-text lines in a 10pt regular font; a heading_density
+    fraction of lines are instead H1/H2/H3 headings in larger bold fonts.
+    """
+    rng = random.Random(seed)
+    fonts = {name: fitz.Font(name) for name in ("helv", "hebo")}
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page() # A4
+        writer = fitz.TextWriter(page.rect)
+        y = 60
+        if page_index == 0:
+            writer.append((50, y), "Synthetic Benchmark Document Title", font=fonts["hebo"], fontsize=24)
+            y += 40
+        while y < page.rect.height - 60:
+            if rng.random() < heading_density:
+                level = rng.choice(["H1", "H2", "H3"])
+                fontsize, fontname = HEADING_STYLES[level]
+                text = f"{rng.randint(1, 20)}. " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+                y += 8
+            else:
+                fontsize, fontname = BODY_STYLE
+                text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+            writer.append((50, y), text, font=fonts[fontname], fontsize=fontsize)
+            y += fontsize + 4
+        writer.write_text(page)
+    doc.save(pdf_path, garbage=3, deflate=True)
+    doc.close()
+
+
+def build_synthetic_corpus(corpus_dir, page_counts, densities):
+    """Generates any missing synthetic PDFs and returns all of their paths."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = []
+    for pages in page_counts:
+        for density in densities:
+            pdf_path = os.path.join(corpus_dir, f"synthetic_p{pages}_d{int(density * 100):02d}.pdf")
+            if not os.path.exists(pdf_path):
+                logger.info(f"Generating {pdf_path}")
+                generate_synthetic_pdf(pdf_path, pages, density, seed=pages * 1000 + int(density * 100))
+            paths.append(pdf_path)
+    return paths
+
+
+class RssSampler:
+    """
+    Tracks the peak resident set size while a stage runs.
+
+    Samples /proc/self/statm from a background thread; where that is not
+    available, falls back to the process-wide ru_maxrss high-water mark.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._use_proc = os.path.exists("/proc/self/statm")
+
+    def _current(self):
+        if self._use_proc:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self._current())
+
+    def __enter__(self):
+        self.peak_bytes = self._current()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._current())
+        return False
+
+
+def benchmark_document(pdf_path, classifier, schema, output_dir, cascade=False):
+    """
+    Processes one PDF the way main.py does and returns its stage seconds and peak RSS.
+
+    The document goes through analyze_pdf, which extracts, classifies and
+    builds the outline page by page, so stage times come from its
+    DocumentMetrics and the peak RSS covers the whole document.
+    """
+    metrics = DocumentMetrics(os.path.basename(pdf_path))
+    with RssSampler() as sampler:
+        start = time.perf_counter()
+        result = analyze_pdf(pdf_path, classifier, schema, LayoutCascade() if cascade else None, metrics)
+        with metrics.stage("write"):
+            write_output(result, pdf_path, output_dir)
+        latency = time.perf_counter() - start
+
+    return {
+        "pdf": os.path.basename(pdf_path),
+        "lines": metrics.counters.get("lines", 0),
+        "headings": len(result["outline"]),
+        "latency_s": latency,
+        "stage_s": {stage: metrics.stages.get(stage, 0.0) for stage in STAGES},
+        "peak_rss_mb": sampler.peak_bytes / (1024 * 1024),
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(documents):
+    latencies = [doc["latency_s"] for doc in documents]
+    total_time = sum(latencies)
+    total_lines = sum(doc["lines"] for doc in documents)
+    return {
+        "documents": len(documents),
+        "lines": total_lines,
+        "total_s": total_time,
+        "docs_per_sec": len(documents) / total_time if total_time else 0.0,
+        "lines_per_sec": total_lines / total_time if total_time else 0.0,
+        "p50_latency_s": percentile(latencies, 50),
+        "p99_latency_s": percentile(latencies, 99),
+        "stage_s": {stage: sum(doc["stage_s"][stage] for doc in documents) for stage in STAGES},
+        "peak_rss_mb": max(doc["peak_rss_mb"] for doc in documents),
+    }
+
+
+def compare_to_baseline(summary, baseline, tolerance):
+    """
+    Returns a list of regressions of summary against a stored baseline.
+
+    A metric regresses when it is worse than the baseline by more than the
+    given fraction (e.g. 0.2 = 20%). Peak RSS counts as higher-is-worse.
+    """
+    regressions = []
+    for key in HIGHER_IS_WORSE:
+        if baseline.get(key) and summary[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {summary[key]:.4f} vs baseline {baseline[key]:.4f}")
+    for key in LOWER_IS_WORSE:
+        if baseline.get(key) and summary[key] < baseline[key] * (1 - tolerance):
+            regressions.append(f"{key}: {summary[key]:.4f} vs baseline {baseline[key]:.4f}")
+    base = baseline.get("peak_rss_mb")
+    if base and summary["peak_rss_mb"] > base * (1 + tolerance):
+        regressions.append(f"peak RSS: {summary['peak_rss_mb']:.1f} MB vs baseline {base:.1f} MB")
+    return regressions
+
+
+def print_summary(summary):
+    print(f"Documents: {summary['documents']}  Lines: {summary['lines']}  Total: {summary['total_s']:.2f}s")
+    print(f"Throughput: {summary['docs_per_sec']:.2f} docs/s, {summary['lines_per_sec']:.0f} lines/s")
+    print(f"Latency per document: p50 {summary['p50_latency_s'] * 1000:.1f} ms, p99 {summary['p99_latency_s'] * 1000:.1f} ms")
+    print(f"Peak RSS: {summary['peak_rss_mb']:.1f} MB")
+    print(f"{'stage':<10}{'time (s)':>12}{'share':>9}")
+    for stage in STAGES:
+        seconds = summary["stage_s"][stage]
+        share = seconds / summary["total_s"] if summary["total_s"] else 0.0
+        print(f"{stage:<10}{seconds:>12.3f}{share:>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF outline pipeline on synthetic and sample PDFs.")
+    parser.add_argument("--model_path", type=str, default="minilm_model/minilm_headings.onnx", help="Path to the ONNX model file.")
+    parser.add_argument("--tokenizer_path", type=str, default="minilm_tokenizer", help="Path to the tokenizer directory.")
+    parser.add_argument("--schema", type=str, default="sample_dataset/schema/outputschema.json", help="JSON schema used for the validate stage.")
+    parser.add_argument("--sample_dir", type=str, default="sample_dataset/pdfs", help="Real PDFs benchmarked alongside the synthetic corpus.")
+    parser.add_argument("--corpus_dir", type=str, default="benchmarks/synthetic", help="Where synthetic PDFs are generated (reused across runs).")
+    parser.add_argument("--pages", type=str, default="1,10,100,2000", help="Comma-separated page counts of the synthetic PDFs.")
+    parser.add_argument("--densities", type=str, default="0.05,0.3", help="Comma-separated fractions of heading lines in the synthetic PDFs.")
+    parser.add_argument("--baseline", type=str, default="benchmarks/baseline.json", help="Baseline summary to compare against.")
+    parser.add_argument("--save_baseline", action="store_true", help="Store this run's summary as the new baseline instead of comparing.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression against the baseline (default: 0.2 = 20%%).")
+    parser.add_argument("--line_cache_size", type=int, default=100000, help="Entries in the LRU cache of line classifications, as in main.py (0 disables it).")
+    parser.add_argument("--cascade", action="store_true", help="Label obvious body text from layout features before the model, as main.py --cascade.")
+    parser.add_argument("--report", type=str, help="Write the full per-document report to this JSON file (optional).")
+    args = parser.parse_args()
+
+    page_counts = [int(value) for value in args.pages.split(",") if value]
+    densities = [float(value) for value in args.densities.split(",") if value]
+    pdf_paths = build_synthetic_corpus(args.corpus_dir, page_counts, densities)
+    if os.path.isdir(args.sample_dir):
+        pdf_paths += sorted(os.path.join(args.sample_dir, f) for f in os.listdir(args.sample_dir) if f.lower().endswith(".pdf"))
+
+    line_cache = LineCache(args.line_cache_size) if args.line_cache_size > 0 else None
+    classifier = HeadingClassifier(args.model_path, args.tokenizer_path, line_cache=line_cache)
+    schema = build_validator(load_schema(args.schema)) if args.schema and os.path.exists(args.schema) else None
+
+    documents = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for pdf_path in pdf_paths:
+            documents.append(benchmark_document(pdf_path, classifier, schema, output_dir, args.cascade))
+
+    summary = summarize(documents)
+    print_summary(summary)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "documents": documents}, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logger.warning(f"No baseline at {args.baseline}; run with --save_baseline to create one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(summary, baseline, args.tolerance)
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    if regressions:
+        return 1
+    logger.info("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
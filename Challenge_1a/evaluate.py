@@ -0,0 +1,281 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\evaluate.py
+
+import time
+# Measured before the heavy imports below so a configuration's startup time includes them
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from utils.logger import setup_logger
+from utils.heading_classifier import HeadingClassifier
+from utils.layout_cascade import LayoutCascade
+from utils.onnx_session import resolve_model_path
+from utils.rules import configure_rules
+from process_pdfs import analyze_pdf
+
+logger = setup_logger()
+
+# Options each configuration feature turns on; a configuration is features joined by '+', e.g. "int8+cascade"
+FEATURES = {
+    "int8": {"model_mode": "int8"},
+    "cascade": {"cascade": True},
+    "layout_index": {"layout_index": True},
+    "fast_start": {"fast_start": True},
+    "title_only": {"title_only": True},
+}
+DEFAULT_CONFIGS = "default,cascade,layout_index"
+
+# Scores gated against the reference configuration and the stored baseline
+SCORES = ["title_accuracy", "heading_precision", "heading_recall", "heading_f1", "level_accuracy"]
+TITLE_SCORES = ["title_accuracy"]
+
+
+def parse_config(name):
+    """Returns the options of a configuration name such as "default" or "int8+cascade"."""
+    options = {"model_mode": "fp32", "cascade": False, "layout_index": False, "fast_start": False, "title_only": False}
+    if name == "default":
+        return options
+    for feature in name.split("+"):
+        if feature not in FEATURES:
+            raise ValueError(f"Unknown feature '{feature}' in configuration '{name}' (known: {', '.join(FEATURES)})")
+        options.update(FEATURES[feature])
+    return options
+
+
+def normalize(text):
+    """Case- and whitespace-insensitive form used to compare titles and heading texts."""
+    return " ".join(text.split()).casefold()
+
+
+def _page(entry):
+    # Reference files use "page", process_pdfs writes "page_no"
+    return entry.get("page", entry.get("page_no"))
+
+
+def score_document(result, reference, page_tolerance=1):
+    """
+    Compares one result with its reference output.
+
+    A predicted heading matches a reference heading with the same normalized
+    text on a page at most page_tolerance away (the reference files are not
+    consistent about 0- or 1-based pages); each reference heading matches at
+    most once, in outline order.
+
+    Returns:
+        dict: title_match, predicted/reference/matched heading counts and
+        level_matched (matches that also have the right level).
+    """
+    unmatched = {}
+    for entry in reference.get("outline", []):
+        unmatched.setdefault(normalize(entry["text"]), []).append(entry)
+    matched = level_matched = 0
+    for entry in result.get("outline", []):
+        candidates = unmatched.get(normalize(entry["text"]), [])
+        for i, candidate in enumerate(candidates):
+            pages = (_page(candidate), _page(entry))
+            if None in pages or abs(pages[0] - pages[1]) <= page_tolerance:
+                matched += 1
+                level_matched += candidate["level"] == entry["level"]
+                del candidates[i]
+                break
+    return {
+        "title_match": normalize(result.get("title", "")) == normalize(reference.get("title", "")),
+        "predicted": len(result.get("outline", [])),
+        "reference": len(reference.get("outline", [])),
+        "matched": matched,
+        "level_matched": level_matched,
+    }
+
+
+def aggregate(documents):
+    """Micro-averages document scores over the corpus."""
+    predicted = sum(doc["predicted"] for doc in documents)
+    reference = sum(doc["reference"] for doc in documents)
+    matched = sum(doc["matched"] for doc in documents)
+    precision = matched / predicted if predicted else 0.0
+    recall = matched / reference if reference else 1.0
+    return {
+        "title_accuracy": sum(doc["title_match"] for doc in documents) / len(documents) if documents else 0.0,
+        "heading_precision": precision,
+        "heading_recall": recall,
+        "heading_f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "level_accuracy": sum(doc["level_matched"] for doc in documents) / matched if matched else 0.0,
+    }
+
+
+def evaluate_config(name, pdf_paths, reference_dir, model_path, tokenizer_path, page_tolerance=1, started=None):
+    """
+    Runs one configuration over pdf_paths and returns its scores and timings.
+
+    startup_s is measured from started (e.g. the process start, so imports
+    count) to the classifier being ready; without it, from the call.
+    """
+    options = parse_config(name)
+    init_start = time.perf_counter()
+    classifier = HeadingClassifier(resolve_model_path(model_path, options["model_mode"]), tokenizer_path,
+                                   fast_start=options["fast_start"])
+    startup_s = time.perf_counter() - (started if started is not None else init_start)
+
+    documents = []
+    total_s = 0.0
+    for pdf_path in pdf_paths:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        with open(os.path.join(reference_dir, f"{stem}.json"), "r", encoding="utf-8") as f:
+            reference = json.load(f)
+        start = time.perf_counter()
+        result = analyze_pdf(pdf_path, classifier, cascade=LayoutCascade() if options["cascade"] else None,
+                             title_only=options["title_only"], layout_index=options["layout_index"])
+        seconds = time.perf_counter() - start
+        total_s += seconds
+        documents.append({"pdf": os.path.basename(pdf_path), "latency_s": seconds,
+                          **score_document(result, reference, page_tolerance)})
+
+    scores = aggregate(documents)
+    if options["title_only"]:
+        # No outline is produced, so only the title can be judged
+        scores = {key: scores[key] for key in TITLE_SCORES}
+    return {
+        "config": name,
+        "scores": scores,
+        "startup_s": startup_s,
+        "total_s": total_s,
+        "docs_per_sec": len(documents) / total_s if total_s else 0.0,
+        "documents": documents,
+    }
+
+
+def find_pdfs(pdf_dir, reference_dir):
+    """Returns (PDFs in pdf_dir with a reference output, PDFs without one), both sorted."""
+    pdf_paths = sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.lower().endswith(".pdf"))
+    missing = [path for path in pdf_paths
+               if not os.path.exists(os.path.join(reference_dir, os.path.splitext(os.path.basename(path))[0] + ".json"))]
+    return [path for path in pdf_paths if path not in missing], missing
+
+
+def run_config_subprocess(name, args):
+    """
+    Runs evaluate_config for one configuration in a fresh Python process and returns its run.
+
+    Every configuration then pays for its own imports and warm-up, so their
+    startup and total times compare fairly (e.g. fast_start never importing
+    transformers), whatever order they run in.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "run.json")
+        command = [sys.executable, os.path.abspath(__file__), "--run_config", name, "--run_output", output,
+                   "--pdf_dir", args.pdf_dir, "--reference_dir", args.reference_dir,
+                   "--model_path", args.model_path, "--tokenizer_path", args.tokenizer_path,
+                   "--page_tolerance", str(args.page_tolerance)]
+        if args.rules_config:
+            command += ["--rules_config", args.rules_config]
+        completed = subprocess.run(command)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Configuration '{name}' failed with exit code {completed.returncode}")
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def find_drops(scores, reference_scores, tolerance, against):
+    """Returns a message for every score more than tolerance (absolute) below reference_scores."""
+    drops = []
+    for key in SCORES:
+        if key in scores and key in reference_scores and scores[key] < reference_scores[key] - tolerance:
+            drops.append(f"{key} {scores[key]:.3f} vs {reference_scores[key]:.3f} ({against})")
+    return drops
+
+
+def print_table(runs):
+    print(f"{'config':<24}{'title':>7}{'prec':>7}{'recall':>8}{'F1':>7}{'level':>7}{'startup s':>11}{'total s':>9}{'docs/s':>8}")
+    for run in runs:
+        scores = run["scores"]
+        cells = "".join(f"{scores[key]:>{width}.3f}" if key in scores else f"{'-':>{width}}"
+                        for key, width in zip(SCORES, (7, 7, 8, 7, 7)))
+        print(f"{run['config']:<24}{cells}{run['startup_s']:>11.2f}{run['total_s']:>9.2f}{run['docs_per_sec']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score outline accuracy and runtime of pipeline configurations against reference outputs.")
+    parser.add_argument("--pdf_dir", type=str, default="sample_dataset/pdfs", help="PDFs to evaluate.")
+    parser.add_argument("--reference_dir", type=str, default="sample_dataset/outputs", help="Expected outputs, one <name>.json per PDF.")
+    parser.add_argument("--model_path", type=str, default="minilm_model/minilm_headings.onnx", help="Path to the ONNX model file.")
+    parser.add_argument("--tokenizer_path", type=str, default="minilm_tokenizer", help="Path to the tokenizer directory.")
+    parser.add_argument("--rules_config", type=str, help="JSON file with the post-processing phrase lists (default: utils/rules.json).")
+    parser.add_argument("--configs", type=str, default=DEFAULT_CONFIGS, help=f"Comma-separated configurations, each 'default' or features joined by '+' ({', '.join(FEATURES)}); the first is the reference the others are gated against (default: {DEFAULT_CONFIGS}).")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="Largest allowed drop of any score, absolute (default: 0.02).")
+    parser.add_argument("--page_tolerance", type=int, default=1, help="Pages a heading may be off by and still match (default: 1).")
+    parser.add_argument("--baseline", type=str, default="benchmarks/accuracy_baseline.json", help="Scores of an earlier run to compare against.")
+    parser.add_argument("--save_baseline", action="store_true", help="Store this run's scores as the new baseline instead of comparing.")
+    parser.add_argument("--report", type=str, help="Write every configuration's per-document scores to this JSON file (optional).")
+    # Used by run_config_subprocess: evaluate one configuration in this process and write its run to a file
+    parser.add_argument("--run_config", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--run_output", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        configure_rules(args.rules_config)
+        pdf_paths, _ = find_pdfs(args.pdf_dir, args.reference_dir)
+        run = evaluate_config(args.run_config, pdf_paths, args.reference_dir, args.model_path, args.tokenizer_path,
+                              args.page_tolerance, started=_PROCESS_START)
+        with open(args.run_output, "w", encoding="utf-8") as f:
+            json.dump(run, f)
+        return 0
+
+    try:
+        configs = [name.strip() for name in args.configs.split(",") if name.strip()]
+        for name in configs:
+            parse_config(name)
+    except ValueError as e:
+        parser.error(str(e))
+
+    configure_rules(args.rules_config)
+    pdf_paths, missing = find_pdfs(args.pdf_dir, args.reference_dir)
+    if missing:
+        logger.warning(f"Skipping {len(missing)} PDFs without a reference output in {args.reference_dir}.")
+    if not pdf_paths:
+        logger.error(f"No PDFs with reference outputs found in {args.pdf_dir}.")
+        return 1
+
+    try:
+        runs = [run_config_subprocess(name, args) for name in configs]
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    print_table(runs)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({run["config"]: run["scores"] for run in runs}, f, indent=2)
+        logger.info(f"Accuracy baseline saved to {args.baseline}")
+        return 0
+
+    drops = []
+    for run in runs[1:]:
+        drops += [f"{run['config']}: {drop}" for drop in find_drops(run["scores"], runs[0]["scores"], args.tolerance, configs[0])]
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for run in runs:
+            if run["config"] in baseline:
+                drops += [f"{run['config']}: {drop}"
+                          for drop in find_drops(run["scores"], baseline[run["config"]], args.tolerance, "baseline")]
+    for drop in drops:
+        logger.error(f"Accuracy drop: {drop}")
+    if drops:
+        return 1
+    logger.info(f"All configurations within {args.tolerance} of {configs[0]}"
+                + (" and the baseline." if os.path.exists(args.baseline) else "."))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 # D:\CONNECTING_DOTS\Challenge_1a\json_schema.py
 
 import json
-import jsonschema # Make sure you have this installed: pip install jsonschema
 import logging
 
 try:
@@ -43,19 +42,49 @@ def load_schema(schema_path):
         raise
 
 
+def build_validator(schema):
+    """
+    Checks a JSON schema once and returns a validator for it.
+
+    jsonschema.validate() checks the schema itself and builds a new validator
+    on every call; validating many documents through one prebuilt validator
+    skips that repeated work.
+
+    Args:
+        schema (dict): The JSON schema, e.g. from load_schema().
+
+    Returns:
+        jsonschema.protocols.Validator: Pass it to validate_output() in place of the schema.
+
+    Raises:
+        jsonschema.SchemaError: If the schema itself is invalid.
+    """
+    import jsonschema # Imported on first use so runs without --schema never load it
+
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
 def validate_output(data, schema):
     """
     Validates a given data dictionary against a JSON schema.
 
     Args:
         data (dict): The data dictionary to validate.
-        schema (dict): The JSON schema to validate against.
+        schema (dict or validator): The JSON schema to validate against, or a
+            validator from build_validator().
 
     Raises:
         jsonschema.ValidationError: If the data does not conform to the schema.
     """
+    import jsonschema # Imported on first validation so runs without --schema never load it
+
     try:
-        jsonschema.validate(instance=data, schema=schema)
+        if isinstance(schema, dict):
+            jsonschema.validate(instance=data, schema=schema)
+        else:
+            schema.validate(data)
         logger.debug("Output data successfully validated against schema.")
     except jsonschema.ValidationError as e:
         logger.error(f"JSON schema validation failed: {e.message}") # e.message provides a more concise error
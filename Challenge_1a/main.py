@@ -1,36 +1,522 @@
 # In D:\CONNECTING_DOTS\Challenge_1a\main.py (No changes needed from previous suggestions)
 
+import time
+# Measured before the heavy imports below so the reported startup time includes them
+_PROCESS_START = time.perf_counter()
+
 import argparse
+import asyncio
+import cProfile
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
 from utils.logger import setup_logger
 from utils.heading_classifier import HeadingClassifier
-from process_pdfs import process_pdf
-from json_schema import load_schema # Assuming load_schema is used from json_schema.py
+from utils.rules import configure_rules
+from utils.result_cache import ResultCache, compute_fingerprint
+from utils.line_cache import LineCache
+from utils.layout_cascade import LayoutCascade
+from utils.metrics import DocumentMetrics, RunMetrics, SlowestProfiles
+from utils.pdf_utils import configure_extraction, document_name, get_layout_cache, parse_page_ranges, parse_text_flags
+from utils.corpus import (QUARANTINE_NAME, WORK_MANIFEST_NAME, Quarantine, WorkManifest, discover_pdfs,
+                          iter_archive_pdfs, parse_shard, read_stream_pdfs, relative_pdf_path, shard_of)
+from utils.supervisor import SupervisedPool
+from utils.onnx_session import EXECUTION_MODES, GRAPH_OPTIMIZATION_LEVELS, MODEL_MODES, resolve_model_path
+from process_pdfs import (analyze_pdf, analyze_pdf_page_parallel, classify_pages, write_output, stream_pdf_to_ndjson,
+                          output_path_for)
+from pipeline import run_pipeline
+from json_schema import load_schema, build_validator # Assuming load_schema is used from json_schema.py
+from utils.json_io import JSONL_PREFIX, JsonlSink
 
 logger = setup_logger()
 
+# JSONL results written between work-manifest updates (each update flushes the JSONL buffer)
+MANIFEST_BATCH = 256
+
+# Per-process state for --workers mode, filled in once by _init_worker
+_worker_classifier = None
+_worker_schema = None
+_worker_options = None
+
+
+def _build_classifier(model_path, tokenizer_path, options):
+    line_cache = None
+    if options.get("line_cache_size", 0) > 0:
+        line_cache = LineCache(options["line_cache_size"])
+        if options.get("line_cache_file"):
+            line_cache.load(options["line_cache_file"], options["line_cache_fingerprint"])
+    return HeadingClassifier(model_path, tokenizer_path, line_cache=line_cache,
+                             session_config=options.get("session_config"),
+                             fast_start=options.get("fast_start", False))
+
+
+def _close_classifier(classifier, options):
+    """Logs line-cache statistics and persists the cache if a cache file was given."""
+    line_cache = classifier.line_cache
+    if line_cache is None:
+        return
+    logger.info(f"Line cache ({os.getpid()}): {line_cache.stats()}")
+    if options.get("line_cache_file"):
+        try:
+            line_cache.save(options["line_cache_file"], options["line_cache_fingerprint"])
+        except OSError as e:
+            logger.warning(f"Could not save line cache to {options['line_cache_file']}: {e}")
+
+
+def _log_layout_cache():
+    layout_cache = get_layout_cache()
+    if layout_cache is not None:
+        logger.info(f"Layout cache ({os.getpid()}): {layout_cache.stats()}")
+
+
+def _init_worker(model_path, tokenizer_path, schema, options):
+    """Builds one HeadingClassifier per worker process, reused for every document it handles."""
+    global _worker_classifier, _worker_schema, _worker_options
+    init_start = time.perf_counter()
+    configure_rules(options.get("rules_config"))
+    configure_extraction(options.get("text_flags"), options.get("layout_cache_dir"))
+    _worker_classifier = _build_classifier(model_path, tokenizer_path, options)
+    # Schemas travel to workers as plain dicts; each worker checks it once and reuses the validator
+    _worker_schema = build_validator(schema) if schema else None
+    _worker_options = options
+    # Runs when the pool shuts the worker down
+    Finalize(None, _close_classifier, args=(_worker_classifier, options), exitpriority=10)
+    Finalize(None, _log_layout_cache, exitpriority=10)
+    logger.info(f"Worker {os.getpid()} initialized HeadingClassifier in {time.perf_counter() - init_start:.2f}s.")
+
+
+def _analyze_one(pdf_path, classifier, schema, options, pages=None, metrics=None, page_pool=None):
+    """
+    Returns (pdf_path, result or None, error or None, per-document metrics dict).
+
+    pages and metrics are passed in by the pipeline, which extracts the pages
+    itself and has already timed that stage. With page_pool (a pool started
+    with _init_worker) the document's pages are classified there and
+    classifier is not used.
+    """
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    cascade = LayoutCascade() if options.get("cascade") else None
+    profiler = cProfile.Profile() if options.get("profile_dir") else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        if options.get("ndjson"):
+            # Streamed straight to disk by whoever processes the document
+            stream_pdf_to_ndjson(pdf_path, options["output_dir"], classifier, cascade, metrics, pages,
+                                 options.get("page_ranges"), options.get("input_root"), options.get("layout_index", False))
+            result = None
+        elif page_pool is not None:
+            result = analyze_pdf_page_parallel(pdf_path, page_pool, _classify_range_in_worker, schema, metrics,
+                                               options.get("page_ranges"), options.get("page_chunk", 0),
+                                               options["page_workers"], options.get("cascade", False))
+        else:
+            result = analyze_pdf(pdf_path, classifier, schema, cascade, metrics, pages,
+                                 options.get("page_ranges"), options.get("title_only", False),
+                                 options.get("layout_index", False))
+        error = None
+    except Exception as e:
+        logger.exception(f"Error processing {document_name(pdf_path)}: {e}")
+        result, error = None, f"{type(e).__name__}: {e}"
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    metrics.finish()
+    document = metrics.to_dict()
+    if profiler is not None:
+        # Named by the path below the input root, so a/x.pdf and b/x.pdf never share a dump
+        stem = os.path.splitext(relative_pdf_path(pdf_path, options.get("input_root")))[0].replace("/", "__")
+        document["profile"] = os.path.join(options["profile_dir"], f"{stem}.{os.getpid()}.prof")
+        profiler.dump_stats(document["profile"])
+    return pdf_path, result, error, document
+
+
+def _analyze_in_worker(pdf_path):
+    return _analyze_one(pdf_path, _worker_classifier, _worker_schema, _worker_options)
+
+
+def _classify_range_in_worker(pdf_path, page_ranges, table=None, chars_by_size=None):
+    cascade = LayoutCascade(chars_by_size=chars_by_size) if _worker_options.get("cascade") else None
+    return classify_pages(pdf_path, _worker_classifier, cascade, page_ranges, table)
+
+
+def _supervised_results(pool, pdf_paths, quarantine=None, input_root=None):
+    """Yields _analyze_one-style results from a SupervisedPool, quarantining the documents it had to kill."""
+    for pdf_path, result, failure, elapsed in pool.map(pdf_paths):
+        if failure is None:
+            yield result
+            continue
+        logger.error(f"Killed the worker processing {document_name(pdf_path)}: {failure}")
+        metrics = DocumentMetrics(document_name(pdf_path))
+        metrics.count("quarantined")
+        document = metrics.to_dict()
+        document["total_s"] = elapsed
+        if quarantine is not None:
+            quarantine.add(relative_pdf_path(pdf_path, input_root), failure)
+        yield pdf_path, None, failure, document
+
+
+def _write_document(pdf_path, result, error, document, write):
+    """Writes a successful result with write(result, pdf_path), adding the write time to document; returns the error, if any."""
+    if error is not None or result is None:
+        return error
+    write_start = time.perf_counter()
+    try:
+        write(result, pdf_path)
+    except OSError as e:
+        logger.error(f"Could not write output for {document_name(pdf_path)}: {e}")
+        error = f"{type(e).__name__}: {e}"
+    write_s = time.perf_counter() - write_start
+    document["stages"]["write"] += write_s
+    document["total_s"] += write_s
+    return error
+
+
+def run_batch(pdf_paths, output_dir, model_path, tokenizer_path, schema=None, workers=1, ndjson=False, cache=None,
+              line_cache_size=0, line_cache_file=None, cascade=False, rules_config=None,
+              profile_dir=None, profile_top=0, session_config=None, fast_start=False, pipeline_depth=0,
+              output_format="json", jsonl_max_bytes=0, page_ranges=None, title_only=False,
+              input_root=None, manifest=None, doc_timeout=None, max_memory_bytes=None, quarantine=None,
+              retry_quarantined=False, layout_index=False, text_flags=None, layout_cache_dir=None,
+              page_workers=1, page_chunk=0, jsonl_prefix=JSONL_PREFIX):
+    """
+    Processes pdf_paths and writes one JSON per document in input order.
+
+    With workers > 1 documents are analyzed in a process pool, each worker
+    holding its own classifier; results still come back and are written in
+    the order of pdf_paths. With ndjson=True each document is streamed to
+    <output_dir>/<name>.ndjson as it is processed instead. With a ResultCache,
+    documents whose cached output is still fresh are skipped.
+
+    line_cache_size > 0 puts a LineCache of that many entries in front of
+    each classifier, kept for the whole run; line_cache_file additionally
+    loads it at start and saves it at the end. cascade=True labels obvious
+    body text from layout features before the model sees it. rules_config
+    is the phrase config workers compile their rule engine from. With
+    profile_dir, every document runs under cProfile and the dumps of the
+    profile_top slowest documents are kept there. session_config holds the
+    onnxruntime settings for every classifier (see utils/onnx_session.py).
+    fast_start=True loads the tokenizer without importing transformers.
+    pipeline_depth > 0 runs serial mode as an asyncio pipeline (see
+    pipeline.py) that overlaps reading, extraction, inference and writing,
+    with at most that many documents queued between stages.
+    output_format="jsonl" appends every result as one line of
+    <output_dir>/results-NNNNN.jsonl instead of writing a file per document,
+    starting a new part when one would exceed jsonl_max_bytes (0 = never).
+    Parts of an earlier run are replaced, unless this run skips documents
+    that run completed (fresh in the ResultCache or listed in the manifest),
+    in which case the last part is continued; jsonl_prefix replaces "results" in the part
+    names, e.g. to keep shards sharing output_dir apart.
+    The schema is compiled into a validator once per process.
+    page_ranges limits every document to those pages (see
+    utils/pdf_utils.parse_page_ranges). title_only=True only finds titles,
+    stopping each document as soon as its title is confident; it does not
+    use the pipeline.
+    pdf_paths may also hold utils.corpus.PdfInput items (archive members,
+    stdin buffers), which are read in memory and named by their member name.
+    With input_root, documents are named by their path below it: outputs
+    mirror its subdirectories and cache entries use the relative path. A
+    WorkManifest skips documents it lists as completed and records every
+    document completed in this run.
+    With doc_timeout (seconds) or max_memory_bytes, documents run in a
+    SupervisedPool of `workers` processes (see utils/supervisor.py) that
+    kills a document's worker once it exceeds either limit or crashes; such
+    documents fail and are added to the Quarantine. Quarantined documents
+    are skipped, unless retry_quarantined=True, in which case those that
+    succeed are released from it. Supervised runs do not use the pipeline.
+    layout_index=True drops running headers and footers before inference and
+    merges multi-line headings by their boxes (see process_pdfs.iter_outline).
+    text_flags and layout_cache_dir configure extraction in every process
+    (see utils/pdf_utils.configure_extraction); with a layout cache, PDFs
+    parsed by an earlier run are read from it instead of PyMuPDF.
+    page_workers > 1 processes documents one at a time, splitting each one's
+    pages into chunks of page_chunk pages (0 = sized from page_workers) that
+    a pool of that many processes extracts and classifies; the title and
+    outline are built here in page order (see
+    process_pdfs.analyze_pdf_page_parallel). It is meant for a few very large
+    PDFs and does not combine with workers > 1, ndjson, title_only or
+    layout_index.
+
+    Returns:
+        tuple: (RunMetrics for the run, list of (pdf_path, error) failures).
+    """
+    run_metrics = RunMetrics()
+    failures = []
+    options = {
+        "output_dir": output_dir,
+        "ndjson": ndjson,
+        "line_cache_size": line_cache_size,
+        "line_cache_file": line_cache_file,
+        "cascade": cascade,
+        "rules_config": rules_config,
+        "profile_dir": profile_dir if profile_top > 0 else None,
+        "session_config": session_config,
+        "fast_start": fast_start,
+        "page_ranges": page_ranges,
+        "title_only": title_only,
+        "input_root": input_root,
+        "layout_index": layout_index,
+        "text_flags": text_flags,
+        "layout_cache_dir": layout_cache_dir,
+        "page_workers": page_workers,
+        "page_chunk": page_chunk,
+    }
+    profiles = SlowestProfiles(profile_top) if options["profile_dir"] else None
+    if profiles is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    if line_cache_size > 0 and line_cache_file:
+        # Raw model labels are cached, so only the model and tokenizer matter
+        options["line_cache_fingerprint"] = compute_fingerprint(model_path, tokenizer_path, rules_version="")
+    extension = ".ndjson" if ndjson else ".json"
+
+    if quarantine and not retry_quarantined:
+        pending = [pdf_path for pdf_path in pdf_paths if relative_pdf_path(pdf_path, input_root) not in quarantine]
+        if len(pending) < len(pdf_paths):
+            logger.info(f"Skipping {len(pdf_paths) - len(pending)} quarantined PDFs listed in {quarantine.path}.")
+        run_metrics.skipped += len(pdf_paths) - len(pending)
+        pdf_paths = pending
+
+    # Documents an earlier run completed and this one skips; their JSONL lines must be kept
+    completed_earlier = 0
+    if manifest is not None:
+        pending = [pdf_path for pdf_path in pdf_paths
+                   if not manifest.is_completed(relative_pdf_path(pdf_path, input_root))]
+        if len(pending) < len(pdf_paths):
+            logger.info(f"Skipping {len(pdf_paths) - len(pending)} PDFs completed by a previous run.")
+        run_metrics.skipped += len(pdf_paths) - len(pending)
+        completed_earlier += len(pdf_paths) - len(pending)
+        pdf_paths = pending
+
+    content_hashes = {}
+    if cache is not None:
+        pending = []
+        for pdf_path in pdf_paths:
+            try:
+                content_hashes[pdf_path] = cache.content_hash(pdf_path)
+            except OSError as e:
+                logger.warning(f"Could not hash {document_name(pdf_path)}, processing it uncached: {e}")
+                pending.append(pdf_path)
+                continue
+            if output_format == "jsonl":
+                # JSONL results live in whichever part they were appended to
+                recorded = cache.recorded_output(pdf_path)
+                output_file = os.path.join(output_dir, recorded) if recorded else None
+            else:
+                output_file = output_path_for(pdf_path, output_dir, extension, input_root)
+            if output_file and cache.is_fresh(pdf_path, content_hashes[pdf_path], output_file):
+                logger.info(f"Skipping unchanged PDF: {document_name(pdf_path)}")
+                # Refresh size/mtime so the next run doesn't need to re-hash it
+                cache.record(pdf_path, content_hashes[pdf_path], output_file)
+            else:
+                pending.append(pdf_path)
+        run_metrics.skipped += len(pdf_paths) - len(pending)
+        completed_earlier += len(pdf_paths) - len(pending)
+        pdf_paths = pending
+
+    if not pdf_paths:
+        if cache is not None:
+            cache.save()
+        return run_metrics, failures
+
+    sink = None
+    if output_format == "jsonl":
+        sink = JsonlSink(output_dir, max_bytes=jsonl_max_bytes, prefix=jsonl_prefix, append=completed_earlier > 0)
+
+    def write(result, pdf_path):
+        if sink is not None:
+            return sink.write({"file": relative_pdf_path(pdf_path, input_root), **result})
+        return write_output(result, pdf_path, output_dir, input_root)
+
+    unmarked = []
+
+    def mark_completed():
+        if sink is not None:
+            sink.flush()
+        for name, output in unmarked:
+            manifest.mark_completed(name, output)
+        unmarked.clear()
+
+    def record(pdf_path, error, document):
+        run_metrics.add(document, ok=error is None)
+        if profiles is not None:
+            profiles.offer(document.get("profile"), document["total_s"])
+        if error is None:
+            output_file = sink.path if sink is not None else output_path_for(pdf_path, output_dir, extension, input_root)
+            if pdf_path in content_hashes:
+                cache.record(pdf_path, content_hashes[pdf_path], output_file)
+            if quarantine is not None:
+                quarantine.release(relative_pdf_path(pdf_path, input_root))
+            if manifest is not None:
+                unmarked.append((relative_pdf_path(pdf_path, input_root),
+                                 os.path.relpath(output_file, output_dir).replace(os.sep, "/")))
+                # Buffered JSONL lines must reach the file before the manifest calls them completed
+                if sink is None or len(unmarked) >= MANIFEST_BATCH:
+                    mark_completed()
+        else:
+            failures.append((pdf_path, error))
+
+    classifier = None
+    if doc_timeout or max_memory_bytes:
+        pool = SupervisedPool(workers, _init_worker, (model_path, tokenizer_path, schema, options), _analyze_in_worker,
+                              timeout=doc_timeout, max_memory=max_memory_bytes)
+        results = _supervised_results(pool, pdf_paths, quarantine, input_root)
+    elif workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(model_path, tokenizer_path, schema, options))
+        results = pool.map(_analyze_in_worker, pdf_paths)
+    elif page_workers > 1:
+        pool = ProcessPoolExecutor(max_workers=page_workers, initializer=_init_worker,
+                                   initargs=(model_path, tokenizer_path, schema, options))
+        # Page counts are read here; everything else happens in the pool
+        configure_extraction(text_flags, layout_cache_dir)
+        schema = build_validator(schema) if schema else None
+        results = (_analyze_one(pdf_path, None, schema, options, page_pool=pool) for pdf_path in pdf_paths)
+    else:
+        pool = None
+        configure_extraction(text_flags, layout_cache_dir)
+        classifier = _build_classifier(model_path, tokenizer_path, options)
+        logger.info(f"HeadingClassifier initialized; startup took {time.perf_counter() - _PROCESS_START:.2f}s.")
+        schema = build_validator(schema) if schema else None
+        results = (_analyze_one(pdf_path, classifier, schema, options) for pdf_path in pdf_paths)
+
+    try:
+        if classifier is not None and pipeline_depth > 0 and not title_only:
+            asyncio.run(run_pipeline(
+                pdf_paths,
+                analyze=lambda pdf_path, pages, metrics: _analyze_one(pdf_path, classifier, schema, options, pages, metrics),
+                write=lambda pdf_path, result, error, document: _write_document(pdf_path, result, error, document, write),
+                on_done=record,
+                queue_depth=pipeline_depth,
+                page_ranges=page_ranges,
+            ))
+        else:
+            for pdf_path, result, error, document in results:
+                error = _write_document(pdf_path, result, error, document, write)
+                record(pdf_path, error, document)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        else:
+            _close_classifier(classifier, options)
+            _log_layout_cache()
+        if unmarked:
+            mark_completed()
+        if sink is not None:
+            sink.close()
+        if cache is not None:
+            cache.save()
+
+    counters = run_metrics.summary()["counters"]
+    if cascade and counters.get("lines"):
+        layout_share = counters.get("cascade_layout_lines", 0) / counters["lines"]
+        logger.info(f"Cascade routing: {layout_share:.1%} of {counters['lines']} lines labelled by layout, "
+                    f"{1 - layout_share:.1%} sent to the classifier.")
+    if layout_index and counters.get("lines"):
+        logger.info(f"Layout index: {counters.get('layout_repeated_lines', 0)} of {counters['lines']} lines "
+                    f"were running headers or footers and skipped inference.")
+    if counters.get("quarantined"):
+        logger.info(f"Killed and quarantined {counters['quarantined']} PDFs that exceeded their limits.")
+    if profiles is not None:
+        logger.info(f"Kept profiles of the {len(profiles.kept())} slowest documents in {profile_dir}")
+
+    return run_metrics, failures
+
+
 def main():
     parser = argparse.ArgumentParser(description="Process PDFs to extract titles and outlines.")
-    parser.add_argument("--pdf_dir", type=str, required=True, help="Path to the directory containing PDF files.")
+    parser.add_argument("--pdf_dir", type=str, required=True, help="Directory containing PDF files, a zip/tar archive of PDFs (read in place, outputs named by member), or '-' to read one PDF or an archive from stdin.")
+    parser.add_argument("--stdin_name", type=str, default="stdin.pdf", help="Name used for the output of a single PDF read from stdin (default: stdin.pdf).")
     parser.add_argument("--output_dir", type=str, required=True, help="Path to the output directory for processed JSONs.")
     parser.add_argument("--schema", type=str, help="Path to the JSON schema for validation (optional).")
     parser.add_argument("--model_path", type=str, default="minilm_model/minilm_headings.onnx", help="Path to the ONNX model file.")
     parser.add_argument("--tokenizer_path", type=str, default="minilm_tokenizer", help="Path to the tokenizer directory.")
+    parser.add_argument("--rules_config", type=str, help="JSON file with the post-processing phrase lists (default: utils/rules.json).")
+    parser.add_argument("--recursive", action="store_true", help="Find PDFs in subdirectories of --pdf_dir too; outputs mirror the directory tree.")
+    parser.add_argument("--shard", type=str, metavar="i/N", help="Only process shard i of N (0-based), chosen by a hash of each PDF's path below --pdf_dir; run one shard per node.")
+    parser.add_argument("--resume", action="store_true", help="Record completed PDFs in a work manifest and skip those listed in it by an earlier --resume run with the same --shard (start the first run with --resume too).")
+    parser.add_argument("--manifest", type=str, help="Record completed PDFs in this work manifest (default with --resume: <output_dir>/.work_manifest[.i-of-N].jsonl; without --resume it is rewritten).")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes; each loads its own classifier (default: 1, serial).")
+    parser.add_argument("--page_workers", type=int, default=1, help="Split each PDF's pages across this many worker processes and merge the results in page order; for a few very large PDFs (default: 1, off).")
+    parser.add_argument("--page_chunk", type=int, default=0, metavar="PAGES", help="Pages per --page_workers task (default: 0, about four tasks per worker).")
+    parser.add_argument("--doc_timeout", type=float, metavar="SECONDS", help="Kill and quarantine a PDF still being processed after this many seconds; runs documents in supervised worker processes.")
+    parser.add_argument("--max_memory_mb", type=float, help="Kill and quarantine a PDF once its worker's resident memory (model included) exceeds this; runs documents in supervised worker processes.")
+    parser.add_argument("--quarantine", type=str, help="List of PDFs killed for exceeding a limit, skipped by later runs (default: <output_dir>/.quarantine.jsonl).")
+    parser.add_argument("--retry_quarantined", action="store_true", help="Process quarantined PDFs again instead of skipping them.")
+    parser.add_argument("--model_mode", type=str, choices=MODEL_MODES, default="fp32", help="fp32 uses --model_path as is; int8 uses its dynamically quantized variant, creating it if missing.")
+    parser.add_argument("--intra_op_threads", type=int, help="onnxruntime threads per operator (default: all cores, or cores / workers with --workers or --page_workers).")
+    parser.add_argument("--inter_op_threads", type=int, default=0, help="onnxruntime threads across operators in parallel execution mode (default: 0, onnxruntime's choice).")
+    parser.add_argument("--graph_optimization", type=str, choices=list(GRAPH_OPTIMIZATION_LEVELS), default="all", help="onnxruntime graph optimization level.")
+    parser.add_argument("--execution_mode", type=str, choices=list(EXECUTION_MODES), default="sequential", help="onnxruntime execution mode.")
+    parser.add_argument("--disable_mem_arena", action="store_true", help="Turn off the onnxruntime CPU memory arena (lower peak memory, slower allocation).")
+    parser.add_argument("--optimized_model_dir", type=str, help="Cache the onnxruntime-optimized graph here and load it on later runs (optional).")
+    parser.add_argument("--pipeline", type=int, default=0, metavar="DEPTH", help="Serial mode only: overlap reading, extraction, inference and writing in an asyncio pipeline with up to DEPTH documents queued between stages (0 = off).")
+    parser.add_argument("--fast_start", action="store_true", help="Load the tokenizer from tokenizer.json with the lightweight `tokenizers` library instead of importing transformers.")
+    parser.add_argument("--title_only", action="store_true", help="Only extract titles (outline left empty), stopping each PDF as soon as a confident title is found.")
+    parser.add_argument("--pages", type=str, help="Only read these pages of each PDF, e.g. '1-3,7,10-' (1-based, inclusive).")
+    parser.add_argument("--max_pages", type=int, help="Only read the first N pages of each PDF (combines with --pages).")
+    parser.add_argument("--output_format", type=str, choices=["json", "jsonl"], default="json", help="json writes one file per PDF; jsonl writes every result as a line of <output_dir>/results-NNNNN.jsonl (results.i-of-N-NNNNN.jsonl with --shard), replacing an earlier run's parts unless --incremental or --resume continues them.")
+    parser.add_argument("--jsonl_max_mb", type=float, default=0, help="With --output_format jsonl, start a new part once the current one would exceed this size (default: 0, one file).")
+    parser.add_argument("--layout_cache", type=str, metavar="DIR", help="Store each PDF's extracted lines and layout here, keyed by content hash and extraction settings; later runs (e.g. with another model) read them instead of parsing the PDF.")
+    parser.add_argument("--text_flags", type=str, help="PyMuPDF text extraction flags: names replacing the defaults, or changes such as '-images' (skips image blocks) or '+dehyphenate'.")
+    parser.add_argument("--ndjson", action="store_true", help="Stream each document's outline entries to <name>.ndjson as pages finish, title on the last line.")
+    parser.add_argument("--line_cache_size", type=int, default=100000, help="Entries in the per-process LRU cache of line classifications (0 disables it).")
+    parser.add_argument("--line_cache_file", type=str, help="Load the line-classification cache from this file at start and save it back at the end (optional).")
+    parser.add_argument("--layout_index", action="store_true", help="Index line boxes across each PDF's pages: skip running headers/footers before inference and merge multi-line headings by vertical adjacency.")
+    parser.add_argument("--cascade", action="store_true", help="Label obvious body text from layout features (font size, bold) and run the model only on the remaining lines.")
+    parser.add_argument("--incremental", action="store_true", help="Skip PDFs whose content, model, tokenizer and rules are unchanged since their output was written (uses a cache manifest in --output_dir).")
+    parser.add_argument("--metrics_json", type=str, help="Write a JSON summary of per-stage timings and counters to this file (optional).")
+    parser.add_argument("--metrics_prom", type=str, help="Write the run metrics as a Prometheus textfile to this path (optional).")
+    parser.add_argument("--profile", type=int, default=0, metavar="N", help="Profile every document with cProfile and keep the dumps of the N slowest in <output_dir>/profiles.")
     
     args = parser.parse_args()
+    if args.ndjson and args.output_format == "jsonl":
+        parser.error("--ndjson streams one file per PDF and cannot be combined with --output_format jsonl")
+    if args.ndjson and args.title_only:
+        parser.error("--ndjson streams outline entries and cannot be combined with --title_only")
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        parser.error(f"--shard: {e}")
+    try:
+        page_ranges = parse_page_ranges(args.pages) if args.pages else None
+    except ValueError as e:
+        parser.error(f"--pages: {e}")
+    try:
+        text_flags = parse_text_flags(args.text_flags) if args.text_flags else None
+    except ValueError as e:
+        parser.error(f"--text_flags: {e}")
+    if args.page_chunk < 0:
+        parser.error("--page_chunk must be at least 0")
+    if args.page_workers > 1:
+        if args.workers > 1 or args.doc_timeout or args.max_memory_mb:
+            parser.error("--page_workers splits one PDF at a time and cannot be combined with --workers, --doc_timeout or --max_memory_mb")
+        if args.ndjson:
+            parser.error("--page_workers cannot be combined with --ndjson")
+        if args.title_only or args.layout_index:
+            logger.warning("--title_only and --layout_index need each PDF's pages in one process; ignoring --page_workers.")
+            args.page_workers = 1
+        elif args.pipeline > 0:
+            logger.warning("--pipeline does not apply with --page_workers; ignoring it.")
+            args.pipeline = 0
+    if args.max_pages is not None:
+        if args.max_pages < 1:
+            parser.error("--max_pages must be at least 1")
+        page_ranges = tuple((first, min(last or args.max_pages, args.max_pages))
+                            for first, last in (page_ranges or ((1, None),)) if first <= args.max_pages)
+        if not page_ranges:
+            parser.error("--pages selects nothing within --max_pages")
 
     INPUT_DIR = args.pdf_dir
     OUTPUT_DIR = args.output_dir
     SCHEMA_PATH = args.schema
-    MODEL_PATH = args.model_path
+    MODEL_PATH = resolve_model_path(args.model_path, args.model_mode)
     TOKENIZER_PATH = args.tokenizer_path
 
     # Ensure output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Initialize classifier
-    classifier = HeadingClassifier(MODEL_PATH, TOKENIZER_PATH)
-    logger.info("HeadingClassifier initialized.")
+    rules = configure_rules(args.rules_config)
 
     # Load schema if provided
     schema = None
@@ -40,18 +526,108 @@ def main():
     elif SCHEMA_PATH:
         logger.warning(f"Schema file not found at {SCHEMA_PATH}, proceeding without schema validation.")
 
-    # Process PDFs
-    pdf_files = [f for f in os.listdir(INPUT_DIR) if f.lower().endswith('.pdf')]
-    if not pdf_files:
-        logger.warning(f"No PDF files found in {INPUT_DIR}.")
+    # Process PDFs in a deterministic order; with --recursive they are named by their path below INPUT_DIR
+    input_root = INPUT_DIR if args.recursive else None
+    try:
+        if INPUT_DIR == "-":
+            pdf_paths = read_stream_pdfs(sys.stdin.buffer, args.stdin_name)
+        elif os.path.isfile(INPUT_DIR):
+            # Archive members are read in place and named by their path in the archive
+            input_root = None
+            pdf_paths = list(iter_archive_pdfs(INPUT_DIR))
+        else:
+            pdf_paths = discover_pdfs(INPUT_DIR, recursive=args.recursive)
+    except (ValueError, OSError) as e:
+        parser.error(f"--pdf_dir: {e}")
+    if shard is not None:
+        shard_index, shard_count = shard
+        pdf_paths = (pdf_path for pdf_path in pdf_paths
+                     if shard_of(relative_pdf_path(pdf_path, input_root), shard_count) == shard_index)
+    pdf_paths = list(pdf_paths)
+    if not pdf_paths:
+        logger.warning(f"No PDF files found in {INPUT_DIR}" + (f" for shard {args.shard}." if shard else "."))
         return
 
-    for pdf_file in pdf_files:
-        pdf_path = os.path.join(INPUT_DIR, pdf_file)
-        process_pdf(pdf_path, OUTPUT_DIR, classifier, schema)
+    workers = max(1, args.workers)
+    page_workers = max(1, args.page_workers)
+    supervised = bool(args.doc_timeout or args.max_memory_mb)
+    if args.pipeline > 0 and supervised:
+        logger.warning("--pipeline cannot interrupt a document; ignoring it with --doc_timeout/--max_memory_mb.")
+    elif args.pipeline > 0 and workers > 1:
+        logger.warning("--pipeline applies to serial mode only; ignoring it with --workers > 1.")
+    elif args.pipeline > 0 and args.title_only:
+        logger.warning("--title_only stops reading each PDF early, which the pipeline's extract stage cannot; ignoring --pipeline.")
+    logger.info(f"Processing {len(pdf_paths)} PDF files with {workers} worker(s)"
+                + (f", {page_workers} page worker(s) per PDF." if page_workers > 1 else "."))
+
+    intra_op_threads = args.intra_op_threads
+    if intra_op_threads is None:
+        # Keep worker processes from oversubscribing the cores with onnxruntime threads
+        processes = max(workers, page_workers)
+        intra_op_threads = max(1, (os.cpu_count() or 1) // processes) if processes > 1 or supervised else 0
+    session_config = {
+        "intra_op_threads": intra_op_threads,
+        "inter_op_threads": args.inter_op_threads,
+        "graph_optimization": args.graph_optimization,
+        "execution_mode": args.execution_mode,
+        "enable_mem_arena": not args.disable_mem_arena,
+        "optimized_model_dir": args.optimized_model_dir,
+    }
+
+    cache = None
+    if args.incremental:
+        # Options that change what is written are part of the fingerprint; defaults are left out
+        settings = {"cascade": args.cascade, "title_only": args.title_only, "layout_index": args.layout_index,
+                    "page_ranges": [list(r) for r in page_ranges] if page_ranges else None,
+                    "text_flags": (",".join(text_flags) or "none") if text_flags is not None else None}
+        settings = {name: value for name, value in settings.items() if value}
+        cache = ResultCache(OUTPUT_DIR, compute_fingerprint(MODEL_PATH, TOKENIZER_PATH, rules.fingerprint, settings),
+                            input_root=input_root)
+
+    # Only runs that ask for a manifest write one, so a plain run leaves nothing but its outputs
+    manifest = None
+    manifest_path = args.manifest
+    if manifest_path is None and args.resume:
+        stem, extension = os.path.splitext(WORK_MANIFEST_NAME)
+        # One manifest per shard, so shards sharing an output directory never append to the same file
+        manifest_path = os.path.join(OUTPUT_DIR, f"{stem}.{shard[0]}-of-{shard[1]}{extension}" if shard else WORK_MANIFEST_NAME)
+    if manifest_path is not None:
+        manifest = WorkManifest(manifest_path, resume=args.resume)
+    quarantine = Quarantine(args.quarantine or os.path.join(OUTPUT_DIR, QUARANTINE_NAME))
+
+    run_metrics, failures = run_batch(pdf_paths, OUTPUT_DIR, MODEL_PATH, TOKENIZER_PATH, schema, workers, args.ndjson, cache,
+                                      line_cache_size=args.line_cache_size, line_cache_file=args.line_cache_file,
+                                      cascade=args.cascade, rules_config=args.rules_config,
+                                      profile_dir=os.path.join(OUTPUT_DIR, "profiles"), profile_top=args.profile,
+                                      session_config=session_config, fast_start=args.fast_start,
+                                      pipeline_depth=args.pipeline, output_format=args.output_format,
+                                      jsonl_max_bytes=int(args.jsonl_max_mb * 1024 * 1024),
+                                      page_ranges=page_ranges, title_only=args.title_only,
+                                      input_root=input_root, manifest=manifest,
+                                      doc_timeout=args.doc_timeout,
+                                      max_memory_bytes=int(args.max_memory_mb * 1024 * 1024) if args.max_memory_mb else None,
+                                      quarantine=quarantine, retry_quarantined=args.retry_quarantined,
+                                      layout_index=args.layout_index, text_flags=text_flags,
+                                      layout_cache_dir=args.layout_cache,
+                                      page_workers=page_workers, page_chunk=args.page_chunk,
+                                      jsonl_prefix=f"{JSONL_PREFIX}.{shard[0]}-of-{shard[1]}" if shard else JSONL_PREFIX)
+    if manifest is not None:
+        manifest.close()
+    quarantine.close()
+
+    logger.info(f"Run summary: {run_metrics.succeeded} succeeded, {run_metrics.failed} failed, "
+                f"{run_metrics.skipped} skipped (unchanged, completed earlier or quarantined), {len(pdf_paths)} total.")
+    for pdf_path, error in failures:
+        logger.warning(f"Failed: {document_name(pdf_path)} ({error})")
+
+    if args.metrics_json:
+        run_metrics.write_json(args.metrics_json)
+        logger.info(f"Metrics summary written to {args.metrics_json}")
+    if args.metrics_prom:
+        run_metrics.write_prometheus(args.metrics_prom)
+        logger.info(f"Prometheus metrics written to {args.metrics_prom}")
 
     logger.info("PDF processing complete.")
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,128 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\pipeline.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import setup_logger
+from utils.metrics import DocumentMetrics
+from utils.corpus import PdfInput
+from utils.pdf_utils import document_name, extract_line_table
+
+logger = setup_logger()
+
+_DONE = object()
+
+
+class _Job:
+    """One document on its way through the pipeline."""
+
+    __slots__ = ("pdf_path", "metrics", "data", "pages", "result", "error", "document")
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self.metrics = DocumentMetrics(document_name(pdf_path))
+        self.data = None
+        self.pages = None
+        self.result = None
+        self.error = None
+        self.document = None
+
+
+def _read_file(pdf_path):
+    if isinstance(pdf_path, PdfInput):
+        return pdf_path.read()
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+def _extract_pages(data, page_ranges=None):
+    # One columnar table per document keeps queued documents small
+    return extract_line_table(data, page_ranges).pages()
+
+
+async def _run_stage(stage, inbox, outbox=None):
+    while True:
+        job = await inbox.get()
+        if job is _DONE:
+            if outbox is not None:
+                await outbox.put(_DONE)
+            return
+        await stage(job)
+        if outbox is not None:
+            await outbox.put(job)
+
+
+async def run_pipeline(pdf_paths, analyze, write, on_done, queue_depth=2, io_threads=2, page_ranges=None):
+    """
+    Processes documents in four overlapping stages: read, extract, analyze, write.
+
+    Each stage runs its blocking work in an executor and hands documents to
+    the next through a queue of at most queue_depth entries, so while document
+    N is being classified, N+1 is being read and parsed and N-1 written, and a
+    slow stage stalls the ones before it instead of letting parsed documents
+    pile up in memory. Extraction and analysis get one thread each, which
+    keeps documents in input order and the classifier on a single thread.
+
+    Args:
+        pdf_paths (list): The PDFs to process, in output order.
+        analyze (callable): analyze(pdf_path, pages, metrics) ->
+            (pdf_path, result, error, document metrics dict); see main._analyze_one.
+        write (callable): write(pdf_path, result, error, document) -> error,
+            called on an I/O thread.
+        on_done (callable): on_done(pdf_path, error, document), called on the
+            event loop thread once a document has been written or has failed.
+        queue_depth (int): Documents allowed to wait between two stages.
+        io_threads (int): Threads shared by file reads and output writes.
+        page_ranges (tuple, optional): Only extract these pages, see pdf_utils.parse_page_ranges.
+
+    Document 'total_s' is the document's latency through the pipeline, time
+    spent waiting in queues included.
+    """
+    loop = asyncio.get_running_loop()
+    io_pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="pipeline-io")
+    extract_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-extract")
+    analyze_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-analyze")
+    read_queue, extract_queue, analyze_queue, write_queue = (asyncio.Queue(maxsize=queue_depth) for _ in range(4))
+
+    async def feed():
+        for pdf_path in pdf_paths:
+            await read_queue.put(_Job(pdf_path))
+        await read_queue.put(_DONE)
+
+    async def read(job):
+        with job.metrics.stage("extract"):
+            try:
+                job.data = await loop.run_in_executor(io_pool, _read_file, job.pdf_path)
+            except OSError as e:
+                logger.error(f"Could not read {document_name(job.pdf_path)}: {e}")
+                job.error = f"{type(e).__name__}: {e}"
+
+    async def extract(job):
+        if job.error is None:
+            with job.metrics.stage("extract"):
+                job.pages = await loop.run_in_executor(extract_pool, _extract_pages, job.data, page_ranges)
+            job.data = None
+
+    async def analyze_job(job):
+        if job.error is None:
+            _, job.result, job.error, job.document = await loop.run_in_executor(
+                analyze_pool, analyze, job.pdf_path, job.pages, job.metrics)
+            job.pages = None
+        else:
+            job.metrics.finish()
+            job.document = job.metrics.to_dict()
+
+    async def write_job(job):
+        job.error = await loop.run_in_executor(io_pool, write, job.pdf_path, job.result, job.error, job.document)
+        on_done(job.pdf_path, job.error, job.document)
+
+    try:
+        await asyncio.gather(
+            feed(),
+            _run_stage(read, read_queue, extract_queue),
+            _run_stage(extract, extract_queue, analyze_queue),
+            _run_stage(analyze_job, analyze_queue, write_queue),
+            _run_stage(write_job, write_queue),
+        )
+    finally:
+        for pool in (io_pool, extract_pool, analyze_pool):
+            pool.shutdown()
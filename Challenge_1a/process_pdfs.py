@@ -2,110 +2,318 @@
 
 import os
 import json
-import jsonschema 
+import tempfile
+from concurrent.futures import wait
+import numpy as np
 from utils.logger import setup_logger
-from utils.pdf_utils import extract_text_lines 
+from utils.pdf_utils import document_name, iter_page_tables, page_count, selected_page_numbers, to_page_ranges
+from utils.line_table import LineTable
+from utils.layout_cascade import LayoutCascade
+from utils.layout_index import LayoutIndex
+from utils.json_io import atomic_write, dumps
+from utils.corpus import PdfInput, relative_pdf_path
 from utils.heading_classifier import HeadingClassifier
-from utils.outline_builder import build_outline
+from utils.outline_builder import OutlineBuilder
+from utils.metrics import DocumentMetrics
+from utils.rules import TITLE_EXCLUDE, TITLE_NOISE, TITLE_PRIORITY, get_rule_engine, normalize_text
 from json_schema import load_schema, validate_output
 
 
 logger = setup_logger()
 
 
-def extract_title(lines_with_preds):
+class TitleTracker:
     """
-    Extracts the main title of the document.
-    Prioritizes the first significant H1 or H2, filtering out noise.
-    Adjusted to handle short, prominent titles like in file05.pdf.
+    Picks the document title from classified lines fed in reading order.
+
+    Keeps only the first line that qualifies for each rule (priority phrase,
+    strong H1, prominent-text fallback), so the title can be chosen while the
+    document is streamed without holding on to its lines.
     """
-    
-    # Specific priority for 'TOPJUMP TRAMPOLINE PARK' if it exists and is prominent
-    for line_data in lines_with_preds:
-        text = line_data['text'].strip()
-        # Case-insensitive check, handle variations in spacing
-        normalized_text = " ".join(text.split()).lower()
-        if "topjump trampoline park" in normalized_text:
-            logger.info(f"Identified specific priority title: '{text}'")
-            return text
-
-    title_candidates = []
-    
-    for line_idx, line_data in enumerate(lines_with_preds):
-        text = line_data['text'].strip()
-        level = line_data.get('heading_level') 
 
+    def __init__(self, rules=None):
+        self.rules = rules or get_rule_engine()
+        self.priority_title = None
+        self.heading_title = None
+        self.fallback_title = None
+
+    def add(self, line_data):
+        self._add(line_data['text'], line_data.get('heading_level'))
+
+    def add_table(self, table):
+        """Feeds every line of a labelled LineTable, in order."""
+        texts = table.texts()
+        for i, text in enumerate(texts):
+            if self.done:
+                return
+            self._add(text, table.label_at(i))
+
+    @property
+    def confident(self):
+        """
+        True once a priority phrase or a strong H1 has been seen.
+
+        result() can then only change if a priority phrase turns up after the
+        strong H1, which title-only mode accepts in exchange for stopping early.
+        """
+        return self.priority_title is not None or self.heading_title is not None
+
+    @property
+    def done(self):
+        """True once every rule has its candidate; later lines cannot change the title."""
+        return self.priority_title is not None and self.heading_title is not None and self.fallback_title is not None
+
+    def _add(self, text, heading_level):
+        text = text.strip()
         if not text:
-            continue 
+            return
+
+        # Case-insensitive check, handle variations in spacing; one scan finds every phrase rule that applies
+        groups = self.rules.phrase_groups(normalize_text(text))
+
+        # Specific priority for 'TOPJUMP TRAMPOLINE PARK' if it exists and is prominent
+        if self.priority_title is None and TITLE_PRIORITY in groups:
+            self.priority_title = text
+
+        excluded = TITLE_EXCLUDE in groups
+
+        # Fallback: the first very prominent line that wasn't excluded.
+        if self.fallback_title is None and len(text.split()) >= 2 and len(text) < 60 and not excluded:
+            if text.isupper() or text.istitle(): # All caps or Title Case often indicates importance
+                self.fallback_title = text
+
+        if self.heading_title is not None:
+            return
 
         # Heuristic to filter out common document headers/footers or page numbers
         if len(text.split()) < 3 and text.replace('.', '', 1).isdigit(): 
-            continue
-        if "copyright" in text.lower() or "version" in text.lower() or "page" in text.lower() or "signature" in text.lower():
-            continue 
-        
-        # Exclude very common non-title phrases, even if they are prominent.
-        # This list now includes the problematic address and location phrases from file05.json
-        exclude_phrases = [
-            "you're invited", "to a party", "hope to see you there", "www.",
-            "pigeon forge, tn 37863", # The problematic title
-            "address:", "topjump 3735 parkway", "(near dixie stampede on the parkway)", # Parts of the address/location
-            "closed toed shoes are required for climbing", # The rule
-            "please visit topjump.com to fill out waiver so your child can attend. hope to see y ou t here ! www.topjump.com" # Long instruction
-        ]
-        
-        normalized_text = " ".join(text.split()).lower()
-        if any(phrase in normalized_text for phrase in exclude_phrases):
+            return
+        if TITLE_NOISE in groups:
+            return 
+        if excluded:
             logger.debug(f"Excluding '{text}' from title candidates (matches exclude phrase)")
-            continue
-
-        # Consider H1s and H2s as potential titles.
-        if level in ['H1', 'H2']:
-            if len(text.split()) >= 2: # Lower threshold to allow shorter titles like "TOPJUMP"
-                 title_candidates.append(text)
-            
-            # Prioritize longer H1s, then shorter H1s, then H2s.
-            if level == 'H1':
-                if len(text.split()) > 3: 
-                    logger.info(f"Identified title (strong H1): '{text}'")
-                    return text
-                elif len(text.split()) >= 2: 
-                    if not title_candidates: 
-                        title_candidates.append(text)
-            elif level == 'H2' and len(text.split()) > 4: 
-                 if not title_candidates: 
-                     title_candidates.append(text)
-
-
-    # Fallback: If no strong heading title candidate found after specific rules
-    # Look for the first very prominent line that wasn't excluded.
+            return
+
+        # Prioritize longer H1s as the title.
+        if heading_level == 'H1' and len(text.split()) > 3:
+            self.heading_title = text
+
+    def result(self):
+        if self.priority_title is not None:
+            logger.info(f"Identified specific priority title: '{self.priority_title}'")
+            return self.priority_title
+        if self.heading_title is not None:
+            logger.info(f"Identified title (strong H1): '{self.heading_title}'")
+            return self.heading_title
+        if self.fallback_title is not None:
+            logger.info(f"Fallback title (prominent text): '{self.fallback_title}'")
+            return self.fallback_title
+        logger.warning("No suitable title found, returning empty string.")
+        return ""
+
+
+def extract_title(lines_with_preds):
+    """
+    Extracts the main title of the document.
+    Prioritizes the first significant H1 or H2, filtering out noise.
+    Adjusted to handle short, prominent titles like in file05.pdf.
+    """
+    title_tracker = TitleTracker()
+    if isinstance(lines_with_preds, LineTable):
+        title_tracker.add_table(lines_with_preds)
+        return title_tracker.result()
     for line_data in lines_with_preds:
-        text = line_data['text'].strip()
-        normalized_text = " ".join(text.split()).lower()
-
-        if text and len(text.split()) >= 2 and len(text) < 60: # Reasonable length
-            # Re-check against the non-title phrases
-            if not any(phrase in normalized_text for phrase in exclude_phrases):
-                if text.isupper() or text.istitle(): # All caps or Title Case often indicates importance
-                    logger.info(f"Fallback title (prominent text): '{text}'")
-                    return text
-    
-    logger.warning("No suitable title found, returning empty string.")
-    return ""
+        title_tracker.add(line_data)
+    return title_tracker.result()
 
 
-def process_pdf(pdf_path, output_dir, classifier, schema=None):
-    logger.info(f"Processing PDF: {os.path.basename(pdf_path)}")
-    lines = extract_text_lines(pdf_path) 
+def iter_outline(pdf_path, classifier, title_tracker, cascade=None, metrics=None, pages=None, page_ranges=None,
+                 layout_index=False):
+    """
+    Streams a PDF page by page through classification and outline building.
+
+    Each page is classified in one predict_batch call and its lines are fed to
+    title_tracker and an OutlineBuilder before the next page is read, so no
+    document-wide list of lines is ever built.
+
+    Args:
+        pdf_path (str): The path to the PDF file.
+        classifier (HeadingClassifier): The classifier used to label lines.
+        title_tracker (TitleTracker): Receives every classified line; call its
+            result() once the generator is exhausted.
+        cascade (LayoutCascade, optional): Labels obvious body text from layout
+            features so only the remaining lines reach the classifier.
+        metrics (DocumentMetrics, optional): Receives per-stage timings and line counts.
+        pages (iterable, optional): Page LineTables already extracted (e.g. the
+            pages() of extract_line_table); when given, pdf_path is only used
+            for naming and the PDF is not opened again.
+        page_ranges (tuple, optional): Only read these pages, see pdf_utils.parse_page_ranges.
+        layout_index (bool): Read every page first and build a LayoutIndex:
+            running headers and footers are labelled 'text' without reaching
+            the classifier, and multi-line headings are merged by their boxes
+            (OutlineBuilder(geometric=True)). Entries then only start once
+            the whole document has been read.
+
+    Yields:
+        dict: Outline entries ('level', 'text', 'page_no') as soon as they are final.
+    """
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    classifier_before = _classifier_counters(classifier)
+    outline_builder = OutlineBuilder(geometric=layout_index)
+    pages = iter(pages) if pages is not None else iter_page_tables(pdf_path, page_ranges)
+    index = None
+    if layout_index:
+        with metrics.stage("extract"):
+            pages = list(pages)
+            index = LayoutIndex(pages)
+            pages = iter(pages)
+        metrics.count("layout_repeated_lines", index.repeated_lines)
+    try:
+        page_index = 0
+        while True:
+            with metrics.stage("extract"):
+                page = next(pages, None)
+            if page is None:
+                break
+            metrics.count("pages")
+            metrics.count("lines", len(page))
+
+            _label_page(page, classifier, cascade, index.repeated(page_index) if index is not None else None)
+            page_index += 1
+
+            with metrics.stage("title"):
+                title_tracker.add_table(page)
+            with metrics.stage("outline"):
+                entries = outline_builder.add_table(page)
+            yield from entries
+
+        with metrics.stage("outline"):
+            entries = outline_builder.finish()
+        yield from entries
+    finally:
+        _record_classifier_metrics(metrics, classifier, classifier_before)
+        if cascade is not None:
+            metrics.count("cascade_layout_lines", cascade.layout_lines)
+
+
+def _label_page(page, classifier, cascade=None, suppressed=None):
+    # Rows in the suppressed mask (running headers and footers) are body text without asking anyone
+    if suppressed is not None and suppressed.any():
+        kept = np.flatnonzero(~suppressed)
+        labels = ['text'] * len(page)
+        if len(kept):
+            rest = page.take(kept)
+            rest_labels = cascade.classify(rest, classifier) if cascade is not None else classifier.predict_batch(rest.texts())
+            for i, label in zip(kept.tolist(), rest_labels):
+                labels[i] = label
+        page.set_labels(labels)
+    elif cascade is not None:
+        page.set_labels(cascade.classify(page, classifier))
+    else:
+        page.set_labels(classifier.predict_batch(page.texts()))
+
+
+def extract_title_only(pdf_path, classifier, metrics=None, pages=None, page_ranges=None):
+    """
+    Finds the document title while reading as few pages as possible.
+
+    Pages are read and classified one at a time and reading stops as soon as
+    the title is confident (TitleTracker.confident). Only lines of more than
+    three words can become a strong-H1 title, so only those are sent to the
+    classifier; the title rules for the other lines do not use labels.
+
+    Returns:
+        str: The title, as TitleTracker.result() picks it.
+    """
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    classifier_before = _classifier_counters(classifier)
+    title_tracker = TitleTracker()
+    pages = iter(pages) if pages is not None else iter_page_tables(pdf_path, page_ranges)
+    try:
+        while not title_tracker.confident:
+            with metrics.stage("extract"):
+                page = next(pages, None)
+            if page is None:
+                break
+            metrics.count("pages")
+            metrics.count("lines", len(page))
+
+            texts = page.texts()
+            candidates = [i for i, text in enumerate(texts) if len(text.split()) > 3]
+            labels = ['text'] * len(texts)
+            if candidates:
+                for i, label in zip(candidates, classifier.predict_batch([texts[i] for i in candidates])):
+                    labels[i] = label
+            page.set_labels(labels)
+
+            with metrics.stage("title"):
+                title_tracker.add_table(page)
+    finally:
+        close = getattr(pages, "close", None)
+        if close is not None:
+            close() # Closes the PDF now rather than when the generator is collected
+        _record_classifier_metrics(metrics, classifier, classifier_before)
+    with metrics.stage("title"):
+        return title_tracker.result()
+
+
+def _classifier_counters(classifier):
+    line_cache = getattr(classifier, "line_cache", None)
+    return {
+        "timings": dict(getattr(classifier, "timings", {})),
+        "model_lines": getattr(classifier, "model_lines", 0),
+        "line_cache_hits": line_cache.hits if line_cache is not None else 0,
+        "line_cache_misses": line_cache.misses if line_cache is not None else 0,
+    }
+
 
-    lines_with_preds = []
-    for line in lines:
-        label = classifier.predict(line['text']) 
-        lines_with_preds.append({**line, "heading_level": label})
+def _record_classifier_metrics(metrics, classifier, before):
+    # The classifier keeps cumulative counters across documents; record this document's share
+    after = _classifier_counters(classifier)
+    for stage, seconds in after["timings"].items():
+        metrics.add_time(stage, seconds - before["timings"].get(stage, 0.0))
+    for name in ("model_lines", "line_cache_hits", "line_cache_misses"):
+        metrics.count(name, after[name] - before[name])
 
-    title = extract_title(lines_with_preds) 
 
-    outline = build_outline(lines_with_preds)
+def analyze_pdf(pdf_path, classifier, schema=None, cascade=None, metrics=None, pages=None,
+                page_ranges=None, title_only=False, layout_index=False):
+    """
+    Runs extraction, classification, title and outline building for one PDF.
+
+    Args:
+        pdf_path (str or bytes): The path to the PDF file, or its contents.
+        classifier (HeadingClassifier): The classifier used to label lines.
+        schema (dict, optional): JSON schema the result is validated against, or a
+            validator from json_schema.build_validator (faster for many documents).
+        cascade (LayoutCascade, optional): Layout-based first stage, see iter_outline.
+        metrics (DocumentMetrics, optional): Receives per-stage timings and counters.
+        pages (iterable, optional): Pre-extracted pages, see iter_outline.
+        page_ranges (tuple, optional): Only read these pages, see pdf_utils.parse_page_ranges.
+        title_only (bool): Only find the title, see extract_title_only; the
+            outline is left empty.
+        layout_index (bool): Suppress running headers and footers and merge
+            headings geometrically, see iter_outline.
+
+    Returns:
+        dict: The result with 'title' and 'outline' keys.
+    """
+    logger.info(f"Processing PDF: {document_name(pdf_path)}")
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    if title_only:
+        title = extract_title_only(pdf_path, classifier, metrics, pages, page_ranges)
+        outline = []
+    else:
+        title_tracker = TitleTracker()
+        outline = list(iter_outline(pdf_path, classifier, title_tracker, cascade, metrics, pages, page_ranges,
+                                    layout_index))
+        with metrics.stage("title"):
+            title = title_tracker.result()
+    return _make_result(pdf_path, title, outline, schema, metrics)
+
+
+def _make_result(pdf_path, title, outline, schema, metrics):
+    metrics.count("headings", len(outline))
     
     result = {
         "title": title,
@@ -113,15 +321,244 @@ def process_pdf(pdf_path, output_dir, classifier, schema=None):
     }
 
     if schema:
-        try:
-            validate_output(result, schema)
-        except jsonschema.ValidationError as e:
-            logger.error(f"Output JSON schema validation failed for {os.path.basename(pdf_path)}: {e}")
+        import jsonschema
+        with metrics.stage("validate"):
+            try:
+                validate_output(result, schema)
+            except jsonschema.ValidationError as e:
+                logger.error(f"Output JSON schema validation failed for {document_name(pdf_path)}: {e}")
+
+    return result
+
+
+def _join_pages(page_tables):
+    return LineTable.concat(page_tables, page_numbers=[p for page in page_tables for p in page.page_numbers])
+
+
+def extract_pages(pdf_path, page_ranges=None):
+    """
+    Extracts some pages of a PDF into one LineTable, unlabelled; see analyze_pdf_page_parallel.
+
+    Returns:
+        tuple: (LineTable of those pages, DocumentMetrics dict of the work).
+    """
+    metrics = DocumentMetrics(document_name(pdf_path))
+    with metrics.stage("extract"):
+        page_tables = list(iter_page_tables(pdf_path, page_ranges))
+    metrics.count("pages", len(page_tables))
+    metrics.count("lines", sum(len(page) for page in page_tables))
+    return _join_pages(page_tables), metrics.to_dict()
+
+
+def classify_pages(pdf_path, classifier, cascade=None, page_ranges=None, table=None):
+    """
+    Extracts and classifies some pages of a PDF; the unit of work of analyze_pdf_page_parallel.
+
+    With table (from extract_pages) its pages are classified instead and the
+    PDF is not opened.
+
+    Returns:
+        tuple: (labelled LineTable of those pages, DocumentMetrics dict of the work).
+    """
+    metrics = DocumentMetrics(document_name(pdf_path))
+    classifier_before = _classifier_counters(classifier)
+    if table is not None:
+        for page in table.pages():
+            _label_page(page, classifier, cascade)
+    else:
+        pages = iter_page_tables(pdf_path, page_ranges)
+        page_tables = []
+        while True:
+            with metrics.stage("extract"):
+                page = next(pages, None)
+            if page is None:
+                break
+            metrics.count("pages")
+            metrics.count("lines", len(page))
+            _label_page(page, classifier, cascade)
+            page_tables.append(page)
+        table = _join_pages(page_tables)
+    _record_classifier_metrics(metrics, classifier, classifier_before)
+    if cascade is not None:
+        metrics.count("cascade_layout_lines", cascade.layout_lines)
+    return table, metrics.to_dict()
+
+
+def analyze_pdf_page_parallel(pdf_path, executor, classify_range, schema=None, metrics=None, page_ranges=None,
+                              chunk_pages=0, workers=1, cascade=False):
+    """
+    Analyzes one PDF with its pages split across the workers of executor.
+
+    The selected pages are cut into chunks of chunk_pages consecutive pages
+    (0 = about four chunks per worker, so workers that finish early pick up
+    more). classify_range(pdf_path, page_ranges) runs on the executor and
+    returns what classify_pages returns for that chunk: each worker opens
+    the PDF itself and classifies its pages. The labelled chunks are then fed
+    to one TitleTracker and one OutlineBuilder strictly in page order, as
+    they complete, so headings continuing across a chunk boundary are merged
+    exactly as in a serial run.
+
+    With cascade=True, classify_range uses a LayoutCascade, whose body font
+    size depends on every page before the one it labels. The chunks are then
+    first extracted on the executor (extract_pages); the font sizes of their
+    pages are summed here in page order and each chunk is classified as
+    classify_range(pdf_path, None, table, chars_by_size), chars_by_size being
+    the sizes of all pages before it, so every page sees the body size a
+    serial run would.
+
+    A PDF given as bytes or as a PdfInput is written to a temporary file for
+    the duration of the call and the workers get its path, so its contents
+    are not sent (or decompressed from an archive) again for every chunk.
 
-    output_file = os.path.join(output_dir, os.path.splitext(os.path.basename(pdf_path))[0] + ".json")
+    Args:
+        pdf_path (str, bytes or PdfInput): The PDF; it is opened once here to count its pages.
+        executor (concurrent.futures.Executor): Runs classify_range.
+        classify_range (callable): See above; must be picklable for a process pool.
+        schema (dict, optional): JSON schema or validator, see analyze_pdf.
+        metrics (DocumentMetrics, optional): Receives the summed stage times and counters of all chunks.
+        page_ranges (tuple, optional): Only these pages, see pdf_utils.parse_page_ranges.
+        chunk_pages (int): Pages per chunk; 0 picks a size from workers.
+        workers (int): Workers of executor, used to size chunks.
+        cascade (bool): Whether classify_range uses a LayoutCascade, see above.
+
+    Returns:
+        dict: The result with 'title' and 'outline' keys, as analyze_pdf.
+    """
+    logger.info(f"Processing PDF: {document_name(pdf_path)}")
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    source = pdf_path
+    if isinstance(pdf_path, (PdfInput, bytes)):
+        with metrics.stage("extract"):
+            data = pdf_path.read() if isinstance(pdf_path, PdfInput) else pdf_path
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                f.write(data)
+            source = f.name
+    extracted = []
+    futures = []
+    try:
+        with metrics.stage("extract"):
+            page_numbers = selected_page_numbers(page_count(source), page_ranges)
+        if chunk_pages <= 0:
+            chunk_pages = max(1, -(-len(page_numbers) // (max(1, workers) * 4)))
+        chunks = [to_page_ranges(page_numbers[start:start + chunk_pages])
+                  for start in range(0, len(page_numbers), chunk_pages)]
+        if cascade:
+            extracted = [executor.submit(extract_pages, source, chunk) for chunk in chunks]
+        else:
+            futures = [executor.submit(classify_range, source, chunk) for chunk in chunks]
+        title, outline = _merge_chunks(source, executor, classify_range, extracted, futures, metrics)
+    finally:
+        for future in extracted + futures:
+            future.cancel()
+        if source is not pdf_path:
+            # Chunks already running may still be reading the file
+            wait(extracted + futures)
+            os.remove(source)
+    metrics.count("page_chunks", len(chunks))
+    return _make_result(pdf_path, title, outline, schema, metrics)
+
+
+def _merge_chunks(source, executor, classify_range, extracted, futures, metrics):
+    # Feeds the chunks' labelled pages to the title and outline in page order; see analyze_pdf_page_parallel
+    title_tracker = TitleTracker()
+    outline_builder = OutlineBuilder()
+    outline = []
+    layout = LayoutCascade()
+    for future in extracted:
+        table, chunk_metrics = future.result()
+        _add_chunk_metrics(metrics, chunk_metrics)
+        futures.append(executor.submit(classify_range, source, None, table, dict(layout.chars_by_size)))
+        layout.observe(table)
+    for future in futures:
+        table, chunk_metrics = future.result()
+        _add_chunk_metrics(metrics, chunk_metrics)
+        for page in table.pages():
+            with metrics.stage("title"):
+                title_tracker.add_table(page)
+            with metrics.stage("outline"):
+                outline.extend(outline_builder.add_table(page))
+    with metrics.stage("outline"):
+        outline.extend(outline_builder.finish())
+    with metrics.stage("title"):
+        title = title_tracker.result()
+    return title, outline
+
+
+def _add_chunk_metrics(metrics, chunk_metrics):
+    for stage, seconds in chunk_metrics["stages"].items():
+        metrics.add_time(stage, seconds)
+    for name, value in chunk_metrics["counters"].items():
+        metrics.count(name, value)
+
+
+def output_path_for(pdf_path, output_dir, extension=".json", input_root=None):
+    """
+    Returns <output_dir>/<pdf name><extension>.
+
+    With input_root, the PDF's subdirectory below input_root is mirrored
+    under output_dir, so same-named PDFs in different folders do not collide;
+    so are the directories in an archive member's name (utils.corpus.PdfInput).
+    """
+    name = relative_pdf_path(pdf_path, input_root)
+    subdirectory, file_name = name.rpartition("/")[::2]
+    stem = os.path.splitext(file_name)[0] + extension
+    if subdirectory:
+        return os.path.join(output_dir, *subdirectory.split("/"), stem)
+    return os.path.join(output_dir, stem)
+
+
+def write_output(result, pdf_path, output_dir, input_root=None):
+    """
+    Writes a result produced by analyze_pdf to <output_dir>/<pdf name>.json
+    (see output_path_for for input_root).
+
+    Returns:
+        str: The path of the written file.
+    """
+    output_file = output_path_for(pdf_path, output_dir, input_root=input_root)
+    if "/" in relative_pdf_path(pdf_path, input_root):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    atomic_write(output_file, dumps(result, indent=True))
+    logger.info(f"Saved output: {output_file}")
+    return output_file
+
+
+def stream_pdf_to_ndjson(pdf_path, output_dir, classifier, cascade=None, metrics=None, pages=None, page_ranges=None,
+                         input_root=None, layout_index=False):
+    """
+    Writes <output_dir>/<pdf name>.ndjson while the PDF is still being processed.
+
+    Each outline entry is written and flushed on its own line as soon as it is
+    final, so downstream consumers can start before the document is done. The
+    last line holds the title: {"title": "..."}.
+
+    Returns:
+        str: The path of the written file.
+    """
+    logger.info(f"Processing PDF: {document_name(pdf_path)}")
+    metrics = metrics if metrics is not None else DocumentMetrics(document_name(pdf_path))
+    output_file = output_path_for(pdf_path, output_dir, ".ndjson", input_root)
+    if "/" in relative_pdf_path(pdf_path, input_root):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    title_tracker = TitleTracker()
     with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+        for entry in iter_outline(pdf_path, classifier, title_tracker, cascade, metrics, pages, page_ranges,
+                                  layout_index):
+            with metrics.stage("write"):
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+            metrics.count("headings")
+        with metrics.stage("title"):
+            title = title_tracker.result()
+        with metrics.stage("write"):
+            f.write(json.dumps({"title": title}, ensure_ascii=False) + "\n")
     logger.info(f"Saved output: {output_file}")
+    return output_file
+
+
+def process_pdf(pdf_path, output_dir, classifier, schema=None):
+    result = analyze_pdf(pdf_path, classifier, schema)
+    return write_output(result, pdf_path, output_dir)
 
 # === Append this at the end of process_pdfs.py ===
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\quantize_model.py
+
+import argparse
+from utils.logger import setup_logger
+from utils.onnx_session import quantize_model, quantized_model_path
+
+logger = setup_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the fp32 ONNX heading model to a dynamic int8 model.")
+    parser.add_argument("--model_path", type=str, default="minilm_model/minilm_headings.onnx", help="Path to the fp32 ONNX model file.")
+    parser.add_argument("--output_path", type=str, help="Where to write the int8 model (default: <model>.int8.onnx, the path used by --model_mode int8).")
+    args = parser.parse_args()
+
+    output_path = quantize_model(args.model_path, args.output_path or quantized_model_path(args.model_path))
+    logger.info(f"Quantized model saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
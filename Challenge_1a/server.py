@@ -0,0 +1,182 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\server.py
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.logger import setup_logger
+from utils.heading_classifier import HeadingClassifier
+from utils.batch_scheduler import BatchScheduler
+from utils.line_cache import LineCache
+from utils.layout_cascade import LayoutCascade
+from utils.rules import configure_rules
+from utils.onnx_session import MODEL_MODES, resolve_model_path
+from utils.pdf_utils import document_name, extract_line_table
+from process_pdfs import analyze_pdf
+from json_schema import build_validator, load_schema
+from utils.json_io import dumps
+
+logger = setup_logger()
+
+# Connections the kernel queues while every request thread is busy accepting; the socketserver default of 5
+# resets clients as soon as a few dozen connect at once
+REQUEST_QUEUE_SIZE = 128
+
+
+class OutlineRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze   body is the PDF itself (Content-Type: application/pdf), or
+                    JSON {"path": "<pdf path>"} for a PDF below the server's
+                    path_root (refused when it has none);
+                    answers with the same {"title", "outline"} JSON as process_pdf.
+    GET  /health    answers with the scheduler's batching statistics.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send_json(200, {"status": "ok", "scheduler": self.server.scheduler.stats()})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+
+        if content_type == "application/json":
+            path_root = self.server.path_root
+            if path_root is None:
+                self._send_json(403, {"error": "Path requests are disabled; start the server with --path_root"})
+                return
+            try:
+                pdf = os.path.realpath(os.path.join(path_root, json.loads(body)["path"]))
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": 'Expected a JSON body {"path": "<pdf path>"}'})
+                return
+            if os.path.commonpath([pdf, path_root]) != path_root:
+                self._send_json(403, {"error": f"PDF is outside {path_root}"})
+                return
+            if not os.path.isfile(pdf):
+                self._send_json(404, {"error": f"PDF not found: {pdf}"})
+                return
+        elif body:
+            pdf = body
+        else:
+            self._send_json(400, {"error": "Empty request body"})
+            return
+
+        try:
+            # PyMuPDF must not be used from several threads at once; only classification, where
+            # the scheduler batches lines across requests, runs concurrently
+            with self.server.extract_lock:
+                table = extract_line_table(pdf)
+            cascade = LayoutCascade() if self.server.cascade else None
+            result = analyze_pdf(pdf, self.server.scheduler, self.server.schema, cascade, pages=table.pages())
+        except Exception as e:
+            logger.exception(f"Error processing {document_name(pdf)}: {e}")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send_json(200, result)
+
+    def _send_json(self, status, payload):
+        data = dumps(payload, indent=True)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # The default implementation writes to stderr and reads client_address, which is empty on unix sockets
+        logger.info(format % args)
+
+
+class OutlineHTTPServer(ThreadingHTTPServer):
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
+def make_server(scheduler, schema=None, cascade=False, host="127.0.0.1", port=8080, unix_socket=None, path_root=None):
+    """
+    Returns an HTTP server that analyzes each request on its own thread.
+
+    Documents are extracted one at a time, under a lock, as PyMuPDF is not
+    thread-safe; all request threads then classify through the shared
+    scheduler, so lines from concurrent documents are batched together. With
+    unix_socket the server listens on that path instead of host:port. JSON
+    {"path": ...} requests are only served with path_root, and only for
+    files below it.
+    """
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, OutlineRequestHandler)
+    else:
+        server = OutlineHTTPServer((host, port), OutlineRequestHandler)
+    server.scheduler = scheduler
+    server.schema = schema
+    server.cascade = cascade
+    server.path_root = os.path.realpath(path_root) if path_root else None
+    server.extract_lock = threading.Lock()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PDF outline extraction from one warm classifier.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080).")
+    parser.add_argument("--unix_socket", type=str, help="Listen on this unix socket path instead of --host/--port.")
+    parser.add_argument("--path_root", type=str, help="Serve JSON {\"path\": ...} requests for PDFs below this directory (default: such requests are refused).")
+    parser.add_argument("--model_path", type=str, default="minilm_model/minilm_headings.onnx", help="Path to the ONNX model file.")
+    parser.add_argument("--model_mode", type=str, choices=MODEL_MODES, default="fp32", help="fp32 uses --model_path as is; int8 uses its dynamically quantized variant, creating it if missing.")
+    parser.add_argument("--tokenizer_path", type=str, default="minilm_tokenizer", help="Path to the tokenizer directory.")
+    parser.add_argument("--rules_config", type=str, help="JSON file with the post-processing phrase lists (default: utils/rules.json).")
+    parser.add_argument("--schema", type=str, help="Path to the JSON schema every result is validated against (optional).")
+    parser.add_argument("--fast_start", action="store_true", help="Load the tokenizer from tokenizer.json with the lightweight `tokenizers` library instead of importing transformers.")
+    parser.add_argument("--intra_op_threads", type=int, default=0, help="onnxruntime threads per operator (default: 0, all cores).")
+    parser.add_argument("--optimized_model_dir", type=str, help="Cache the onnxruntime-optimized graph here and load it on later starts (optional).")
+    parser.add_argument("--line_cache_size", type=int, default=100000, help="Entries in the LRU cache of line classifications (0 disables it).")
+    parser.add_argument("--cascade", action="store_true", help="Label obvious body text from layout features and run the model only on the remaining lines.")
+    parser.add_argument("--max_batch_size", type=int, default=256, help="Most lines merged into one inference batch (default: 256).")
+    parser.add_argument("--max_wait_ms", type=float, default=5.0, help="Longest a batch waits for lines from other requests before running (default: 5).")
+    args = parser.parse_args()
+
+    configure_rules(args.rules_config)
+    schema = build_validator(load_schema(args.schema)) if args.schema else None
+    line_cache = LineCache(args.line_cache_size) if args.line_cache_size > 0 else None
+    classifier = HeadingClassifier(resolve_model_path(args.model_path, args.model_mode), args.tokenizer_path,
+                                   line_cache=line_cache, fast_start=args.fast_start,
+                                   session_config={"intra_op_threads": args.intra_op_threads,
+                                                   "optimized_model_dir": args.optimized_model_dir})
+    scheduler = BatchScheduler(classifier, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    server = make_server(scheduler, schema, args.cascade, args.host, args.port, args.unix_socket, args.path_root)
+    # Container runtimes stop services with SIGTERM; leave through the same cleanup as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logger.info(f"Serving on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.close()
+        logger.info(f"Scheduler: {scheduler.stats()}")
+        if line_cache is not None:
+            logger.info(f"Line cache: {line_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\conftest.py
+
+import os
+import sys
+
+# The modules import each other as top-level packages (utils.*, process_pdfs), as when run from Challenge_1a
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,134 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_corpus.py
+
+import io
+import json
+import tarfile
+
+import pytest
+
+from utils.corpus import Quarantine, WorkManifest, parse_shard, read_stream_pdfs, shard_of
+
+
+@pytest.mark.parametrize("spec, expected", [("0/1", (0, 1)), ("3/4", (3, 4)), ("0/16", (0, 16))])
+def test_parse_shard(spec, expected):
+    assert parse_shard(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["4/4", "-1/2", "1/0", "1", "a/b", "1/2/3", ""])
+def test_parse_shard_rejects_malformed(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+
+def test_shards_partition_the_corpus_stably():
+    names = [f"dir{i % 7}/doc{i}.pdf" for i in range(400)]
+    shards = [shard_of(name, 4) for name in names]
+    assert set(shards) == {0, 1, 2, 3}
+    assert shards == [shard_of(name, 4) for name in names]
+    # A hash of the name, not of Python's per-process hash()
+    assert shard_of("a/b.pdf", 1000) == 528
+
+
+def test_manifest_resume_skips_completed(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = WorkManifest(path, resume=True)
+    manifest.mark_completed("a.pdf", "a.json")
+    manifest.mark_completed("sub/b.pdf", "sub/b.json")
+    manifest.close()
+
+    resumed = WorkManifest(path, resume=True)
+    assert resumed.is_completed("a.pdf") and resumed.is_completed("sub/b.pdf")
+    assert not resumed.is_completed("c.pdf")
+    resumed.mark_completed("c.pdf")
+    resumed.close()
+    assert WorkManifest(path, resume=True).completed == {"a.pdf", "sub/b.pdf", "c.pdf"}
+
+
+def test_manifest_without_resume_starts_over(tmp_path):
+    path = str(tmp_path / "manifest.jsonl")
+    manifest = WorkManifest(path)
+    manifest.mark_completed("a.pdf")
+    manifest.close()
+    fresh = WorkManifest(path)
+    assert not fresh.is_completed("a.pdf")
+    fresh.close()
+    assert WorkManifest(path, resume=True).completed == set()
+
+
+def test_manifest_ignores_line_cut_off_by_a_crash(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(json.dumps({"pdf": "a.pdf"}) + "\n" + '{"pdf": "b.p')
+    manifest = WorkManifest(str(path), resume=True)
+    assert manifest.completed == {"a.pdf"}
+    manifest.mark_completed("c.pdf")
+    manifest.close()
+    assert WorkManifest(str(path), resume=True).completed == {"a.pdf", "c.pdf"}
+
+
+def test_quarantine_persists_across_runs(tmp_path):
+    path = str(tmp_path / "quarantine.jsonl")
+    quarantine = Quarantine(path)
+    assert len(quarantine) == 0 and not (tmp_path / "quarantine.jsonl").exists() # Created on first write
+    quarantine.add("slow.pdf", "DocumentTimeout: exceeded 30s")
+    quarantine.add("big.pdf", "MemoryLimitExceeded: worker reached 900 MiB (limit 512 MiB)")
+    quarantine.close()
+
+    later = Quarantine(path)
+    assert "slow.pdf" in later and "big.pdf" in later and "ok.pdf" not in later
+    assert later.reasons["slow.pdf"] == "DocumentTimeout: exceeded 30s"
+    later.release("slow.pdf") # Retried with a larger limit and succeeded
+    later.release("ok.pdf") # Not quarantined, nothing written
+    later.close()
+    assert Quarantine(path).reasons == {"big.pdf": "MemoryLimitExceeded: worker reached 900 MiB (limit 512 MiB)"}
+    assert len((tmp_path / "quarantine.jsonl").read_text().splitlines()) == 3
+
+
+def test_quarantine_ignores_line_cut_off_by_a_crash(tmp_path):
+    path = tmp_path / "quarantine.jsonl"
+    path.write_text(json.dumps({"pdf": "a.pdf", "reason": "WorkerCrashed: exit code -9"}) + "\n" + '{"pdf": "b.p')
+    quarantine = Quarantine(str(path))
+    assert set(quarantine.reasons) == {"a.pdf"}
+    quarantine.add("c.pdf", "DocumentTimeout: exceeded 1s")
+    quarantine.close()
+    assert set(Quarantine(str(path)).reasons) == {"a.pdf", "c.pdf"}
+
+
+class TrickleStream(io.RawIOBase):
+    """A pipe-like raw stream delivering at most `step` bytes per read."""
+
+    def __init__(self, data, step):
+        self.data = data
+        self.step = step
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.step)
+        chunk, self.data = self.data[:size], self.data[size:]
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+@pytest.mark.parametrize("step", [1, 3, 4096])
+def test_stream_pdf_read_in_small_pieces(step):
+    # Like sys.stdin.buffer on a pipe, whose peek() returns only what one read delivered
+    data = b"%PDF-1.4\n" + b"x" * 10000
+    inputs = read_stream_pdfs(io.BufferedReader(TrickleStream(data, step)), "in.pdf")
+    assert [(pdf.name, pdf.read()) for pdf in inputs] == [("in.pdf", data)]
+
+
+def test_stream_tar_keeps_only_pdf_members():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in [("a.pdf", b"%PDF-a"), ("notes.txt", b"text"), ("sub/b.PDF", b"%PDF-b"), ("../c.pdf", b"%PDF-c")]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    stream = io.BufferedReader(TrickleStream(buffer.getvalue(), 7))
+    assert [(pdf.name, pdf.read()) for pdf in read_stream_pdfs(stream)] == [("a.pdf", b"%PDF-a"), ("sub/b.PDF", b"%PDF-b")]
+
+
+def test_stream_that_is_neither_pdf_nor_archive():
+    with pytest.raises(ValueError):
+        read_stream_pdfs(io.BytesIO(b"hello world"))
@@ -0,0 +1,97 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_heading_classifier.py
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import utils.heading_classifier as heading_classifier
+from utils.heading_classifier import HeadingClassifier
+from utils.line_cache import LineCache
+
+
+class FakeTokenizer:
+    """Word-level stand-in for the WordPiece tokenizer, with the call signatures HeadingClassifier uses."""
+
+    pad_token_id = 0
+
+    def _ids(self, text, max_length):
+        ids = [101] + [1000 + sum(map(ord, word)) % 5000 for word in text.split()] + [102]
+        return ids[:max_length]
+
+    def __call__(self, texts, return_tensors=None, truncation=True, padding=False, max_length=128):
+        if isinstance(texts, str):
+            # The per-line path: one text padded to max_length, as numpy arrays
+            ids = self._ids(texts, max_length)
+            input_ids = np.zeros((1, max_length), dtype=np.int64)
+            input_ids[0, :len(ids)] = ids
+            attention_mask = (input_ids != 0).astype(np.int64)
+            return {"input_ids": input_ids, "attention_mask": attention_mask,
+                    "token_type_ids": np.zeros_like(input_ids)}
+        input_ids = [self._ids(text, max_length) for text in texts]
+        return {"input_ids": input_ids, "token_type_ids": [[0] * len(ids) for ids in input_ids]}
+
+
+class FakeSession:
+    """A model whose logits depend only on the unpadded tokens, like the real masked encoder."""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name=name) for name in ("input_ids", "attention_mask", "token_type_ids")]
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="logits")]
+
+    def run(self, output_names, input_feed):
+        input_ids, attention_mask = input_feed["input_ids"], input_feed["attention_mask"]
+        self.batch_shapes.append(input_ids.shape)
+        scores = (input_ids * attention_mask).sum(axis=1) + attention_mask.sum(axis=1)
+        logits = np.zeros((len(input_ids), 5), dtype=np.float32)
+        logits[np.arange(len(input_ids)), scores % 5] = 1.0
+        return [logits]
+
+
+@pytest.fixture
+def make_classifier(monkeypatch):
+    monkeypatch.setattr(heading_classifier, "load_tokenizer", lambda path, fast_start=False: FakeTokenizer())
+    monkeypatch.setattr(heading_classifier, "create_session", lambda path, config=None: FakeSession())
+    return lambda **kwargs: HeadingClassifier("model.onnx", "tokenizer", **kwargs)
+
+
+def random_lines(rng, count):
+    words = ["Introduction", "1.", "2.1", "Background", "the", "of", "results", "Appendix", "A:", "Table",
+             "of", "Contents", "Revision", "History", "we", "show", "that", "Summary", "Phase", "I"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("batch_size", [1, 7, 64])
+def test_predict_batch_matches_predict(make_classifier, seed, batch_size):
+    texts = random_lines(random.Random(seed), 150)
+    expected = [make_classifier().predict(text) for text in texts]
+    assert make_classifier().predict_batch(texts, batch_size=batch_size) == expected
+
+
+def test_batches_are_padded_to_their_longest_line(make_classifier):
+    classifier = make_classifier()
+    texts = ["word " * n for n in (30, 1, 10, 2, 20, 3)]
+    classifier.predict_batch(texts, batch_size=2)
+    # Length-sorted: the short lines share batches instead of being padded to the longest one
+    assert classifier.session.batch_shapes == [(2, 4), (2, 12), (2, 32)]
+
+
+def test_predict_batch_with_line_cache(make_classifier):
+    texts = random_lines(random.Random(0), 100)
+    texts += [f"  {text}  " for text in texts[:20]] # Same lines up to whitespace
+    expected = [make_classifier().predict(text) for text in texts]
+    classifier = make_classifier(line_cache=LineCache())
+    assert classifier.predict_batch(texts) == expected
+    assert classifier.model_lines == len({LineCache.normalize(text) for text in texts})
+    assert classifier.predict_batch(texts) == expected
+
+
+def test_predict_batch_of_nothing(make_classifier):
+    assert make_classifier().predict_batch([]) == []
@@ -0,0 +1,60 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_json_io.py
+
+import json
+import os
+
+from utils.json_io import JsonlSink, dumps
+
+
+def read_parts(directory):
+    parts = sorted(name for name in os.listdir(directory) if name.endswith(".jsonl"))
+    return {name: [json.loads(line) for line in open(os.path.join(directory, name), encoding="utf-8")] for name in parts}
+
+
+def test_dumps_indent_matches_json_module():
+    record = {"title": "Überblick", "outline": [{"level": "H1", "text": "Ä", "page_no": 1}]}
+    assert dumps(record, indent=True) == json.dumps(record, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def test_rotates_parts_at_max_bytes(tmp_path):
+    record = {"file": "x.pdf", "title": "t" * 40}
+    line_size = len(dumps(dict(record, n=0))) + 1
+    sink = JsonlSink(str(tmp_path), max_bytes=line_size * 3)
+    paths = [sink.write(dict(record, n=i)) for i in range(7)]
+    sink.close()
+    parts = read_parts(str(tmp_path))
+    assert list(parts) == ["results-00000.jsonl", "results-00001.jsonl", "results-00002.jsonl"]
+    assert [len(records) for records in parts.values()] == [3, 3, 1]
+    assert [os.path.basename(path) for path in paths] == ["results-00000.jsonl"] * 3 + ["results-00001.jsonl"] * 3 + ["results-00002.jsonl"]
+    assert [r["n"] for records in parts.values() for r in records] == list(range(7))
+
+
+def test_a_new_run_replaces_earlier_parts(tmp_path):
+    for _ in range(2):
+        sink = JsonlSink(str(tmp_path), max_bytes=1)
+        for i in range(3):
+            sink.write({"file": f"{i}.pdf"})
+        sink.close()
+    parts = read_parts(str(tmp_path))
+    assert sum(len(records) for records in parts.values()) == 3
+
+
+def test_append_continues_last_part_and_drops_truncated_line(tmp_path):
+    sink = JsonlSink(str(tmp_path))
+    sink.write({"file": "a.pdf"})
+    sink.close()
+    with open(sink.path, "ab") as f:
+        f.write(b'{"file": "b.p')
+
+    sink = JsonlSink(str(tmp_path), append=True)
+    sink.write({"file": "c.pdf"})
+    sink.close()
+    assert read_parts(str(tmp_path)) == {"results-00000.jsonl": [{"file": "a.pdf"}, {"file": "c.pdf"}]}
+
+
+def test_flush_makes_buffered_lines_visible(tmp_path):
+    sink = JsonlSink(str(tmp_path))
+    sink.write({"file": "a.pdf"})
+    sink.flush()
+    assert read_parts(str(tmp_path)) == {"results-00000.jsonl": [{"file": "a.pdf"}]}
+    sink.close()
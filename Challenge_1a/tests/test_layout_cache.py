@@ -0,0 +1,108 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_layout_cache.py
+
+import os
+
+import numpy as np
+import pytest
+
+from utils.layout_cache import LayoutCache, load_table, serialize_table
+from utils.line_table import LineTable
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_dataset", "pdfs", "file03.pdf")
+
+
+def make_table():
+    lines = [
+        {"text": "Überschrift", "page_no": 1, "bbox": (10.0, 20.0, 200.0, 34.5), "font_size": 16.0, "bold": True, "font": "Helvetica-Bold"},
+        {"text": "body text ✓", "page_no": 1, "bbox": (10.0, 40.0, 300.0, 50.0), "font_size": 10.0, "font": "Helvetica"},
+        {"text": "", "page_no": 3, "bbox": (0.0, 0.0, 0.0, 0.0)},
+        {"text": "last line", "page_no": 3, "bbox": (12.0, 700.0, 90.0, 712.0), "font_size": 10.0, "font": "Helvetica"},
+    ]
+    # Page 2 has no text but is part of the document
+    return LineTable.from_lines(lines, page_numbers=[1, 2, 3])
+
+
+def assert_same_layout(loaded, table):
+    assert loaded.texts() == table.texts()
+    assert loaded.fonts == table.fonts
+    assert list(loaded.page_numbers) == list(table.page_numbers)
+    for name in ("text_offsets", "page_no", "bbox", "font_size", "bold", "font_id"):
+        column, expected = getattr(loaded, name), getattr(table, name)
+        assert column.dtype == expected.dtype and np.array_equal(column, expected), name
+
+
+def test_serialized_table_round_trips(tmp_path):
+    table = make_table()
+    path = tmp_path / "table.lines"
+    path.write_bytes(serialize_table(table))
+    loaded = load_table(str(path))
+    assert_same_layout(loaded, table)
+    # Labels are not part of the layout
+    assert (loaded.label == -1).all()
+    assert [page.page_numbers for page in loaded.pages()] == [[1], [2], [3]]
+    assert [len(page) for page in loaded.pages()] == [2, 0, 2]
+
+
+def test_empty_table_round_trips(tmp_path):
+    table = LineTable.from_lines([], page_numbers=[1])
+    path = tmp_path / "empty.lines"
+    path.write_bytes(serialize_table(table))
+    loaded = load_table(str(path))
+    assert len(loaded) == 0 and loaded.page_numbers == [1]
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "table.lines"
+    path.write_bytes(serialize_table(make_table())[:-3])
+    with pytest.raises(ValueError):
+        load_table(str(path))
+
+
+def test_cache_hits_misses_and_keys(tmp_path):
+    cache = LayoutCache(str(tmp_path), {"text_flags": "default"})
+    key = cache.key(SAMPLE_PDF)
+    assert cache.load(key) is None
+    cache.store(key, make_table())
+    assert_same_layout(cache.load(key), make_table())
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    assert cache.key(SAMPLE_PDF, ((1, 2),)) != key
+    assert LayoutCache(str(tmp_path), {"text_flags": "-images"}).key(SAMPLE_PDF) != key
+    with open(SAMPLE_PDF, "rb") as f:
+        # Keyed by content, so the same bytes from memory hit the same entry
+        assert cache.key(f.read()) == key
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = LayoutCache(str(tmp_path))
+    key = cache.key(SAMPLE_PDF)
+    cache.store(key, make_table())
+    with open(cache._path(key), "wb") as f:
+        f.write(b"garbage")
+    assert cache.load(key) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_document_cut_short_is_not_cached(tmp_path, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    from utils import pdf_utils
+
+    monkeypatch.setattr(pdf_utils, "_layout_cache", LayoutCache(str(tmp_path)))
+    get_text = fitz.Page.get_text
+    calls = []
+
+    def failing_third_page(page, *args, **kwargs):
+        calls.append(page.number)
+        if len(calls) == 3:
+            raise RuntimeError("unreadable page")
+        return get_text(page, *args, **kwargs)
+
+    monkeypatch.setattr(fitz.Page, "get_text", failing_third_page)
+    assert len(list(pdf_utils.iter_page_tables(SAMPLE_PDF))) == 2
+    monkeypatch.setattr(fitz.Page, "get_text", get_text)
+
+    complete = list(pdf_utils.iter_page_tables(SAMPLE_PDF))
+    assert len(complete) > 2
+    cached = list(pdf_utils.iter_page_tables(SAMPLE_PDF))
+    assert [page.texts() for page in cached] == [page.texts() for page in complete]
+    assert pdf_utils.get_layout_cache().stats()["hits"] == 1
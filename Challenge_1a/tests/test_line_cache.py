@@ -0,0 +1,104 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_line_cache.py
+
+import json
+import random
+
+import pytest
+
+from utils.line_cache import LineCache
+
+
+class ReferenceLRU:
+    """The textbook LRU: a list ordered from least to most recently used."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = []
+
+    def get(self, key):
+        for i, (k, label) in enumerate(self.items):
+            if k == key:
+                self.items.append(self.items.pop(i))
+                return label
+        return None
+
+    def put(self, key, label):
+        self.items = [(k, v) for k, v in self.items if k != key] + [(key, label)]
+        del self.items[:-self.maxsize]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("maxsize", [1, 3, 10])
+def test_matches_reference_lru(seed, maxsize):
+    rng = random.Random(seed)
+    cache, reference = LineCache(maxsize), ReferenceLRU(maxsize)
+    for _ in range(300):
+        key = f"line {rng.randrange(15)}"
+        if rng.random() < 0.5:
+            assert cache.get(key) == reference.get(key)
+        else:
+            label = rng.choice(["H1", "H2", "text"])
+            cache.put(key, label)
+            reference.put(key, label)
+        assert len(cache) == len(reference.items)
+    assert list(cache._entries.items()) == reference.items
+
+
+def test_get_refreshes_recency():
+    cache = LineCache(2)
+    cache.put("a", "H1")
+    cache.put("b", "text")
+    assert cache.get("a") == "H1"
+    cache.put("c", "H2") # Evicts b, the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == "H1" and cache.get("c") == "H2"
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "size": 2}
+
+
+def test_normalize_collapses_whitespace():
+    assert LineCache.normalize("  1.  Introduction\t\n") == "1. Introduction"
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "lines.json")
+    cache = LineCache()
+    for i in range(50):
+        cache.put(f"line {i}", ["H1", "text"][i % 2])
+    cache.save(path, "fp")
+
+    loaded = LineCache()
+    loaded.load(path, "fp")
+    assert list(loaded._entries.items()) == list(cache._entries.items())
+
+
+def test_load_ignores_other_fingerprint_and_unreadable_file(tmp_path):
+    path = tmp_path / "lines.json"
+    cache = LineCache()
+    cache.put("a", "H1")
+    cache.save(str(path), "fp")
+    other = LineCache()
+    other.load(str(path), "other model")
+    assert len(other) == 0
+
+    path.write_text('{"fingerprint": "fp", "entr')
+    other.load(str(path), "fp")
+    assert len(other) == 0
+    other.load(str(tmp_path / "missing.json"), "fp")
+    assert len(other) == 0
+
+
+def test_save_merges_with_file_and_keeps_most_recent(tmp_path):
+    path = str(tmp_path / "lines.json")
+    first = LineCache(3)
+    first.put("a", "H1")
+    first.put("b", "H2")
+    first.save(path, "fp")
+
+    second = LineCache(3)
+    second.put("c", "H3")
+    second.put("a", "text")
+    second.put("d", "H4")
+    second.save(path, "fp")
+    with open(path, encoding="utf-8") as f:
+        # b is the oldest entry once both processes' entries are merged, so it goes
+        assert json.load(f)["entries"] == {"c": "H3", "a": "text", "d": "H4"}
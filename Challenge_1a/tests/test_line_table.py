@@ -0,0 +1,99 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_line_table.py
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+from utils.line_table import UNLABELLED, LineTable
+from utils.pdf_utils import extract_line_table, iter_page_lines, iter_page_tables
+
+SAMPLE_PDFS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_dataset", "pdfs")
+
+
+def random_line_dicts(seed, pages=6):
+    """Line dicts as pdf_utils produced them before LineTable, page by page; bboxes are exact in float32."""
+    rng = random.Random(seed)
+    page_lines = []
+    for page_no in range(1, pages + 1):
+        lines = []
+        for _ in range(rng.choice([0, 1, 5, 20])):
+            line = {
+                'text': " ".join(rng.choice(["Über", "1.", "Intro", "the", "日本語", "x"]) for _ in range(rng.randint(1, 6))),
+                'page_no': page_no,
+                'bbox': tuple(rng.randrange(0, 2400) / 4 for _ in range(4)),
+                'font_size': round(rng.uniform(6, 30), 2),
+                'bold': rng.random() < 0.3,
+                'font': rng.choice(["Arial", "Arial-Bold", "Times", ""]),
+            }
+            if rng.random() < 0.5:
+                line['heading_level'] = rng.choice(['H1', 'H2', 'H3', 'H4', 'text'])
+            lines.append(line)
+        page_lines.append(lines)
+    return page_lines
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_from_lines_round_trips(seed):
+    lines = [line for page in random_line_dicts(seed) for line in page]
+    table = LineTable.from_lines(lines)
+    assert len(table) == len(lines)
+    assert list(table) == lines
+    assert table.texts() == [line['text'] for line in lines]
+    assert table.text_lengths().tolist() == [len(line['text']) for line in lines]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_concat_of_pages_equals_whole_document(seed):
+    page_lines = random_line_dicts(seed)
+    pages = [LineTable.from_lines(lines, page_numbers=[page_no]) for page_no, lines in enumerate(page_lines, 1)]
+    table = LineTable.concat(pages, page_numbers=list(range(1, len(page_lines) + 1)))
+    assert list(table) == [line for lines in page_lines for line in lines]
+    # pages() gives back every page, the empty ones too
+    assert [list(page) for page in table.pages()] == page_lines
+    assert [page.page_numbers for page in table.pages()] == [[page_no] for page_no in range(1, len(page_lines) + 1)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_slice_take_and_labels(seed):
+    rng = random.Random(seed)
+    lines = [line for page in random_line_dicts(seed) for line in page]
+    table = LineTable.from_lines(lines)
+    start = rng.randrange(len(lines) + 1)
+    stop = rng.randrange(start, len(lines) + 1)
+    assert list(table.slice(start, stop)) == lines[start:stop]
+    rows = sorted(rng.sample(range(len(lines)), len(lines) // 2))
+    assert list(table.take(rows)) == [lines[i] for i in rows]
+    assert list(table.take(np.isin(np.arange(len(lines)), rows))) == [lines[i] for i in rows]
+
+    # Labels set on a slice land in the table
+    labels = [rng.choice(['H1', 'H2', 'H3', 'H4', 'text']) for _ in range(stop - start)]
+    table.slice(start, stop).set_labels(labels)
+    assert [table.label_at(i) for i in range(start, stop)] == labels
+    expected_headings = [i for i in range(len(lines)) if table.label_at(i) in ('H1', 'H2', 'H3', 'H4')]
+    assert table.heading_rows().tolist() == expected_headings
+
+
+def test_empty_table():
+    table = LineTable.concat([], page_numbers=[1, 2])
+    assert len(table) == 0 and list(table) == []
+    assert [len(page) for page in table.pages()] == [0, 0]
+    assert LineTable.from_lines([]).label.tolist() == []
+
+
+def test_unlabelled_rows_have_no_heading_level():
+    table = LineTable.from_lines([{'text': "a", 'page_no': 1, 'bbox': (0, 0, 1, 1)}])
+    assert table.label.tolist() == [UNLABELLED]
+    assert 'heading_level' not in table.row(0)
+
+
+@pytest.mark.skipif(not os.path.isdir(SAMPLE_PDFS), reason="sample PDFs not present")
+@pytest.mark.parametrize("name", ["file01.pdf", "file02.pdf", "file03.pdf", "file04.pdf", "file05.pdf"])
+def test_tables_match_line_dicts_from_pdf(name):
+    pdf_path = os.path.join(SAMPLE_PDFS, name)
+    # The table keeps bboxes as float32
+    expected = [[dict(line, bbox=tuple(float(np.float32(v)) for v in line['bbox'])) for line in page]
+                for page in iter_page_lines(pdf_path)]
+    assert [list(page) for page in iter_page_tables(pdf_path)] == expected
+    assert list(extract_line_table(pdf_path)) == [line for page in expected for line in page]
@@ -0,0 +1,44 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_metrics.py
+
+import re
+
+from utils.metrics import DocumentMetrics, RunMetrics
+
+
+def finished_document(name, extract_s, lines):
+    document = DocumentMetrics(name)
+    document.add_time("extract", extract_s)
+    document.count("lines", lines)
+    document.finish()
+    return document.to_dict()
+
+
+def test_prometheus_textfile_follows_naming_conventions(tmp_path):
+    run = RunMetrics()
+    run.add(finished_document("a.pdf", 0.5, 10))
+    run.add(finished_document("b.pdf", 0.25, 5), ok=False)
+    path = tmp_path / "run.prom"
+    run.write_prometheus(str(path))
+
+    types = {}
+    samples = {}
+    for line in path.read_text().splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+
+    # Last-run values are gauges, which must not use the counter suffix or the summary label
+    assert set(types.values()) == {"gauge"}
+    assert not [name for name in types if name.endswith("_total")]
+    assert not [sample for sample in samples if "quantile=" in sample]
+    for sample in samples:
+        assert re.match(r"[a-z_]+", sample).group() in types, sample
+
+    assert samples['pdf_outline_documents{outcome="succeeded"}'] == 1
+    assert samples['pdf_outline_documents{outcome="failed"}'] == 1
+    assert samples['pdf_outline_stage_seconds{stage="extract"}'] == 0.75
+    assert samples['pdf_outline_counter{name="lines"}'] == 15
+    assert 'pdf_outline_document_latency_seconds{stat="p99"}' in samples
@@ -0,0 +1,123 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_outline_builder.py
+
+import random
+
+import pytest
+
+from utils.line_table import LineTable
+from utils.outline_builder import OutlineBuilder, build_outline
+
+
+def reference_build_outline(lines_with_preds):
+    """The original two-pass build_outline, kept verbatim (logging aside) as the reference for the streaming builder."""
+    outline = []
+    current_heading = None
+    for line in lines_with_preds:
+        level = line.get('heading_level')
+        text = line.get('text', '').strip()
+        page_no = line['page_no']
+
+        if level not in ['H1', 'H2', 'H3', 'H4']:
+            continue
+        if len(text) <= 3 and text.replace('.', '', 1).isdigit():
+            continue
+        if len(text.split()) <= 1 and not text.isupper() and not text.istitle():
+            continue
+        common_non_headings = ["S.No", "Name", "Age", "Relationship", "Rs.", "Date", "Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the"]
+        if text in common_non_headings:
+            continue
+        if not text or len(text) < 2:
+            continue
+        blacklist_words = ["Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the", "S.No", "Name", "Age", "Relationship", "Rs.", "Date"]
+        if level in ['H1', 'H2'] and text in blacklist_words:
+            continue
+
+        if current_heading and \
+           current_heading['level'] == level and \
+           current_heading['page_no'] == page_no and \
+           (len(current_heading['text'].split()) < 10 or current_heading['text'].endswith(('.', '-', ':', ';', ','))):
+            if len(text) > 2:
+                current_heading['text'] += " " + text
+        else:
+            if current_heading:
+                outline.append(current_heading)
+            current_heading = {"level": level, "text": text, "page_no": page_no}
+
+    if current_heading:
+        outline.append(current_heading)
+
+    final_outline = []
+    i = 0
+    while i < len(outline):
+        item = outline[i]
+        if i + 1 < len(outline):
+            next_item = outline[i + 1]
+            if item['level'] == next_item['level'] and \
+               item['page_no'] == next_item['page_no'] and \
+               (item['text'].endswith(('.', '-', ':', ';', ',')) or len(next_item['text'].split()) < 5):
+                item['text'] += " " + next_item['text']
+                i += 1
+        final_outline.append(item)
+        i += 1
+    return final_outline
+
+
+WORDS = ["Introduction", "overview", "Plan", "the", "ODL", "Funding", "of", "and", "Appendix", "timeline", "Name", "Date"]
+NOISE = ["1.", "2", "x", "Name", "rail", "S.No", "word", "A", "PAY"]
+ENDINGS = ["", "", "", ".", ":", ",", "-", ";"]
+
+
+def random_lines(seed, count=200, pages=6):
+    rng = random.Random(seed)
+    lines = []
+    page_no = 1
+    for _ in range(count):
+        if page_no < pages and rng.random() < 0.08:
+            page_no += 1
+        if rng.random() < 0.15:
+            text = rng.choice(NOISE)
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) + rng.choice(ENDINGS)
+        if rng.random() < 0.1:
+            text = f"  {text} "
+        level = rng.choice(["H1", "H1", "H2", "H2", "H3", "H4", "text", "text", None])
+        line = {"text": text, "page_no": page_no, "bbox": (50.0, 10.0, 300.0, 22.0), "font_size": 12.0}
+        if level is not None:
+            line["heading_level"] = level
+        lines.append(line)
+    return lines
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_streaming_builder_matches_two_pass_merge(seed):
+    lines = random_lines(seed)
+    assert build_outline(lines) == reference_build_outline(lines)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_table_pages_fed_one_by_one_match_two_pass_merge(seed):
+    # iter_outline and analyze_pdf_page_parallel feed one page view at a time
+    lines = random_lines(seed)
+    expected = reference_build_outline(lines)
+    table = LineTable.from_lines(lines, page_numbers=list(range(1, 7)))
+    assert build_outline(table) == expected
+
+    builder = OutlineBuilder()
+    outline = []
+    for page in table.pages():
+        outline.extend(builder.add_table(page))
+    outline.extend(builder.finish())
+    assert outline == expected
+
+
+def test_entries_are_released_as_soon_as_they_are_final():
+    builder = OutlineBuilder()
+    first = {"text": "Background of the Project", "page_no": 1, "heading_level": "H1"}
+    second = {"text": "Scope and Timeline Details", "page_no": 2, "heading_level": "H1"}
+    third = {"text": "Budget Summary For All Phases", "page_no": 3, "heading_level": "H2"}
+    assert builder.add(first) == []
+    # The first heading is complete but may still absorb the next one
+    assert builder.add(second) == []
+    assert builder.add(third) == [{"level": "H1", "text": "Background of the Project", "page_no": 1}]
+    assert builder.finish() == [{"level": "H1", "text": "Scope and Timeline Details", "page_no": 2},
+                                {"level": "H2", "text": "Budget Summary For All Phases", "page_no": 3}]
@@ -0,0 +1,183 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_rules.py
+
+import random
+
+import pytest
+
+from utils.rules import (DEFAULT_RULES_CONFIG, INVITATION, TITLE_EXCLUDE, TITLE_NOISE, TITLE_PRIORITY, PhraseMatcher,
+                         RuleEngine, normalize_text)
+
+
+# --- Reference: the rules as they were inlined before RuleEngine, copied verbatim ---
+
+TITLE_EXCLUDE_PHRASES = [
+    "you're invited", "to a party", "hope to see you there", "www.",
+    "pigeon forge, tn 37863", # The problematic title
+    "address:", "topjump 3735 parkway", "(near dixie stampede on the parkway)", # Parts of the address/location
+    "closed toed shoes are required for climbing", # The rule
+    "please visit topjump.com to fill out waiver so your child can attend. hope to see y ou t here ! www.topjump.com" # Long instruction
+]
+
+
+def reference_apply_rules(text, predicted_label):
+    text_stripped = text.strip()
+
+    if predicted_label == 'text':
+        return 'text'
+
+    # Rule 1: Demote if text is purely numeric or numeric with single dot/bracket
+    if len(text_stripped) <= 5 and (text_stripped.replace('.', '', 1).isdigit() or \
+                                   text_stripped.replace(')', '', 1).isdigit() or \
+                                   (text_stripped.startswith('(') and text_stripped.endswith(')') and text_stripped[1:-1].isdigit())):
+        return 'text'
+
+    # Rule 2: Demote very short, non-alphanumeric/non-sentence-like strings (e.g., "---", "###")
+    if len(text_stripped) < 3 and not any(char.isalnum() for char in text_stripped):
+         return 'text'
+
+    # Rule 3: Demote common column headers, generic single words, or specific phrases often misclassified
+    common_non_heading_words_or_phrases = {
+        "s.no", "name", "age", "relationship", "rs.", "date",
+        "service", "pay", "designation", "single", "rail", "fare/bus", "fare", "from", "the",
+        "whether", "i declare", "amount", "persons", "home town", "signature",
+        "for:", "date:", "time:", "address:", "rsvp:", # From file05.pdf, labels
+        "closed toed shoes are required for climbing", # Specific rule from file05.pdf
+        "parents or guardians not attending the party, please visit topjump.com to fill out waiver so your child can attend.", # Specific long note from file05.pdf
+        "hope to see you there!", # Closing remark from file05.pdf
+        "www.topjump.com", # URL from file05.pdf
+        "pigeon forge, tn 37863", # New: the misidentified title and part of outline item
+        "topjump 3735 parkway pigeon forge, tn 37863", # New: full address from outline
+        "(near dixie stampede on the parkway)", # New: location detail from outline
+        "please visit topjump.com to fill out waiver so your child can attend. hope to see y ou t here ! www.topjump.com", # New: combined long instruction
+    }
+
+    # Normalize text for comparison (remove extra spaces, lower case)
+    normalized_text = " ".join(text_stripped.split()).lower()
+
+    if normalized_text in common_non_heading_words_or_phrases:
+        return 'text'
+
+    # Check for single word classifications that are often mislabeled (retained)
+    if len(text_stripped.split()) == 1:
+        if normalized_text in common_non_heading_words_or_phrases:
+            return 'text'
+        if not text_stripped[0].isupper() and not text_stripped.isupper():
+            return 'text'
+
+    # Rule 4: Demote if it's a very short line that starts with a lowercase letter (unlikely to be a main heading) (retained)
+    if len(text_stripped) < 15 and text_stripped and text_stripped[0].islower() and ' ' in text_stripped:
+        return 'text'
+
+    # Rule 5: Catch multi-line sentences being broken into "headings" (retained)
+    if text_stripped and text_stripped[-1] in [',', ';', '-', '—'] and len(text_stripped) > 10:
+         return 'text'
+
+    # Rule 6: Specific rule for short, high-level classifications that are not typical headings. (retained)
+    if predicted_label in ['H1', 'H2'] and len(text_stripped.split()) <= 5:
+        if not (text_stripped.split()[0].isdigit() or text_stripped.split()[0].lower() in ['i', 'ii', 'iii', 'iv', 'v']):
+            invitation_phrases = ["you're invited", "to a party", "hope to see you there"]
+            if any(phrase in normalized_text for phrase in invitation_phrases):
+                return 'text'
+
+    return predicted_label
+
+
+def reference_title_checks(text):
+    """(priority, excluded, noise) as TitleTracker.add computed them."""
+    normalized_text = " ".join(text.split()).lower()
+    priority = "topjump trampoline park" in normalized_text
+    excluded = any(phrase in normalized_text for phrase in TITLE_EXCLUDE_PHRASES)
+    noise = "copyright" in text.lower() or "version" in text.lower() or "page" in text.lower() or "signature" in text.lower()
+    return priority, excluded, noise
+
+
+def reference_outline_noise(text, level):
+    if len(text) <= 3 and text.replace('.', '', 1).isdigit(): # "1.", "2.", "3."
+        return True
+    if len(text.split()) <= 1 and not text.isupper() and not text.istitle(): # Single non-capitalized words
+        return True
+    common_non_headings = ["S.No", "Name", "Age", "Relationship", "Rs.", "Date", "Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the"]
+    if text in common_non_headings:
+        return True
+    if not text or len(text) < 2: # Exclude very short or empty strings
+        return True
+    blacklist_words = ["Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the", "S.No", "Name", "Age", "Relationship", "Rs.", "Date"]
+    if level in ['H1', 'H2'] and text in blacklist_words:
+        return True
+    return False
+
+# --- End of reference ---
+
+
+FRAGMENTS = [
+    "1", "1.", "2)", "(3)", "12.5", "---", "#", "", " ", "Introduction", "introduction", "INTRODUCTION", "the", "The",
+    "Name", "name", "S.No", "PAY", "Date:", "RSVP:", "you're", "invited", "You're Invited", "to a party",
+    "hope to see you there", "Hope To See You There!", "www.topjump.com", "WWW.", "TopJump Trampoline Park",
+    "Pigeon Forge, TN 37863", "ADDRESS:", "Copyright", "Version", "page", "Signature", "ii", "IV", "Chapter",
+    "of", "results", "we", "show", "that", "and,", "end;", "dash-", "—", "Home  Town", "i declare",
+    "Closed toed shoes are required for climbing", "(near Dixie Stampede on the Parkway)", "Phase", "Revision",
+]
+
+
+def random_lines(seed, count=400):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        line = rng.choice([" ", "  ", "\t"]).join(rng.choice(FRAGMENTS) for _ in range(rng.choice([1, 1, 2, 3, 5, 8])))
+        if rng.random() < 0.2:
+            line = f"  {line} "
+        lines.append(line)
+    return lines + FRAGMENTS
+
+
+@pytest.fixture
+def rules():
+    # The shipped rules.json, not whatever engine the process has configured
+    return RuleEngine.from_file(DEFAULT_RULES_CONFIG)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_heading_label_matches_reference(rules, seed):
+    for text in random_lines(seed):
+        for label in ["H1", "H2", "H3", "H4", "text"]:
+            assert rules.heading_label(text, label) == reference_apply_rules(text, label), (text, label)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_heading_labels_matches_heading_label(rules, seed):
+    rng = random.Random(seed)
+    texts = random_lines(seed)
+    labels = [rng.choice(["H1", "H2", "H3", "H4", "text"]) for _ in texts]
+    assert rules.heading_labels(texts, labels) == [rules.heading_label(t, l) for t, l in zip(texts, labels)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_title_phrase_groups_match_reference(rules, seed):
+    for text in random_lines(seed):
+        groups = rules.phrase_groups(normalize_text(text))
+        assert (TITLE_PRIORITY in groups, TITLE_EXCLUDE in groups, TITLE_NOISE in groups) == reference_title_checks(text), text
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_outline_noise_matches_reference(rules, seed):
+    for text in random_lines(seed):
+        text = text.strip()
+        for level in ["H1", "H2", "H3", "H4"]:
+            assert rules.is_outline_noise(text) == reference_outline_noise(text, level), (text, level)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_phrase_matcher_matches_substring_search(seed):
+    rng = random.Random(seed)
+    alphabet = "abc "
+    phrases_by_group = {group: ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(5)]
+                        for group in ["g1", "g2", "g3"]}
+    matcher = PhraseMatcher(phrases_by_group)
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        expected = {group for group, phrases in phrases_by_group.items() if any(p in text for p in phrases)}
+        assert matcher.groups_in(text) == expected, (text, phrases_by_group)
+
+
+def test_phrase_matcher_without_phrases():
+    assert PhraseMatcher({INVITATION: []}).groups_in("you're invited") == set()
@@ -0,0 +1,88 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\tests\test_supervisor.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from utils.supervisor import SupervisedPool, resident_memory
+
+_state = {}
+
+
+def _init(offset):
+    _state["offset"] = offset
+
+
+def _task(item):
+    # item: (value, action); the action makes the document misbehave
+    value, action = item
+    if action == "sleep":
+        time.sleep(30)
+    elif action == "crash":
+        os._exit(3)
+    elif action == "memory":
+        held = b"x" * (400 * 2**20)
+        time.sleep(30)
+        return len(held)
+    return value * value + _state["offset"]
+
+
+def _failing_init(offset):
+    raise RuntimeError("model missing")
+
+
+def run(pool, items):
+    try:
+        return list(pool.map(items))
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results_match_process_pool_executor(workers):
+    items = [(i, None) for i in range(20)]
+    with ProcessPoolExecutor(workers, initializer=_init, initargs=(7,)) as executor:
+        expected = list(executor.map(_task, items))
+    results = run(SupervisedPool(workers, _init, (7,), _task), items)
+    assert [item for item, _, _, _ in results] == items
+    assert [result for _, result, _, _ in results] == expected
+    assert all(failure is None for _, _, failure, _ in results)
+
+
+def test_timeout_kills_only_the_slow_document():
+    items = [(1, None), (2, "sleep"), (3, None), (4, None)]
+    pool = SupervisedPool(2, _init, (0,), _task, timeout=0.5)
+    results = run(pool, items)
+    assert [(result, failure is None) for _, result, failure, _ in results] == [(1, True), (None, False), (9, True), (16, True)]
+    assert results[1][2].startswith("DocumentTimeout")
+    assert 0.5 < results[1][3] < 10
+    assert pool.killed == 1
+
+
+def test_crashed_worker_is_replaced():
+    items = [(1, "crash"), (2, None), (3, "crash"), (4, None)]
+    pool = SupervisedPool(1, _init, (0,), _task)
+    results = run(pool, items)
+    assert [result for _, result, _, _ in results] == [None, 4, None, 16]
+    assert results[0][2] == "WorkerCrashed: exit code 3"
+    assert pool.killed == 2
+
+
+@pytest.mark.skipif(resident_memory(os.getpid()) is None, reason="needs /proc to read process memory")
+def test_memory_ceiling():
+    ceiling = resident_memory(os.getpid()) + 200 * 2**20
+    pool = SupervisedPool(1, _init, (0,), _task, timeout=20, max_memory=ceiling)
+    results = run(pool, [(1, "memory"), (2, None)])
+    assert results[0][1] is None and results[0][2].startswith("MemoryLimitExceeded")
+    assert results[1][1:3] == (4, None)
+
+
+def test_initializer_failure_is_raised():
+    with pytest.raises(RuntimeError, match="during initialization"):
+        run(SupervisedPool(1, _failing_init, (0,), _task), [(1, None)])
+
+
+def test_no_items():
+    assert run(SupervisedPool(2, _init, (0,), _task), []) == []
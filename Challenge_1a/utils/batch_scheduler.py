@@ -0,0 +1,108 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\batch_scheduler.py
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchScheduler:
+    """
+    Shares one HeadingClassifier between concurrent documents.
+
+    Callers on any thread use predict_batch() exactly as they would on the
+    classifier. Their lines are queued, and a single scheduler thread merges
+    the requests waiting at that moment into one classifier call: it starts a
+    batch when the first request arrives and runs it once max_batch_size lines
+    are collected or max_wait_ms has passed. A lone request therefore waits at
+    most max_wait_ms, while under load the model sees large batches.
+
+    Only the scheduler thread touches the classifier, so its line cache and
+    counters need no locking.
+    """
+
+    def __init__(self, classifier, max_batch_size=256, max_wait_ms=5.0):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.requests = 0
+        self.lines = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+
+    def predict_batch(self, texts, batch_size=None):
+        """Returns the classifier's labels for texts; blocks until their batch has run."""
+        if not texts:
+            return []
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def close(self):
+        """Runs the requests already queued, then stops the scheduler thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "lines": self.lines,
+            "mean_batch_lines": round(self.lines / self.batches, 1) if self.batches else 0.0,
+        }
+
+    def _collect(self, first):
+        pending = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        stop = False
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending, stop
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            pending, stop = self._collect(item)
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            try:
+                labels = self.classifier.predict_batch(texts, batch_size=self.max_batch_size)
+            except Exception as e:
+                logger.exception(f"Batch of {len(texts)} lines failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+            else:
+                start = 0
+                for request_texts, future in pending:
+                    future.set_result(labels[start:start + len(request_texts)])
+                    start += len(request_texts)
+            self.batches += 1
+            self.requests += len(pending)
+            self.lines += len(texts)
+            if stop:
+                return
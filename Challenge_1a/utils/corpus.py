@@ -0,0 +1,398 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\corpus.py
+
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+import tarfile
+import threading
+import zipfile
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+WORK_MANIFEST_NAME = ".work_manifest.jsonl"
+QUARANTINE_NAME = ".quarantine.jsonl"
+
+
+class PdfInput:
+    """
+    A PDF that is not a file of its own: an archive member or a buffer read from stdin.
+
+    name is the '/'-separated member name it is known by in outputs, caches
+    and manifests (see relative_pdf_path). data holds the bytes when they are
+    already in memory; otherwise read() loads the member from the archive at
+    archive_path, through an archive handle kept open per process. Only the
+    name and the archive path travel to worker processes for such members.
+    """
+
+    __slots__ = ("name", "data", "archive_path", "member")
+
+    def __init__(self, name, data=None, archive_path=None, member=None):
+        self.name = name
+        self.data = data
+        self.archive_path = archive_path
+        self.member = member if member is not None else name
+
+    def read(self):
+        if self.data is not None:
+            return self.data
+        return _read_member(self.archive_path, self.member)
+
+    def __eq__(self, other):
+        return isinstance(other, PdfInput) and (self.archive_path, self.name) == (other.archive_path, other.name)
+
+    def __hash__(self):
+        return hash((self.archive_path, self.name))
+
+    def __repr__(self):
+        return f"PdfInput({self.name!r})"
+
+
+# archive path -> (open ZipFile or TarFile, lock); tarfile is not thread-safe and the pipeline reads on two threads
+_open_archives = {}
+_open_archives_lock = threading.Lock()
+
+
+def _forget_open_archives():
+    # A forked worker shares the parent's file offsets; it must open the archives again itself
+    global _open_archives_lock
+    _open_archives.clear()
+    _open_archives_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_open_archives)
+
+
+def _read_member(archive_path, member):
+    # Archive errors are raised as OSError, like a failed read of a plain file
+    try:
+        with _open_archives_lock:
+            if archive_path not in _open_archives:
+                archive = zipfile.ZipFile(archive_path) if zipfile.is_zipfile(archive_path) else tarfile.open(archive_path)
+                _open_archives[archive_path] = (archive, threading.Lock())
+            archive, lock = _open_archives[archive_path]
+        with lock:
+            if isinstance(archive, zipfile.ZipFile):
+                return archive.read(member)
+            with archive.extractfile(member) as f:
+                return f.read()
+    except (KeyError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise OSError(f"Cannot read {member} from {archive_path}: {e}") from e
+
+
+def _member_name(member):
+    """Returns a safe relative name for an archive member, or None if it would escape the output directory."""
+    name = posixpath.normpath(member.replace("\\", "/")).lstrip("/")
+    if name in ("", ".") or name == ".." or name.startswith("../"):
+        return None
+    return name
+
+
+def relative_pdf_path(pdf_path, input_root=None):
+    """
+    Returns the name a PDF is known by in outputs, caches and manifests.
+
+    That is its path relative to input_root with '/' separators, which is
+    the same on every machine the corpus is mounted on, or just the file name
+    when there is no input_root. A PdfInput is known by its member name.
+    """
+    if isinstance(pdf_path, PdfInput):
+        return pdf_path.name
+    if input_root is None:
+        return os.path.basename(pdf_path)
+    return os.path.relpath(pdf_path, input_root).replace(os.sep, "/")
+
+
+def discover_pdfs(input_root, recursive=False):
+    """
+    Yields the PDFs under input_root in a deterministic order.
+
+    Uses os.scandir, whose entries carry their file type, so no extra stat
+    call is made per file. Entries are sorted by name in every directory, so
+    the order does not depend on the filesystem; with recursive=True a
+    directory's files come before its subdirectories. Symlinked directories
+    are not followed.
+    """
+    pending = [input_root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot list {directory}: {e}")
+            continue
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                    yield entry.path
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+            except OSError as e:
+                logger.warning(f"Skipping {entry.path}: {e}")
+        # Reversed so the stack pops them in name order
+        pending.extend(reversed(subdirectories))
+
+
+def _is_pdf_member(name):
+    return name.lower().endswith('.pdf')
+
+
+def iter_archive_pdfs(archive_path):
+    """
+    Yields a PdfInput for every PDF in a zip or tar archive (any compression), in archive order.
+
+    Nothing is extracted: members are read from the archive when processed.
+
+    Raises:
+        ValueError: If archive_path is neither a zip nor a tar archive.
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [info.filename for info in archive.infolist() if not info.is_dir()]
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as archive:
+            members = [info.name for info in archive.getmembers() if info.isfile()]
+    else:
+        raise ValueError(f"{archive_path} is not a directory, zip or tar archive")
+    for member in members:
+        name = _member_name(member)
+        if name is None:
+            logger.warning(f"Skipping archive member with an unsafe path: {member}")
+        elif _is_pdf_member(name):
+            yield PdfInput(name, archive_path=archive_path, member=member)
+
+
+def read_stream_pdfs(stream, name="stdin.pdf"):
+    """
+    Reads one PDF, or a zip or tar archive of PDFs, from a binary stream such as sys.stdin.buffer.
+
+    A single PDF is named `name`; archive members keep their member names.
+    A tar stream is read in one pass, without seeking, and only its PDF
+    members are kept; a zip needs its central directory at the end, so it is
+    read into memory first. Either way the bytes of every PDF read are held
+    in memory until the run has processed them.
+
+    Returns:
+        list: PdfInput objects holding their bytes.
+
+    Raises:
+        ValueError: If the stream is neither a PDF nor a zip or tar archive.
+    """
+    # peek() on a pipe may return fewer bytes than asked for, so the head is read explicitly and replayed
+    head = _read_exactly(stream, 5)
+    stream = _PrefixedStream(head, stream)
+    if head.startswith(b"%PDF"):
+        return [PdfInput(name, data=stream.read())]
+
+    inputs = []
+    if head.startswith(b"PK"):
+        with zipfile.ZipFile(io.BytesIO(stream.read())) as archive:
+            members = ((info.filename, lambda info=info: archive.read(info))
+                       for info in archive.infolist() if not info.is_dir())
+            inputs = _stream_members(members)
+    else:
+        try:
+            with tarfile.open(fileobj=stream, mode="r|*") as archive:
+                members = ((info.name, lambda info=info: archive.extractfile(info).read())
+                           for info in archive if info.isfile())
+                inputs = _stream_members(members)
+        except tarfile.TarError as e:
+            raise ValueError(f"Input stream is neither a PDF nor a zip or tar archive: {e}") from None
+    return inputs
+
+
+def _read_exactly(stream, size):
+    """Reads size bytes from stream, fewer only at end of stream."""
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class _PrefixedStream:
+    """Read-only stream that returns prefix, then the rest of stream."""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b""
+            return data
+        if self.prefix:
+            data, self.prefix = self.prefix[:size], self.prefix[size:]
+            return data
+        return self.stream.read(size)
+
+
+def _stream_members(members):
+    inputs = []
+    for member, read in members:
+        name = _member_name(member)
+        if name is None:
+            logger.warning(f"Skipping archive member with an unsafe path: {member}")
+        elif _is_pdf_member(name):
+            inputs.append(PdfInput(name, data=read()))
+    return inputs
+
+
+def parse_shard(spec):
+    """
+    Parses a shard selection "i/N" (0 <= i < N).
+
+    Returns:
+        tuple: (i, N).
+
+    Raises:
+        ValueError: If the selection is malformed.
+    """
+    index, sep, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Expected a shard as 'i/N', got '{spec}'") from None
+    if not sep or count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must satisfy 0 <= i < N, got '{spec}'")
+    return index, count
+
+
+def shard_of(name, shard_count):
+    """
+    Returns the shard (0..shard_count-1) a document name belongs to.
+
+    Based on a hash of the name, so the split is stable across machines,
+    runs and Python versions, and shards stay balanced however the corpus is
+    laid out in directories.
+    """
+    digest = hashlib.sha1(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def _read_records(path):
+    """
+    Reads a JSON-lines file of {"pdf": ...} records.
+
+    Returns:
+        tuple: (list of records, whether the file ends mid-line). A line cut
+        off by an interrupted run is skipped.
+    """
+    records = []
+    ends_mid_line = False
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            ends_mid_line = not line.endswith("\n")
+            try:
+                record = json.loads(line)
+                record["pdf"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            records.append(record)
+    return records, ends_mid_line
+
+
+class WorkManifest:
+    """
+    Append-only record of the documents a run has completed.
+
+    Each completed document is appended as one JSON line and flushed right
+    away, so after a crash or a killed node the manifest lists exactly the
+    documents whose outputs were written; a line cut off by the crash is
+    ignored. A run started with resume=True skips everything already listed.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = set()
+        ends_mid_line = False
+        if resume and os.path.exists(path):
+            records, ends_mid_line = _read_records(path)
+            self.completed.update(record["pdf"] for record in records)
+            logger.info(f"Resuming: {len(self.completed)} documents already completed according to {path}")
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if ends_mid_line:
+            # The previous run was cut off mid-line; start on a fresh one
+            self._file.write("\n")
+
+    def is_completed(self, name):
+        return name in self.completed
+
+    def mark_completed(self, name, output=None):
+        record = {"pdf": name}
+        if output is not None:
+            record["output"] = output
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.completed.add(name)
+
+    def close(self):
+        self._file.close()
+
+
+class Quarantine:
+    """
+    Documents that timed out, exceeded the memory ceiling or crashed their worker.
+
+    Unlike the work manifest it is kept across runs whatever the options, so
+    later runs skip these documents instead of spending a full deadline on
+    each of them again; delete the file, or its line for a document, to
+    retry, or process them anyway (e.g. with a larger limit) and release()
+    the ones that succeed. Entries are appended with O_APPEND, so shards
+    sharing an output directory can share the file. It is only created once
+    something is written to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.reasons = {}
+        if os.path.exists(path):
+            records, self._ends_mid_line = _read_records(path)
+            for record in records:
+                if record.get("reason") is None:
+                    self.reasons.pop(record["pdf"], None) # Released
+                else:
+                    self.reasons[record["pdf"]] = record["reason"]
+        else:
+            self._ends_mid_line = False
+        self._file = None
+
+    def __contains__(self, name):
+        return name in self.reasons
+
+    def __len__(self):
+        return len(self.reasons)
+
+    def add(self, name, reason):
+        self._append(name, reason)
+        self.reasons[name] = reason
+
+    def release(self, name):
+        """Takes a document off the list, e.g. once a retry has succeeded."""
+        if name in self.reasons:
+            self._append(name, None)
+            del self.reasons[name]
+
+    def _append(self, name, reason):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if self._ends_mid_line:
+                self._file.write("\n")
+        self._file.write(json.dumps({"pdf": name, "reason": reason}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,80 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\fast_tokenizer.py
+
+import json
+import os
+import numpy as np
+
+
+class FastTokenizer:
+    """
+    Loads tokenizer.json with the `tokenizers` library instead of `transformers`.
+
+    Supports the subset of the transformers tokenizer call used by
+    HeadingClassifier (truncation, no padding or 'max_length' padding, numpy
+    tensors) and produces the same ids, since both run the same tokenizer.json.
+    Importing `tokenizers` takes milliseconds, against seconds for `transformers`.
+    """
+
+    def __init__(self, tokenizer_path, max_length=128):
+        from tokenizers import Tokenizer
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(tokenizer_path, "tokenizer.json"))
+        # tokenizer.json ships with fixed padding to 128; padding is done per batch instead
+        self._tokenizer.no_padding()
+        self._max_length = None
+        self._set_truncation(max_length)
+
+        pad_token = "[PAD]"
+        config_path = os.path.join(tokenizer_path, "tokenizer_config.json")
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                pad_token = json.load(f).get("pad_token", pad_token)
+        self.pad_token_id = self._tokenizer.token_to_id(pad_token) or 0
+
+    def _set_truncation(self, max_length):
+        if max_length != self._max_length:
+            self._tokenizer.enable_truncation(max_length)
+            self._max_length = max_length
+
+    def __call__(self, text, truncation=True, max_length=None, padding=False, return_tensors=None):
+        single = isinstance(text, str)
+        texts = [text] if single else list(text)
+        if truncation:
+            self._set_truncation(max_length or self._max_length)
+        else:
+            self._tokenizer.no_truncation()
+            self._max_length = None
+        encodings = self._tokenizer.encode_batch(texts)
+
+        input_ids = [encoding.ids for encoding in encodings]
+        token_type_ids = [encoding.type_ids for encoding in encodings]
+        attention_mask = [encoding.attention_mask for encoding in encodings]
+
+        if padding == "max_length":
+            width = max_length or self._max_length
+            input_ids = [ids + [self.pad_token_id] * (width - len(ids)) for ids in input_ids]
+            token_type_ids = [ids + [0] * (width - len(ids)) for ids in token_type_ids]
+            attention_mask = [mask + [0] * (width - len(mask)) for mask in attention_mask]
+
+        if return_tensors == "np":
+            return {
+                "input_ids": np.array(input_ids, dtype=np.int64),
+                "token_type_ids": np.array(token_type_ids, dtype=np.int64),
+                "attention_mask": np.array(attention_mask, dtype=np.int64),
+            }
+        if single:
+            return {"input_ids": input_ids[0], "token_type_ids": token_type_ids[0], "attention_mask": attention_mask[0]}
+        return {"input_ids": input_ids, "token_type_ids": token_type_ids, "attention_mask": attention_mask}
+
+
+def load_tokenizer(tokenizer_path, fast_start=False):
+    """
+    Returns the tokenizer for HeadingClassifier.
+
+    With fast_start and a tokenizer.json present, uses FastTokenizer and never
+    imports transformers; otherwise falls back to AutoTokenizer.
+    """
+    if fast_start and os.path.exists(os.path.join(tokenizer_path, "tokenizer.json")):
+        return FastTokenizer(tokenizer_path)
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(tokenizer_path)
@@ -1,9 +1,12 @@
 # In D:\CONNECTING_DOTS\Challenge_1a\utils\heading_classifier.py
 
+import time
 import numpy as np
-from transformers import AutoTokenizer
-import onnxruntime as rt
 import logging
+from utils.line_cache import LineCache
+from utils.rules import get_rule_engine
+from utils.onnx_session import create_session
+from utils.fast_tokenizer import load_tokenizer
 
 try:
     from utils.logger import setup_logger
@@ -13,14 +16,37 @@ except ImportError:
     logger = logging.getLogger(__name__)
 
 class HeadingClassifier:
-    def __init__(self, model_path, tokenizer_path):
-        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
-        self.session = rt.InferenceSession(model_path)
+    def __init__(self, model_path, tokenizer_path, line_cache=None, rules=None, session_config=None, fast_start=False):
+        # fast_start loads tokenizer.json with `tokenizers` and never imports transformers
+        self.tokenizer = load_tokenizer(tokenizer_path, fast_start=fast_start)
+        # session_config: thread counts, graph optimization, optimized-model cache (see utils/onnx_session.py)
+        self.session = create_session(model_path, session_config)
         self.input_names = [inp.name for inp in self.session.get_inputs()] 
         self.output_name = self.session.get_outputs()[0].name
         self.idx_to_label = {0: 'H1', 1: 'H2', 2: 'H3', 3: 'H4', 4: 'text'}
+        self.max_length = 128
+        self.pad_token_id = self.tokenizer.pad_token_id or 0
+        # Optional LineCache in front of the model; shared by every document this instance classifies
+        self.line_cache = line_cache
+        # Post-processing rules (utils/rules.py), compiled once per process
+        self.rules = rules or get_rule_engine()
+        # Cumulative seconds spent tokenizing and in session.run, and lines sent to the model
+        self.timings = {"tokenize": 0.0, "onnx": 0.0}
+        self.model_lines = 0
 
     def _predict_onnx(self, text):
+        if self.line_cache is not None:
+            key = LineCache.normalize(text)
+            label = self.line_cache.get(key)
+            if label is None:
+                label = self._run_onnx(text)
+                self.line_cache.put(key, label)
+            return label
+        return self._run_onnx(text)
+
+    def _run_onnx(self, text):
+        self.model_lines += 1
+        tokenize_start = time.perf_counter()
         inputs = self.tokenizer(
             text, 
             return_tensors="np", 
@@ -38,82 +64,118 @@ class HeadingClassifier:
                 if name == "token_type_ids":
                     input_feed[name] = np.zeros_like(inputs["input_ids"]) 
 
+        onnx_start = time.perf_counter()
+        self.timings["tokenize"] += onnx_start - tokenize_start
         outputs = self.session.run([self.output_name], input_feed)
+        self.timings["onnx"] += time.perf_counter() - onnx_start
         logits = outputs[0]
         predicted_class_idx = np.argmax(logits, axis=1)[0]
         return self.idx_to_label[predicted_class_idx]
 
-    def predict(self, text):
-        predicted_label = self._predict_onnx(text)
+    def _predict_onnx_batch(self, texts, batch_size=64):
+        """
+        Returns the raw model label for each text, consulting the line cache first.
 
-        text_stripped = text.strip()
+        Only texts not already cached are sent to the model, and each distinct
+        text is sent once even if it repeats within the batch.
+        """
+        if self.line_cache is None:
+            return self._run_onnx_batch(texts, batch_size)
 
-        if predicted_label == 'text':
-            return 'text'
+        keys = [LineCache.normalize(text) for text in texts]
+        labels = [self.line_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, label in zip(keys, labels) if label is None))
+        if not missing:
+            return labels
 
-        # --- Enhanced Aggressive Post-processing Rules, especially for file05.pdf ---
+        computed = dict(zip(missing, self._run_onnx_batch(missing, batch_size)))
+        for key, label in computed.items():
+            self.line_cache.put(key, label)
+        return [label if label is not None else computed[key] for key, label in zip(keys, labels)]
 
-        # Rule 1: Demote if text is purely numeric or numeric with single dot/bracket
-        if len(text_stripped) <= 5 and (text_stripped.replace('.', '', 1).isdigit() or \
-                                       text_stripped.replace(')', '', 1).isdigit() or \
-                                       (text_stripped.startswith('(') and text_stripped.endswith(')') and text_stripped[1:-1].isdigit())):
-            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (purely numeric/short numbering)")
-            return 'text'
-        
-        # Rule 2: Demote very short, non-alphanumeric/non-sentence-like strings (e.g., "---", "###")
-        if len(text_stripped) < 3 and not any(char.isalnum() for char in text_stripped):
-             logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (very short non-alphanumeric)")
-             return 'text'
-
-        # Rule 3: Demote common column headers, generic single words, or specific phrases often misclassified
-        # Expanded list based on your *latest* problematic output
-        common_non_heading_words_or_phrases = {
-            "s.no", "name", "age", "relationship", "rs.", "date",
-            "service", "pay", "designation", "single", "rail", "fare/bus", "fare", "from", "the",
-            "whether", "i declare", "amount", "persons", "home town", "signature",
-            "for:", "date:", "time:", "address:", "rsvp:", # From file05.pdf, labels
-            "closed toed shoes are required for climbing", # Specific rule from file05.pdf
-            "parents or guardians not attending the party, please visit topjump.com to fill out waiver so your child can attend.", # Specific long note from file05.pdf
-            "hope to see you there!", # Closing remark from file05.pdf
-            "www.topjump.com", # URL from file05.pdf
-            "pigeon forge, tn 37863", # New: the misidentified title and part of outline item
-            "topjump 3735 parkway pigeon forge, tn 37863", # New: full address from outline
-            "(near dixie stampede on the parkway)", # New: location detail from outline
-            "please visit topjump.com to fill out waiver so your child can attend. hope to see y ou t here ! www.topjump.com", # New: combined long instruction
-        }
-        
-        # Normalize text for comparison (remove extra spaces, lower case)
-        normalized_text = " ".join(text_stripped.split()).lower()
-
-        if normalized_text in common_non_heading_words_or_phrases:
-            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (exact match common non-heading phrase)")
-            return 'text'
-
-        # Check for single word classifications that are often mislabeled (retained)
-        if len(text_stripped.split()) == 1:
-            if normalized_text in common_non_heading_words_or_phrases:
-                logger.debug(f"Demoting single word '{text_stripped}' ({predicted_label}) to 'text' (common non-heading word)")
-                return 'text'
-            if not text_stripped[0].isupper() and not text_stripped.isupper():
-                logger.debug(f"Demoting single word '{text_stripped}' ({predicted_label}) to 'text' (not capitalized/all-caps)")
-                return 'text'
-
-        # Rule 4: Demote if it's a very short line that starts with a lowercase letter (unlikely to be a main heading) (retained)
-        if len(text_stripped) < 15 and text_stripped and text_stripped[0].islower() and ' ' in text_stripped:
-            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (short, starts lowercase, sentence-like)")
-            return 'text'
-            
-        # Rule 5: Catch multi-line sentences being broken into "headings" (retained)
-        if text_stripped and text_stripped[-1] in [',', ';', '-', '—'] and len(text_stripped) > 10:
-             logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (ends with punctuation, likely sentence fragment)")
-             return 'text'
-
-        # Rule 6: Specific rule for short, high-level classifications that are not typical headings. (retained)
-        if predicted_label in ['H1', 'H2'] and len(text_stripped.split()) <= 5: 
-            if not (text_stripped.split()[0].isdigit() or text_stripped.split()[0].lower() in ['i', 'ii', 'iii', 'iv', 'v']):
-                invitation_phrases = ["you're invited", "to a party", "hope to see you there"]
-                if any(phrase in normalized_text for phrase in invitation_phrases):
-                    logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (short H1/H2, invitation phrase)")
-                    return 'text'
-        
-        return predicted_label
+    def _run_onnx_batch(self, texts, batch_size=64):
+        """
+        Runs the ONNX model over many lines at once.
+
+        All texts are tokenized in one call without padding, sorted by token
+        length and split into batches, so each batch is only padded to its own
+        longest line instead of to max_length.
+
+        Args:
+            texts (list): The line texts to classify.
+            batch_size (int): Maximum number of lines per session.run call.
+
+        Returns:
+            list: The raw model label for each text, in input order.
+        """
+        if not texts:
+            return []
+
+        self.model_lines += len(texts)
+        tokenize_start = time.perf_counter()
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        all_input_ids = encoded["input_ids"]
+        all_token_type_ids = encoded.get("token_type_ids")
+
+        order = sorted(range(len(texts)), key=lambda i: len(all_input_ids[i]))
+        labels = [None] * len(texts)
+
+        self.timings["tokenize"] += time.perf_counter() - tokenize_start
+
+        for start in range(0, len(order), batch_size):
+            tokenize_start = time.perf_counter()
+            batch_idx = order[start:start + batch_size]
+            seq_len = max(len(all_input_ids[i]) for i in batch_idx)
+
+            input_ids = np.full((len(batch_idx), seq_len), self.pad_token_id, dtype=np.int64)
+            attention_mask = np.zeros((len(batch_idx), seq_len), dtype=np.int64)
+            token_type_ids = np.zeros((len(batch_idx), seq_len), dtype=np.int64)
+            for row, i in enumerate(batch_idx):
+                ids = all_input_ids[i]
+                input_ids[row, :len(ids)] = ids
+                attention_mask[row, :len(ids)] = 1
+                if all_token_type_ids is not None:
+                    token_type_ids[row, :len(ids)] = all_token_type_ids[i]
+
+            inputs = {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": token_type_ids,
+            }
+            input_feed = {name: inputs[name] for name in self.input_names if name in inputs}
+            for name in self.input_names:
+                if name not in input_feed:
+                    logger.warning(f"Input '{name}' expected by ONNX model but not produced by batch tokenization.")
+
+            onnx_start = time.perf_counter()
+            self.timings["tokenize"] += onnx_start - tokenize_start
+            logits = self.session.run([self.output_name], input_feed)[0]
+            self.timings["onnx"] += time.perf_counter() - onnx_start
+            for row, predicted_class_idx in enumerate(np.argmax(logits, axis=1)):
+                labels[batch_idx[row]] = self.idx_to_label[int(predicted_class_idx)]
+
+        return labels
+
+    def predict_batch(self, texts, batch_size=64):
+        """
+        Classifies many lines with one ONNX call per batch.
+
+        Gives the same labels as calling predict() on each text, post-processing
+        rules included.
+
+        Args:
+            texts (list): The line texts to classify.
+            batch_size (int): Maximum number of lines per session.run call.
+
+        Returns:
+            list: One label ('H1'-'H4' or 'text') per input text.
+        """
+        raw_labels = self._predict_onnx_batch(texts, batch_size=batch_size)
+        return self.rules.heading_labels(texts, raw_labels)
+
+    def predict(self, text):
+        predicted_label = self._predict_onnx(text)
+        return self._apply_rules(text, predicted_label)
+
+    def _apply_rules(self, text, predicted_label):
+        return self.rules.heading_label(text, predicted_label)
@@ -0,0 +1,148 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\json_io.py
+
+import glob
+import json
+import logging
+import os
+import re
+
+try:
+    import orjson # Optional: pip install orjson
+except ImportError:
+    orjson = None
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+JSONL_PREFIX = "results"
+
+
+def dumps(obj, indent=False):
+    """
+    Serializes obj to UTF-8 JSON bytes, with orjson when it is installed.
+
+    indent=True gives the same bytes as json.dumps(obj, indent=2,
+    ensure_ascii=False); otherwise the output is compact (no spaces).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def atomic_write(path, data):
+    """
+    Writes data (bytes or str) to path through a temp file and os.replace.
+
+    Readers see either the previous file or the complete new one, never a
+    partially written file.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonlSink:
+    """
+    Appends one JSON object per line to <output_dir>/results-NNNNN.jsonl.
+
+    Lines go through a large write buffer, so thousands of small results cost
+    a handful of write calls instead of an open/write/close per document.
+    With max_bytes > 0, a new part is started once the current one would
+    grow past max_bytes. Like the per-document JSON files, the parts of an
+    earlier run are replaced: they are deleted when the sink opens. With
+    append=True (runs that skip documents done before) the last existing
+    part is continued instead, dropping a truncated last line left by an
+    interrupted run; a document processed again then appears more than once
+    and its last record is the current one. Not thread-safe: use one writer.
+    """
+
+    def __init__(self, output_dir, max_bytes=0, prefix=JSONL_PREFIX, buffer_size=1 << 20, append=False):
+        self.output_dir = output_dir
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.buffer_size = buffer_size
+        self.records = 0
+        parts = {}
+        for path in glob.glob(os.path.join(output_dir, f"{prefix}-*.jsonl")):
+            match = re.search(r"-(\d+)\.jsonl$", path)
+            if match and os.path.basename(path) == f"{prefix}-{match.group(1)}.jsonl":
+                parts[int(match.group(1))] = path
+        if append:
+            self._part = max(parts) if parts else 0
+        else:
+            for path in parts.values():
+                os.remove(path)
+            if parts:
+                logger.info(f"Replacing {len(parts)} JSONL parts of an earlier run in {output_dir}")
+            self._part = 0
+        self._open()
+
+    @property
+    def path(self):
+        """The part currently being appended to."""
+        return os.path.join(self.output_dir, f"{self.prefix}-{self._part:05d}.jsonl")
+
+    def _open(self):
+        path = self.path
+        if os.path.exists(path):
+            _drop_partial_line(path)
+        self._file = open(path, "ab", buffering=self.buffer_size)
+        self._size = self._file.tell()
+
+    def write(self, record):
+        """Appends record as one line; returns the path of the part it went to."""
+        line = dumps(record) + b"\n"
+        if self.max_bytes and self._size and self._size + len(line) > self.max_bytes:
+            self._file.close()
+            self._part += 1
+            self._open()
+            logger.info(f"Rotated JSONL output to {self.path}")
+        self._file.write(line)
+        self._size += len(line)
+        self.records += 1
+        return self.path
+
+    def flush(self):
+        """Pushes buffered lines to the file, e.g. before recording them as done elsewhere."""
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _drop_partial_line(path):
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Find the end of the last complete line
+        position = size
+        while position > 0:
+            step = min(1 << 16, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position - step + newline + 1)
+                break
+            position -= step
+        else:
+            f.truncate(0)
+        logger.warning(f"Dropped a truncated last line from {path}")
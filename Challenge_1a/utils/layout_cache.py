@@ -0,0 +1,155 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\layout_cache.py
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import numpy as np
+from utils.corpus import PdfInput
+from utils.json_io import atomic_write
+from utils.line_table import LineTable
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+# Bump whenever extraction (pdf_utils._lines_from_page_dict) changes what it produces
+LAYOUT_CACHE_VERSION = 1
+
+_MAGIC = b"LTBL"
+_FOOTER = struct.Struct("<Q4s") # header length, magic
+_ALIGNMENT = 64
+# Columns stored on disk; labels are not part of the layout and start out unlabelled
+_COLUMNS = ("text_offsets", "page_no", "bbox", "font_size", "bold", "font_id")
+
+
+def content_sha256(pdf_path, chunk_size=1 << 20):
+    """Returns the hex SHA-256 of a PDF given as a path, as bytes or as a PdfInput."""
+    if isinstance(pdf_path, PdfInput):
+        pdf_path = pdf_path.read()
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(pdf_path).hexdigest()
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def serialize_table(table):
+    """
+    Encodes a LineTable as bytes: the column data, each at a 64-byte aligned
+    offset, then a JSON header describing it, then the header length and a
+    magic number, so a reader can map the file and view the columns in place.
+    """
+    chunks = []
+    size = 0
+    header = {"columns": {}, "fonts": table.fonts,
+              "page_numbers": [int(p) for p in table.page_numbers] if table.page_numbers is not None else None}
+
+    def append(data):
+        nonlocal size
+        padding = -size % _ALIGNMENT
+        chunks.append(b"\0" * padding)
+        size += padding
+        offset = size
+        chunks.append(data)
+        size += len(data)
+        return offset
+
+    for name in _COLUMNS:
+        column = np.ascontiguousarray(getattr(table, name))
+        header["columns"][name] = [column.dtype.str, list(column.shape), append(column.tobytes())]
+    text = table.text.encode("utf-8")
+    header["text"] = [append(text), len(text)]
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    chunks.append(header_bytes)
+    chunks.append(_FOOTER.pack(len(header_bytes), _MAGIC))
+    return b"".join(chunks)
+
+
+def load_table(path):
+    """
+    Maps a file written by serialize_table and returns its LineTable.
+
+    The numeric columns are read-only views on the mapping, so only the
+    pages that are actually touched are read from disk.
+
+    Raises:
+        ValueError: If the file is not a valid table.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < _FOOTER.size:
+        raise ValueError(f"{path} is truncated")
+    header_length, magic = _FOOTER.unpack_from(mapped, len(mapped) - _FOOTER.size)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a layout cache file")
+    header_start = len(mapped) - _FOOTER.size - header_length
+    header = json.loads(mapped[header_start:header_start + header_length])
+    columns = {}
+    for name, (dtype, shape, offset) in header["columns"].items():
+        count = int(np.prod(shape))
+        columns[name] = np.frombuffer(mapped, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+    text_offset, text_length = header["text"]
+    return LineTable(text=mapped[text_offset:text_offset + text_length].decode("utf-8"), fonts=header["fonts"],
+                     page_numbers=header["page_numbers"], **columns)
+
+
+class LayoutCache:
+    """
+    On-disk cache of extracted documents, so re-runs can skip PyMuPDF parsing.
+
+    Every document's LineTable is stored in its own file (see
+    serialize_table), keyed by the PDF's content hash, the page selection and
+    the extraction settings, so changing the model, tokenizer or rules still
+    hits the cache while changing e.g. the text flags does not. Files are
+    written atomically; several processes can share one directory.
+    """
+
+    def __init__(self, cache_dir, settings=None):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        settings = {"version": LAYOUT_CACHE_VERSION, **(settings or {})}
+        self.settings_key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, pdf_path, page_ranges=None):
+        selection = json.dumps([list(r) for r in page_ranges] if page_ranges else None)
+        return hashlib.sha256(f"{content_sha256(pdf_path)}:{self.settings_key}:{selection}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.lines")
+
+    def load(self, key):
+        """Returns the cached LineTable for key, or None."""
+        path = self._path(key)
+        try:
+            table = load_table(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable layout cache entry {path}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return table
+
+    def store(self, key, table):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, serialize_table(table))
+        except OSError as e:
+            logger.warning(f"Could not write layout cache entry {path}: {e}")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,110 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\layout_cascade.py
+
+import logging
+from collections import Counter
+import numpy as np
+from utils.line_table import LineTable
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+
+class LayoutCascade:
+    """
+    Cheap first stage in front of the MiniLM classifier.
+
+    Lines that are clearly paragraph text by layout alone (body-sized font,
+    not bold, sentence length) are labelled 'text' directly; every other line
+    is sent to the model. The body font size is the size covering the most
+    characters so far in the document, updated page by page, so one instance
+    should be used per document. A document classified in pieces passes each
+    piece's instance the chars_by_size of the pages before it.
+    """
+
+    def __init__(self, min_words=8, size_tolerance=0.5, chars_by_size=None):
+        self.min_words = min_words
+        self.size_tolerance = size_tolerance
+        self.chars_by_size = Counter(chars_by_size or {})
+        self.layout_lines = 0
+        self.model_lines = 0
+
+    def observe(self, page_lines):
+        if isinstance(page_lines, LineTable):
+            sized = page_lines.font_size != 0
+            sizes = (np.round(page_lines.font_size[sized] * 2) / 2).tolist()
+            for size, chars in zip(sizes, page_lines.text_lengths()[sized].tolist()):
+                self.chars_by_size[size] += chars
+            return
+        for line in page_lines:
+            if line.get('font_size'):
+                self.chars_by_size[round(line['font_size'] * 2) / 2] += len(line['text'])
+
+    def body_font_size(self):
+        if not self.chars_by_size:
+            return None
+        return self.chars_by_size.most_common(1)[0][0]
+
+    def is_body_text(self, line, body_size):
+        font_size = line.get('font_size')
+        if body_size is None or not font_size:
+            return False # No layout information, let the model decide
+        if line.get('bold'):
+            return False
+        if font_size > body_size + self.size_tolerance:
+            return False
+        return len(line['text'].split()) >= self.min_words
+
+    def classify(self, page_lines, classifier):
+        """
+        Labels one page of lines (line dicts or a LineTable), calling the
+        classifier only for uncertain ones.
+
+        Returns:
+            list: One label per line, in order.
+        """
+        self.observe(page_lines)
+        body_size = self.body_font_size()
+
+        if isinstance(page_lines, LineTable):
+            texts = page_lines.texts()
+            body = self._body_text_rows(page_lines, texts, body_size)
+        else:
+            texts = [line['text'] for line in page_lines]
+            body = [self.is_body_text(line, body_size) for line in page_lines]
+
+        labels = [None] * len(page_lines)
+        uncertain = []
+        for i, is_body in enumerate(body):
+            if is_body:
+                labels[i] = 'text'
+            else:
+                uncertain.append(i)
+
+        if uncertain:
+            model_labels = classifier.predict_batch([texts[i] for i in uncertain])
+            for i, label in zip(uncertain, model_labels):
+                labels[i] = label
+
+        self.layout_lines += len(page_lines) - len(uncertain)
+        self.model_lines += len(uncertain)
+        return labels
+
+    def _body_text_rows(self, table, texts, body_size):
+        # is_body_text over a LineTable: layout tests on the columns, word counts only where they pass
+        if body_size is None:
+            return [False] * len(table)
+        candidates = (table.font_size != 0) & ~table.bold & (table.font_size <= body_size + self.size_tolerance)
+        return [bool(candidate) and len(text.split()) >= self.min_words
+                for candidate, text in zip(candidates.tolist(), texts)]
+
+    def stats(self):
+        total = self.layout_lines + self.model_lines
+        return {
+            "layout_lines": self.layout_lines,
+            "model_lines": self.model_lines,
+            "layout_fraction": self.layout_lines / total if total else 0.0,
+        }
@@ -0,0 +1,83 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\layout_index.py
+
+import logging
+import re
+from collections import defaultdict
+import numpy as np
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def _position_key(text):
+    # Page numbers and dates change from page to page; "Page 3 of 12" and "Page 4 of 12" must match
+    return _SPACES.sub(" ", _DIGITS.sub("#", text)).strip().lower()
+
+
+class LayoutIndex:
+    """
+    Index over the line boxes of a whole document, used to find running headers and footers.
+
+    Lines are bucketed by their text with digits folded and by the top of
+    their box, rounded to `tolerance` points; neighbouring buckets are looked
+    at too, so a header drifting by a point between pages still matches. A
+    line is a running header or footer when it lies in the top or bottom
+    `margin` of the document's text area and the same text sits at the same
+    height on at least `min_fraction` of the pages (and on two pages or more).
+
+    Built from the document's page LineTables, in page order; repeated(i) is
+    a boolean mask over the rows of page i.
+    """
+
+    def __init__(self, pages, tolerance=2.0, margin=0.12, min_fraction=0.5):
+        self.tolerance = tolerance
+        self.margin = margin
+        self.min_fraction = min_fraction
+        self._masks = []
+        self.repeated_lines = 0
+
+        pages = list(pages)
+        texts = [page.texts() for page in pages]
+        lines = sum(len(page) for page in pages)
+        if lines == 0:
+            self._masks = [np.zeros(0, dtype=bool) for _ in pages]
+            return
+        top = min(float(page.bbox[:, 1].min()) for page in pages if len(page))
+        bottom = max(float(page.bbox[:, 3].max()) for page in pages if len(page))
+        band = (bottom - top) * margin
+
+        # (text key, height bucket) -> pages holding such a line
+        buckets = defaultdict(set)
+        keys = []
+        for page_index, (page, page_texts) in enumerate(zip(pages, texts)):
+            in_band = (page.bbox[:, 3] <= top + band) | (page.bbox[:, 1] >= bottom - band)
+            rounded = np.round(page.bbox[:, 1] / tolerance).astype(np.int64).tolist()
+            page_keys = []
+            for text, y, candidate in zip(page_texts, rounded, in_band.tolist()):
+                key = (_position_key(text), y) if candidate and text.strip() else None
+                if key is not None:
+                    buckets[key].add(page_index)
+                page_keys.append(key)
+            keys.append(page_keys)
+
+        min_pages = max(2, int(np.ceil(min_fraction * len(pages))))
+        for page_keys in keys:
+            mask = np.zeros(len(page_keys), dtype=bool)
+            for i, key in enumerate(page_keys):
+                if key is None:
+                    continue
+                text, y = key
+                seen_on = buckets[key] | buckets.get((text, y - 1), set()) | buckets.get((text, y + 1), set())
+                mask[i] = len(seen_on) >= min_pages
+            self.repeated_lines += int(mask.sum())
+            self._masks.append(mask)
+
+    def repeated(self, page_index):
+        return self._masks[page_index]
@@ -0,0 +1,113 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\line_cache.py
+
+import json
+import logging
+import os
+from collections import OrderedDict
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+
+class LineCache:
+    """
+    Bounded LRU cache of raw model labels keyed on normalized line text.
+
+    Running headers, footers and form labels repeat across pages and documents;
+    with this cache each distinct text goes through the tokenizer and ONNX
+    only once. Keys are whitespace-normalized, which does not change what the
+    WordPiece tokenizer produces. Values are the labels straight from the
+    model, before post-processing rules, so rule changes never stale the cache.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(text.split())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        label = self._entries.get(key)
+        if label is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return label
+
+    def put(self, key, label):
+        self._entries[key] = label
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def load(self, path, fingerprint):
+        """
+        Warms the cache from a file written by save().
+
+        Entries are only used if they were produced by the same model and
+        tokenizer (same fingerprint); otherwise the file is ignored.
+        """
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable line cache {path}: {e}")
+            return
+        if data.get("fingerprint") != fingerprint:
+            logger.info(f"Line cache {path} was built with a different model/tokenizer, ignoring it.")
+            return
+        for key, label in data.get("entries", {}).items():
+            self.put(key, label)
+        logger.info(f"Loaded {len(self._entries)} cached line labels from {path}")
+
+    def save(self, path, fingerprint):
+        """
+        Persists the cache, merged with whatever is already on disk.
+
+        Merging lets several worker processes save into the same file; the
+        write is atomic, but entries saved concurrently by another process
+        between our read and our rename can be lost, which is harmless for a cache.
+        """
+        merged = OrderedDict()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("fingerprint") == fingerprint:
+                    merged.update(data.get("entries", {}))
+            except (OSError, ValueError):
+                pass
+        for key, label in self._entries.items():
+            merged.pop(key, None)
+            merged[key] = label
+        while len(merged) > self.maxsize:
+            merged.popitem(last=False)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "entries": merged}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved {len(merged)} cached line labels to {path}")
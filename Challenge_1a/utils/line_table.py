@@ -0,0 +1,196 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\line_table.py
+
+import numpy as np
+
+# Label codes stored in LineTable.label; UNLABELLED marks lines not classified yet
+LABELS = ['H1', 'H2', 'H3', 'H4', 'text']
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+HEADING_CODES = (0, 1, 2, 3)
+UNLABELLED = -1
+
+
+class LineTable:
+    """
+    Columnar store for the text lines of a document (or of one page).
+
+    Each line is a row across NumPy columns: page_no (int32), bbox (float32,
+    n x 4), font_size (float64), bold (bool), font_id (int32, index into
+    fonts) and label (int8 code into LABELS). Texts are kept in a single
+    string, row i spanning text_offsets[i]:text_offsets[i + 1]. That is a few
+    dozen bytes per line against several hundred for a dict with a bbox tuple.
+
+    slice() and pages() return views sharing the columns, so labels set on a
+    page view land in the document table.
+    """
+
+    __slots__ = ("text", "text_offsets", "page_no", "bbox", "font_size", "bold", "font_id", "fonts",
+                 "label", "page_numbers")
+
+    def __init__(self, text, text_offsets, page_no, bbox, font_size, bold, font_id, fonts, label=None, page_numbers=None):
+        self.text = text
+        self.text_offsets = text_offsets
+        self.page_no = page_no
+        self.bbox = bbox
+        self.font_size = font_size
+        self.bold = bold
+        self.font_id = font_id
+        self.fonts = fonts
+        self.label = label if label is not None else np.full(len(page_no), UNLABELLED, dtype=np.int8)
+        # Pages the table covers, empty ones included; None means the pages that have rows
+        self.page_numbers = page_numbers
+
+    @classmethod
+    def from_lines(cls, lines, page_numbers=None):
+        """Builds a table from line dicts as produced by pdf_utils ('text', 'page_no', 'bbox', font features)."""
+        fonts = []
+        font_index = {}
+        texts = []
+        offsets = [0]
+        font_ids = []
+        for line in lines:
+            texts.append(line['text'])
+            offsets.append(offsets[-1] + len(line['text']))
+            font = line.get('font', '')
+            if font not in font_index:
+                font_index[font] = len(fonts)
+                fonts.append(font)
+            font_ids.append(font_index[font])
+        n = len(texts)
+        label = np.array([LABEL_CODES.get(line.get('heading_level'), UNLABELLED) for line in lines], dtype=np.int8)
+        return cls(
+            text="".join(texts),
+            text_offsets=np.array(offsets, dtype=np.int64),
+            page_no=np.array([line['page_no'] for line in lines], dtype=np.int32),
+            bbox=np.array([line['bbox'] for line in lines], dtype=np.float32).reshape(n, 4),
+            font_size=np.array([line.get('font_size', 0.0) for line in lines], dtype=np.float64),
+            bold=np.array([line.get('bold', False) for line in lines], dtype=bool),
+            font_id=np.array(font_ids, dtype=np.int32),
+            fonts=fonts,
+            label=label,
+            page_numbers=page_numbers,
+        )
+
+    @classmethod
+    def concat(cls, tables, page_numbers=None):
+        """Joins tables (e.g. one per page) into one, in order."""
+        tables = list(tables)
+        fonts = []
+        font_index = {}
+        texts = []
+        offsets = [np.zeros(1, dtype=np.int64)]
+        font_ids = []
+        shift = 0
+        for table in tables:
+            start, end = int(table.text_offsets[0]), int(table.text_offsets[-1])
+            texts.append(table.text[start:end])
+            offsets.append(table.text_offsets[1:] - start + shift)
+            shift += end - start
+            remap = np.empty(len(table.fonts), dtype=np.int32)
+            for i, font in enumerate(table.fonts):
+                if font not in font_index:
+                    font_index[font] = len(fonts)
+                    fonts.append(font)
+                remap[i] = font_index[font]
+            font_ids.append(remap[table.font_id] if len(table.fonts) else table.font_id.astype(np.int32))
+        return cls(
+            text="".join(texts),
+            text_offsets=np.concatenate(offsets),
+            page_no=np.concatenate([t.page_no for t in tables]) if tables else np.zeros(0, dtype=np.int32),
+            bbox=np.concatenate([t.bbox for t in tables]) if tables else np.zeros((0, 4), dtype=np.float32),
+            font_size=np.concatenate([t.font_size for t in tables]) if tables else np.zeros(0, dtype=np.float64),
+            bold=np.concatenate([t.bold for t in tables]) if tables else np.zeros(0, dtype=bool),
+            font_id=np.concatenate(font_ids) if tables else np.zeros(0, dtype=np.int32),
+            fonts=fonts,
+            label=np.concatenate([t.label for t in tables]) if tables else None,
+            page_numbers=page_numbers,
+        )
+
+    def __len__(self):
+        return len(self.page_no)
+
+    def text_at(self, i):
+        return self.text[self.text_offsets[i]:self.text_offsets[i + 1]]
+
+    def texts(self):
+        """Returns every row's text as a list, e.g. for HeadingClassifier.predict_batch."""
+        offsets = self.text_offsets.tolist()
+        text = self.text
+        return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def text_lengths(self):
+        return np.diff(self.text_offsets)
+
+    def label_at(self, i):
+        code = self.label[i]
+        return LABELS[code] if code != UNLABELLED else None
+
+    def set_labels(self, labels):
+        """Stores string labels ('H1'-'H4', 'text') as codes, in row order."""
+        self.label[:] = [LABEL_CODES.get(label, UNLABELLED) for label in labels]
+
+    def heading_rows(self):
+        """Indices of the rows labelled H1-H4."""
+        return np.flatnonzero((self.label >= 0) & (self.label <= HEADING_CODES[-1]))
+
+    def slice(self, start, stop):
+        """Rows start:stop as a view on the same columns."""
+        return LineTable(self.text, self.text_offsets[start:stop + 1], self.page_no[start:stop],
+                         self.bbox[start:stop], self.font_size[start:stop], self.bold[start:stop],
+                         self.font_id[start:stop], self.fonts, self.label[start:stop])
+
+    def take(self, rows):
+        """
+        Copies the given rows (indices or a boolean mask) into a new table.
+
+        Unlike slice() the result does not share columns, so labels set on it
+        must be copied back by the caller.
+        """
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        starts = self.text_offsets[rows].tolist()
+        stops = self.text_offsets[rows + 1].tolist()
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.subtract(stops, starts, dtype=np.int64), out=offsets[1:])
+        return LineTable("".join(self.text[start:stop] for start, stop in zip(starts, stops)), offsets,
+                         self.page_no[rows], self.bbox[rows], self.font_size[rows], self.bold[rows],
+                         self.font_id[rows], self.fonts, self.label[rows])
+
+    def pages(self):
+        """
+        Yields one view per page, in page order, empty pages included; each
+        view's page_numbers is its page.
+
+        Rows must be in page order, as extraction produces them.
+        """
+        page_numbers = self.page_numbers if self.page_numbers is not None else np.unique(self.page_no).tolist()
+        starts = np.searchsorted(self.page_no, page_numbers, side="left")
+        stops = np.searchsorted(self.page_no, page_numbers, side="right")
+        for page_no, start, stop in zip(page_numbers, starts.tolist(), stops.tolist()):
+            page = self.slice(start, stop)
+            page.page_numbers = [page_no]
+            yield page
+
+    def row(self, i):
+        """Row i as a line dict, the format used before the table existed."""
+        line = {
+            'text': self.text_at(i),
+            'page_no': int(self.page_no[i]),
+            'bbox': tuple(float(v) for v in self.bbox[i]),
+            'font_size': float(self.font_size[i]),
+            'bold': bool(self.bold[i]),
+            'font': self.fonts[self.font_id[i]] if len(self.fonts) else '',
+        }
+        label = self.label_at(i)
+        if label is not None:
+            line['heading_level'] = label
+        return line
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the table (columns plus text)."""
+        columns = (self.text_offsets, self.page_no, self.bbox, self.font_size, self.bold, self.font_id, self.label)
+        return sum(column.nbytes for column in columns) + len(self.text.encode("utf-8"))
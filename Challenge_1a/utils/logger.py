@@ -1,6 +1,59 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+
+# One background listener per process; setup_logger() callers only enqueue records
+_listeners = {}
+
+
+def _start_listener(logger, handlers):
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[logger.name] = (listener, handlers)
+    return log_queue
+
+
+def _restart_listeners_in_child():
+    # Threads do not survive fork(): give each forked worker its own queue and listener
+    for name, (_, handlers) in list(_listeners.items()):
+        logger = logging.getLogger(name)
+        log_queue = _start_listener(logger, handlers)
+        for handler in logger.handlers:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                handler.queue = log_queue
+
+
+class _ForkHook:
+    # register_after_fork only holds its object through a weak reference, which dicts and None cannot take
+    pass
+
+
+def _register_worker_shutdown(_):
+    # multiprocessing workers leave through os._exit(), which skips atexit, but
+    # they do run Finalize callbacks; the lowest priority runs last, after any
+    # finalizer that still wants to log.
+    from multiprocessing.util import Finalize
+    Finalize(None, stop_logging, exitpriority=-100)
+
+
+def stop_logging():
+    """Flushes and stops the background log listeners of this process."""
+    for name in list(_listeners):
+        listener, _ = _listeners.pop(name)
+        listener.stop()
+
 
 def setup_logger(name='pdf_processor', log_file='processing.log'):
+    """
+    Returns the shared logger, writing to log_file and stderr.
+
+    Records are put on a queue by a QueueHandler and written by a
+    QueueListener thread, so logging never blocks the processing thread on
+    disk or terminal I/O.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     if not logger.hasHandlers():
@@ -11,6 +64,20 @@ def setup_logger(name='pdf_processor', log_file='processing.log'):
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         fh.setFormatter(formatter)
         ch.setFormatter(formatter)
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+        log_queue = _start_listener(logger, [fh, ch])
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        # Libraries that configure the root logger (e.g. onnxruntime.quantization) must not duplicate our lines
+        logger.propagate = False
     return logger
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listeners_in_child)
+    try:
+        from multiprocessing.util import register_after_fork
+        # Must run after multiprocessing clears the child's finalizer registry
+        _fork_hook = _ForkHook()
+        register_after_fork(_fork_hook, _register_worker_shutdown)
+    except ImportError:
+        pass
@@ -0,0 +1,178 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\metrics.py
+
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+from utils.json_io import atomic_write
+
+# Stages reported for every document, in pipeline order
+STAGES = ["extract", "tokenize", "onnx", "title", "outline", "validate", "write"]
+
+
+class DocumentMetrics:
+    """
+    Per-document timings (seconds per stage) and counters.
+
+    Stage times accumulate, so a stage entered once per page (as in the
+    streaming pipeline) reports its total for the document.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {stage: 0.0 for stage in STAGES}
+        self.counters = {}
+        self.started = time.perf_counter()
+        self.total_s = None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        self.total_s = time.perf_counter() - self.started
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "total_s": self.total_s if self.total_s is not None else time.perf_counter() - self.started,
+            "stages": dict(self.stages),
+            "counters": dict(self.counters),
+        }
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class RunMetrics:
+    """
+    Aggregates DocumentMetrics dictionaries over a run and exports them.
+
+    Exports a JSON summary and a Prometheus textfile-collector file
+    (e.g. for node_exporter's --collector.textfile.directory).
+    """
+
+    def __init__(self, slowest=10):
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.slowest = slowest
+        self.started = time.time()
+        # Aggregated as documents arrive; only the slowest few are kept whole
+        self._latencies = []
+        self._stages = {stage: 0.0 for stage in STAGES}
+        self._counters = {}
+        self._slowest_heap = []
+
+    def add(self, document, ok=True):
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self._latencies.append(document["total_s"])
+        for stage, seconds in document["stages"].items():
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+        for name, value in document["counters"].items():
+            self._counters[name] = self._counters.get(name, 0) + value
+        entry = (document["total_s"], len(self._latencies), {"name": document["name"], "total_s": document["total_s"], "stages": document["stages"]})
+        if len(self._slowest_heap) < self.slowest:
+            heapq.heappush(self._slowest_heap, entry)
+        elif self.slowest:
+            heapq.heappushpop(self._slowest_heap, entry)
+
+    def summary(self):
+        latencies = self._latencies
+        return {
+            "started": self.started,
+            "wall_s": time.time() - self.started,
+            "documents": {"succeeded": self.succeeded, "failed": self.failed, "skipped": self.skipped},
+            "latency_s": {
+                "sum": sum(latencies),
+                "p50": _percentile(latencies, 50),
+                "p99": _percentile(latencies, 99),
+                "max": max(latencies) if latencies else 0.0,
+            },
+            "stages_s": dict(self._stages),
+            "counters": dict(self._counters),
+            "slowest": [entry[2] for entry in sorted(self._slowest_heap, key=lambda entry: entry[0], reverse=True)],
+        }
+
+    def write_json(self, path):
+        atomic_write(path, json.dumps(self.summary(), indent=2, ensure_ascii=False))
+
+    def write_prometheus(self, path, prefix="pdf_outline"):
+        summary = self.summary()
+        # Every value describes the last run only, so all are gauges; the _total suffix and the
+        # quantile label are reserved for counters and summaries
+        lines = [
+            f"# HELP {prefix}_documents Documents handled in the last run, by outcome.",
+            f"# TYPE {prefix}_documents gauge",
+        ]
+        for outcome, value in summary["documents"].items():
+            lines.append(f'{prefix}_documents{{outcome="{outcome}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage in the last run.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        for stage, seconds in summary["stages_s"].items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}"}} {seconds:.6f}')
+        lines += [
+            f"# HELP {prefix}_document_latency_seconds Per-document latency statistics in the last run.",
+            f"# TYPE {prefix}_document_latency_seconds gauge",
+        ]
+        for stat in ("p50", "p99", "max"):
+            lines.append(f'{prefix}_document_latency_seconds{{stat="{stat}"}} {summary["latency_s"][stat]:.6f}')
+        lines += [
+            f"# HELP {prefix}_counter Line and cache counters summed over the last run.",
+            f"# TYPE {prefix}_counter gauge",
+        ]
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f'{prefix}_counter{{name="{name}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_run_wall_seconds Wall-clock duration of the last run.",
+            f"# TYPE {prefix}_run_wall_seconds gauge",
+            f"{prefix}_run_wall_seconds {summary['wall_s']:.6f}",
+        ]
+        atomic_write(path, "\n".join(lines) + "\n")
+
+
+class SlowestProfiles:
+    """
+    Keeps the profiler dumps of the N slowest documents and deletes the rest.
+
+    Every profiled document is offered with its latency; once more than
+    `keep` dumps are held, the fastest one is removed from disk.
+    """
+
+    def __init__(self, keep):
+        self.keep = keep
+        self._heap = []
+
+    def offer(self, profile_path, seconds):
+        if not profile_path:
+            return
+        heapq.heappush(self._heap, (seconds, profile_path))
+        while len(self._heap) > self.keep:
+            _, evicted = heapq.heappop(self._heap)
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+
+    def kept(self):
+        return [path for _, path in sorted(self._heap, reverse=True)]
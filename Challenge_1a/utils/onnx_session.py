@@ -0,0 +1,146 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\onnx_session.py
+
+import logging
+import os
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+# Names of the onnxruntime enum members; onnxruntime itself is imported when a session is built
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL",
+}
+
+MODEL_MODES = ["fp32", "int8"]
+
+
+def build_session_options(intra_op_threads=0, inter_op_threads=0, graph_optimization="all",
+                          execution_mode="sequential", enable_mem_arena=True):
+    """
+    Builds onnxruntime SessionOptions from plain settings.
+
+    Args:
+        intra_op_threads (int): Threads used inside one operator (0 = onnxruntime default,
+            one per core; set this low when several processes share the machine).
+        inter_op_threads (int): Threads running independent operators in parallel
+            execution mode (0 = onnxruntime default).
+        graph_optimization (str): One of 'disable', 'basic', 'extended', 'all'.
+        execution_mode (str): 'sequential' or 'parallel'.
+        enable_mem_arena (bool): Use the CPU memory arena allocator.
+
+    Returns:
+        onnxruntime.SessionOptions: The configured options.
+    """
+    import onnxruntime as rt
+
+    options = rt.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = getattr(rt.GraphOptimizationLevel, GRAPH_OPTIMIZATION_LEVELS[graph_optimization])
+    options.execution_mode = getattr(rt.ExecutionMode, EXECUTION_MODES[execution_mode])
+    options.enable_cpu_mem_arena = enable_mem_arena
+    return options
+
+
+def _optimized_model_path(model_path, graph_optimization, optimized_model_dir):
+    # Keyed on the source model's size and mtime, the optimization level and the
+    # runtime version, so a new model or onnxruntime upgrade re-optimizes.
+    import onnxruntime as rt
+
+    stat = os.stat(model_path)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    key = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    return os.path.join(optimized_model_dir, f"{stem}.{key}.{graph_optimization}.ort{rt.__version__}.onnx")
+
+
+def create_session(model_path, session_config=None):
+    """
+    Creates an InferenceSession for model_path.
+
+    session_config is a dict of build_session_options() keyword arguments,
+    plus an optional 'optimized_model_dir'. When that is set, the graph
+    optimized by onnxruntime is saved there on first use and later sessions
+    load it directly with optimizations disabled, skipping the optimization
+    pass at startup.
+    """
+    import onnxruntime as rt
+
+    session_config = dict(session_config or {})
+    optimized_model_dir = session_config.pop("optimized_model_dir", None)
+    graph_optimization = session_config.get("graph_optimization", "all")
+
+    if optimized_model_dir and graph_optimization != "disable":
+        os.makedirs(optimized_model_dir, exist_ok=True)
+        optimized_path = _optimized_model_path(model_path, graph_optimization, optimized_model_dir)
+        if os.path.exists(optimized_path):
+            logger.info(f"Loading cached optimized model {optimized_path}")
+            options = build_session_options(**{**session_config, "graph_optimization": "disable"})
+            return rt.InferenceSession(optimized_path, sess_options=options)
+        options = build_session_options(**session_config)
+        # Write to a per-process temp file first so parallel workers never read a partial model
+        tmp_path = f"{optimized_path}.{os.getpid()}.tmp"
+        options.optimized_model_filepath = tmp_path
+        session = rt.InferenceSession(model_path, sess_options=options)
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, optimized_path)
+            logger.info(f"Saved optimized model to {optimized_path}")
+        return session
+
+    options = build_session_options(**session_config)
+    return rt.InferenceSession(model_path, sess_options=options)
+
+
+def quantized_model_path(model_path):
+    """Returns where the int8 variant of model_path lives (next to it, '.int8.onnx')."""
+    root, _ = os.path.splitext(model_path)
+    return root + ".int8.onnx"
+
+
+def quantize_model(model_path, output_path=None):
+    """
+    Converts an fp32 ONNX model to int8 with dynamic quantization.
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    needs no calibration data and typically halves CPU inference time for
+    MiniLM-sized transformers.
+
+    Returns:
+        str: The path of the quantized model.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = output_path or quantized_model_path(model_path)
+    logger.info(f"Quantizing {model_path} to int8 -> {output_path}")
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def resolve_model_path(model_path, model_mode="fp32"):
+    """
+    Returns the model file to load for a model mode, converting it if needed.
+
+    'int8' uses the quantized variant next to model_path, creating it with
+    quantize_model() when it does not exist yet.
+    """
+    if model_mode == "fp32":
+        return model_path
+    if model_mode != "int8":
+        raise ValueError(f"Unknown model mode '{model_mode}', expected one of {MODEL_MODES}")
+    int8_path = quantized_model_path(model_path)
+    if not os.path.exists(int8_path):
+        quantize_model(model_path, int8_path)
+    return int8_path
@@ -1,6 +1,9 @@
 # In D:\CONNECTING_DOTS\Challenge_1a\utils\outline_builder.py
 
 import logging
+from utils.rules import HEADING_LEVELS, get_rule_engine
+from utils.line_table import LABELS, LineTable
+
 try:
     from utils.logger import setup_logger
     logger = setup_logger()
@@ -8,12 +11,43 @@ except ImportError:
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
-def build_outline(lines_with_preds):
-    outline = []
-    
-    current_heading = None
-    
-    for i, line in enumerate(lines_with_preds):
+
+class OutlineBuilder:
+    """
+    Builds the outline incrementally, one classified line at a time.
+
+    add() returns the outline entries that became final with that line, so a
+    caller can stream them out while the rest of the document is still being
+    read. finish() flushes whatever is still held back. At most two headings
+    are buffered: the one still collecting continuation lines, and a finished
+    one waiting to see whether the next heading gets merged into it.
+
+    With geometric=True, multi-line headings are merged by their boxes
+    instead, in a single pass: a heading line joins the previous one when it
+    has the same level, is on the same page, starts within max_gap line
+    heights below it and overlaps it horizontally. Only the heading being
+    collected is held back.
+    """
+
+    def __init__(self, rules=None, geometric=False, max_gap=0.6):
+        self.rules = rules or get_rule_engine()
+        self.geometric = geometric
+        self.max_gap = max_gap
+        self._line_index = 0
+        self._current_heading = None
+        self._current_box = None
+        self._pending = None
+
+    def add(self, line):
+        """
+        Feeds one line (a dict with 'text', 'page_no' and 'heading_level').
+
+        Returns:
+            list: Outline entries finalized by this line (usually empty).
+        """
+        i = self._line_index
+        self._line_index += 1
+
         level = line.get('heading_level')
         text = line.get('text', '').strip()
         
@@ -34,33 +68,42 @@ def build_outline(lines_with_preds):
             except (ValueError, TypeError):
                 page_no = 1 # Fallback if conversion fails
 
-        # --- (rest of your existing filtering logic in outline_builder.py) ---
+        return self._add_heading(level, text, page_no, line.get('bbox'), line.get('font_size'))
+
+    def add_table(self, table):
+        """
+        Feeds every line of a LineTable (a page or a whole document), in order.
+
+        Only rows labelled H1-H4 can affect the outline, so the other rows are
+        skipped without being looked at.
+
+        Returns:
+            list: Outline entries finalized by these lines.
+        """
+        finalized = []
+        for i in table.heading_rows():
+            box, size = (tuple(table.bbox[i].tolist()), float(table.font_size[i])) if self.geometric else (None, None)
+            finalized.extend(self._add_heading(LABELS[table.label[i]], table.text_at(i).strip(), int(table.page_no[i]),
+                                               box, size))
+        self._line_index += len(table)
+        return finalized
+
+    def _add_heading(self, level, text, page_no, bbox=None, font_size=None):
         # Rule 1: Only include actual heading levels (H1-H4)
-        if level not in ['H1', 'H2', 'H3', 'H4']:
-            continue # Skip if not a recognized heading level
-
-        # Rule 2: Exclude specific patterns that are often misclassified as headings but are not desired in outline
-        if len(text) <= 3 and text.replace('.', '', 1).isdigit(): # "1.", "2.", "3."
-            continue
-        if len(text.split()) <= 1 and not text.isupper() and not text.istitle(): # Single non-capitalized words
-            continue
-        common_non_headings = ["S.No", "Name", "Age", "Relationship", "Rs.", "Date", "Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the"]
-        if text in common_non_headings:
-            continue
-
-        # Rule 3: Check for blank or almost blank "headings"
-        if not text or len(text) < 2: # Exclude very short or empty strings
-            continue
-
-        # Rule 4: If an H1 or H2 is just a single word that doesn't look like a real heading
-        blacklist_words = ["Service", "PAY", "Single", "rail", "fare/bus", "fare", "from", "the", "S.No", "Name", "Age", "Relationship", "Rs.", "Date"]
-        if level in ['H1', 'H2'] and text in blacklist_words:
-            continue
-        # --- (End of filtering logic) ---
+        if level not in HEADING_LEVELS:
+            return [] # Skip if not a recognized heading level
+
+        # Rules 2-4: numbering, non-capitalized single words, column headers, near-empty text
+        if self.rules.is_outline_noise(text):
+            return []
+
+        if self.geometric and bbox is not None:
+            return self._add_heading_geometric(level, text, page_no, bbox, font_size)
 
         # If it passes all filters, proceed to build/merge heading
         
         # Check for multi-line headings (your merging logic)
+        current_heading = self._current_heading
         if current_heading and \
            current_heading['level'] == level and \
            current_heading['page_no'] == page_no and \
@@ -69,41 +112,96 @@ def build_outline(lines_with_preds):
             if len(text) > 2:
                 current_heading['text'] += " " + text
             logger.debug(f"Merged line into previous heading: {current_heading['text']}")
-        else:
-            if current_heading:
-                outline.append(current_heading)
+            return []
+
+        finalized = self._complete(current_heading) if current_heading else []
+
+        # This is where the new heading is created
+        self._current_heading = {
+            "level": level,
+            "text": text,
+            "page_no": page_no # Ensure the now-validated page_no is used here
+        }
+        logger.debug(f"Started new heading: {self._current_heading}")
+        return finalized
+
+    def _add_heading_geometric(self, level, text, page_no, bbox, font_size):
+        current_heading = self._current_heading
+        if current_heading and \
+           current_heading['level'] == level and \
+           current_heading['page_no'] == page_no and \
+           self._continues(self._current_box, bbox, font_size):
+            if len(text) > 2:
+                current_heading['text'] += " " + text
+            self._current_box = bbox
+            logger.debug(f"Merged adjacent line into heading: {current_heading['text']}")
+            return []
+
+        finalized = [current_heading] if current_heading else []
+        self._current_heading = {"level": level, "text": text, "page_no": page_no}
+        self._current_box = bbox
+        return finalized
+
+    def _continues(self, previous, bbox, font_size):
+        """True if bbox is the next line of the heading whose last line is previous."""
+        if previous is None:
+            return False
+        line_height = max(font_size or 0.0, previous[3] - previous[1])
+        gap = bbox[1] - previous[3]
+        overlaps = bbox[0] < previous[2] and previous[0] < bbox[2]
+        return overlaps and -0.5 * line_height <= gap <= self.max_gap * line_height
+
+    def finish(self):
+        """
+        Flushes the headings still held back once the document has ended.
+
+        Returns:
+            list: The remaining outline entries.
+        """
+        finalized = []
+        if self._current_heading:
+            if self.geometric:
+                finalized.append(self._current_heading)
+            else:
+                finalized.extend(self._complete(self._current_heading))
+            self._current_heading = None
+            self._current_box = None
+        if self._pending:
+            finalized.append(self._pending)
+            self._pending = None
+        return finalized
+
+    def _complete(self, item):
+        # Post-processing merge of consecutive headings (your existing logic):
+        # a completed heading is held until the next one shows up, because the
+        # next one may still need to be merged into it.
+        if self._pending is None:
+            self._pending = item
+            return []
+
+        previous = self._pending
+        # Ensure page_no is valid before comparison in post-processing merge
+        # This should already be handled by the pre-check above, but good to be safe.
+        if previous['level'] == item['level'] and \
+           previous['page_no'] == item['page_no'] and \
+           (previous['text'].endswith(('.', '-', ':', ';', ',')) or len(item['text'].split()) < 5):
             
-            # This is where the new heading is created
-            current_heading = {
-                "level": level,
-                "text": text,
-                "page_no": page_no # Ensure the now-validated page_no is used here
-            }
-            logger.debug(f"Started new heading: {current_heading}")
-
-    if current_heading:
-        outline.append(current_heading)
-
-    # Post-processing the final outline (your existing logic)
-    final_outline = []
-    i = 0
-    while i < len(outline):
-        item = outline[i]
-        merged = False
-        if i + 1 < len(outline):
-            next_item = outline[i+1]
-            # Ensure page_no is valid before comparison in post-processing merge
-            # This should already be handled by the pre-check above, but good to be safe.
-            if item['level'] == next_item['level'] and \
-               item['page_no'] == next_item['page_no'] and \
-               (item['text'].endswith(('.', '-', ':', ';', ',')) or len(next_item['text'].split()) < 5):
-                
-                item['text'] += " " + next_item['text']
-                logger.debug(f"Post-processing merge: {item['text']}")
-                merged = True
-                i += 1 
-        
-        final_outline.append(item)
-        i += 1
+            previous['text'] += " " + item['text']
+            logger.debug(f"Post-processing merge: {previous['text']}")
+            self._pending = None
+            return [previous]
+
+        self._pending = item
+        return [previous]
 
-    return final_outline
+
+def build_outline(lines_with_preds, geometric=False):
+    """Builds the outline from classified lines: line dicts or a labelled LineTable (see OutlineBuilder for geometric)."""
+    outline_builder = OutlineBuilder(geometric=geometric)
+    if isinstance(lines_with_preds, LineTable):
+        return outline_builder.add_table(lines_with_preds) + outline_builder.finish()
+    outline = []
+    for line in lines_with_preds:
+        outline.extend(outline_builder.add(line))
+    outline.extend(outline_builder.finish())
+    return outline
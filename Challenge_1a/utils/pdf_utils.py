@@ -1,7 +1,10 @@
 # Assuming this is D:\CONNECTING_DOTS\Challenge_1a\utils\pdf_utils.py
 
-import fitz # PyMuPDF
 import logging
+import os
+from utils.line_table import LineTable
+from utils.corpus import PdfInput
+from utils.layout_cache import LayoutCache
 
 try:
     from utils.logger import setup_logger
@@ -10,6 +13,314 @@ except ImportError:
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
+# PyMuPDF span flag bit for bold text
+FONT_FLAG_BOLD = 16
+
+# get_text("dict") flags by name, as fitz attribute names (fitz is only imported when a PDF is opened)
+TEXT_FLAGS = {
+    "ligatures": "TEXT_PRESERVE_LIGATURES",
+    "whitespace": "TEXT_PRESERVE_WHITESPACE",
+    "images": "TEXT_PRESERVE_IMAGES",
+    "clip": "TEXT_MEDIABOX_CLIP",
+    "cid": "TEXT_CID_FOR_UNKNOWN_UNICODE",
+    "dehyphenate": "TEXT_DEHYPHENATE",
+    "inhibit_spaces": "TEXT_INHIBIT_SPACES",
+    "accurate_bboxes": "TEXT_ACCURATE_BBOXES",
+}
+# PyMuPDF's own default for "dict" (TEXTFLAGS_DICT)
+DEFAULT_TEXT_FLAGS = ("ligatures", "whitespace", "images", "clip", "cid")
+
+# Process-wide extraction settings, see configure_extraction
+_text_flags = None
+_layout_cache = None
+
+
+def _span_features(spans):
+    """
+    Summarizes the layout of a line's spans.
+
+    Returns:
+        dict: 'font_size' (largest span size), 'bold' (any non-empty span is bold)
+              and 'font' (name of the font covering the most characters).
+    """
+    font_size = 0.0
+    bold = False
+    font_chars = {}
+    for span in spans:
+        span_text = span['text'].strip()
+        if not span_text:
+            continue
+        font_size = max(font_size, span.get('size', 0.0))
+        bold = bold or bool(span.get('flags', 0) & FONT_FLAG_BOLD)
+        font_name = span.get('font', '')
+        font_chars[font_name] = font_chars.get(font_name, 0) + len(span_text)
+    return {
+        'font_size': round(font_size, 2),
+        'bold': bold,
+        'font': max(font_chars, key=font_chars.get) if font_chars else '',
+    }
+
+
+def _lines_from_page_dict(page_dict, page_no):
+    """Turns one page's get_text("dict") output into line dictionaries."""
+    page_lines = []
+    for block in page_dict['blocks']:
+        if block['type'] == 0: # Text block
+            for line in block['lines']:
+                full_line_text = " ".join([span['text'].strip() for span in line['spans']]).strip()
+                if full_line_text: # Only add non-empty lines
+                    # Get the bounding box for the entire line
+                    bbox = (line['bbox'][0], line['bbox'][1], line['bbox'][2], line['bbox'][3])
+                    line_data = {
+                        'text': full_line_text,
+                        'page_no': page_no,
+                        'bbox': bbox # Optional, but good to include if needed later
+                    }
+                    line_data.update(_span_features(line['spans']))
+                    page_lines.append(line_data)
+    return page_lines
+
+
+def document_name(pdf_path):
+    """Returns a short name for log messages: the file name of a path, an archive member's name, or the size of an in-memory PDF."""
+    if isinstance(pdf_path, PdfInput):
+        return pdf_path.name
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        return f"<{len(pdf_path)}-byte PDF>"
+    return os.path.basename(pdf_path)
+
+
+def open_document(pdf_path):
+    """Opens a PDF given as a file path, as the bytes of the file, or as a PdfInput."""
+    import fitz # PyMuPDF, imported on first use to keep module import cheap
+
+    if isinstance(pdf_path, PdfInput):
+        pdf_path = pdf_path.read()
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(pdf_path), filetype="pdf")
+    return fitz.open(pdf_path)
+
+
+def parse_text_flags(spec):
+    """
+    Parses a text flag selection: either names replacing the defaults
+    ("ligatures,whitespace") or changes to them ("-images,+dehyphenate").
+
+    Returns:
+        tuple: The selected flag names, sorted.
+
+    Raises:
+        ValueError: If a name is unknown or absolute names are mixed with changes.
+    """
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    relative = [part[0] in "+-" for part in parts]
+    if any(relative) and not all(relative):
+        raise ValueError(f"Give either flag names or +/- changes, not both: '{spec}'")
+    flags = set(DEFAULT_TEXT_FLAGS) if all(relative) else set()
+    for part in parts:
+        name = part.lstrip("+-")
+        if name not in TEXT_FLAGS:
+            raise ValueError(f"Unknown text flag '{name}' (known: {', '.join(TEXT_FLAGS)})")
+        if part.startswith("-"):
+            flags.discard(name)
+        else:
+            flags.add(name)
+    return tuple(sorted(flags))
+
+
+def configure_extraction(text_flags=None, layout_cache_dir=None):
+    """
+    Sets how this process extracts PDFs.
+
+    Args:
+        text_flags (tuple, optional): Names from TEXT_FLAGS passed to
+            get_text("dict"); None keeps PyMuPDF's defaults. Dropping
+            "images" skips decoding image blocks, which only cost time here.
+        layout_cache_dir (str, optional): Directory of a LayoutCache;
+            extracted documents are stored there and later extractions of
+            the same content with the same settings read them back without
+            opening the PDF.
+    """
+    global _text_flags, _layout_cache
+    _text_flags = tuple(sorted(text_flags)) if text_flags is not None else None
+    settings = {"text_flags": list(_text_flags) if _text_flags is not None else None}
+    _layout_cache = LayoutCache(layout_cache_dir, settings) if layout_cache_dir else None
+
+
+def get_layout_cache():
+    """Returns the LayoutCache set by configure_extraction, or None."""
+    return _layout_cache
+
+
+def _get_text_flags(fitz):
+    if _text_flags is None:
+        return None
+    flags = 0
+    for name in _text_flags:
+        flags |= getattr(fitz, TEXT_FLAGS[name])
+    return flags
+
+
+def parse_page_ranges(spec):
+    """
+    Parses a page selection such as "1-3,7,10-" (1-based, inclusive).
+
+    Returns:
+        tuple: (first, last) pairs; last is None for an open range ("10-").
+
+    Raises:
+        ValueError: If the selection is malformed.
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        first = int(first) if first.strip() else 1
+        last = (int(last) if last.strip() else None) if sep else first
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range '{part}'")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError(f"Empty page selection '{spec}'")
+    return tuple(ranges)
+
+
+def selected_page_numbers(page_count, page_ranges=None):
+    """Returns the 1-based page numbers of a document with page_count pages that page_ranges selects, in order."""
+    if not page_ranges:
+        return list(range(1, page_count + 1))
+    selected = set()
+    for first, last in page_ranges:
+        selected.update(range(first, min(last if last is not None else page_count, page_count) + 1))
+    return sorted(selected)
+
+
+def to_page_ranges(page_numbers):
+    """Compresses sorted 1-based page numbers into the fewest (first, last) ranges, e.g. [1, 2, 3, 7] -> ((1, 3), (7, 7))."""
+    ranges = []
+    for page_no in page_numbers:
+        if ranges and ranges[-1][1] == page_no - 1:
+            ranges[-1][1] = page_no
+        else:
+            ranges.append([page_no, page_no])
+    return tuple((first, last) for first, last in ranges)
+
+
+def page_count(pdf_path):
+    """Returns the number of pages of a PDF (path, bytes or PdfInput) without reading any page."""
+    doc = open_document(pdf_path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+def _iter_page_dicts(pdf_path, page_ranges=None):
+    # Yields (page_no, get_text("dict") output) per selected page; stops at the first unreadable page.
+    # Pages outside page_ranges are never loaded. Returns True only if every selected page was read.
+    try:
+        doc = open_document(pdf_path)
+    except Exception as e:
+        logger.error(f"Error opening PDF {document_name(pdf_path)}: {e}")
+        return False
+
+    import fitz
+    flags = _get_text_flags(fitz)
+    try:
+        for page_no in selected_page_numbers(doc.page_count, page_ranges):
+            page_num = page_no - 1
+            try:
+                page_dict = doc.load_page(page_num).get_text("dict", flags=flags) # Extract as dictionary
+            except Exception as e:
+                logger.error(f"Error extracting text from page {page_num + 1} of PDF {document_name(pdf_path)}: {e}")
+                return False
+            yield page_num + 1, page_dict
+        return True
+    finally:
+        doc.close()
+
+
+def iter_page_lines(pdf_path, page_ranges=None):
+    """
+    Yields the text lines of a PDF one page at a time.
+
+    Only the current page is held in memory, so callers that consume each page
+    before asking for the next keep memory bounded regardless of document length.
+
+    Args:
+        pdf_path (str or bytes): The path to the PDF file, or its contents.
+        page_ranges (tuple, optional): Only these pages, see parse_page_ranges.
+
+    Yields:
+        list: The lines of one page, each a dictionary with 'text', 'page_no', 'bbox'
+              and the layout features 'font_size', 'bold' and 'font'.
+              Pages without text yield an empty list.
+    """
+    for page_no, page_dict in _iter_page_dicts(pdf_path, page_ranges):
+        yield _lines_from_page_dict(page_dict, page_no)
+
+
+def iter_page_tables(pdf_path, page_ranges=None):
+    """
+    Like iter_page_lines, but yields each page as a LineTable.
+
+    With a layout cache configured (configure_extraction), a document seen
+    before is read back from it without opening the PDF, and a document read
+    to the end is stored in it. Pages from the cache share read-only columns,
+    labels apart.
+
+    Yields:
+        LineTable: The lines of one page (empty for pages without text).
+    """
+    cache = _layout_cache
+    if cache is None:
+        for page_no, page_dict in _iter_page_dicts(pdf_path, page_ranges):
+            yield LineTable.from_lines(_lines_from_page_dict(page_dict, page_no), page_numbers=[page_no])
+        return
+
+    try:
+        key = cache.key(pdf_path, page_ranges)
+    except OSError as e:
+        logger.warning(f"Cannot hash {document_name(pdf_path)} for the layout cache: {e}")
+        key = None
+    table = cache.load(key) if key is not None else None
+    if table is not None:
+        yield from table.pages()
+        return
+
+    page_tables = []
+    page_dicts = _iter_page_dicts(pdf_path, page_ranges)
+    while True:
+        try:
+            page_no, page_dict = next(page_dicts)
+        except StopIteration as stop:
+            complete = stop.value
+            break
+        page = LineTable.from_lines(_lines_from_page_dict(page_dict, page_no), page_numbers=[page_no])
+        page_tables.append(page)
+        yield page
+    # Only reached when the caller read every page (title-only runs stop early and store nothing); a
+    # document cut short by an unreadable page is not stored, so a later run reads it again
+    if key is not None and page_tables and complete:
+        cache.store(key, LineTable.concat(page_tables, page_numbers=[p for page in page_tables for p in page.page_numbers]))
+
+
+def extract_line_table(pdf_path, page_ranges=None):
+    """
+    Extracts a whole document into one LineTable.
+
+    Pages are converted to columns as they are read, so the per-line dicts
+    only ever exist for a single page. The table's pages() gives the page
+    views back, empty pages included.
+    """
+    page_tables = list(iter_page_tables(pdf_path, page_ranges))
+    table = LineTable.concat(page_tables, page_numbers=[page_no for page in page_tables for page_no in page.page_numbers])
+    logger.debug(f"Extracted {len(table)} lines ({table.nbytes} bytes) from {document_name(pdf_path)}")
+    return table
+
+
 def extract_text_lines(pdf_path):
     """
     Extracts text lines from a PDF, including their page number and bounding box.
@@ -20,36 +331,10 @@ def extract_text_lines(pdf_path):
     Returns:
         list: A list of dictionaries, each containing 'text', 'page_no', and 'bbox'.
               'bbox' is a tuple (x0, y0, x1, y1) representing the bounding box.
+              'font_size', 'bold' and 'font' describe the line's spans.
     """
     lines_data = []
-    try:
-        doc = fitz.open(pdf_path)
-        for page_num, page in enumerate(doc):
-            # page_num is 0-indexed, so add 1 for page_no
-            current_page_no = page_num + 1 
-            
-            # This extracts text blocks. We want lines, so further processing is needed.
-            # PyMuPDF's get_text("dict") or get_text("rawdict") are useful for structured extraction.
-            # Using get_text("dict") provides blocks, lines, and spans.
-            page_dict = page.get_text("dict") # Extract as dictionary
-            
-            for block in page_dict['blocks']:
-                if block['type'] == 0: # Text block
-                    for line in block['lines']:
-                        full_line_text = " ".join([span['text'].strip() for span in line['spans']]).strip()
-                        if full_line_text: # Only add non-empty lines
-                            # Get the bounding box for the entire line
-                            bbox = (line['bbox'][0], line['bbox'][1], line['bbox'][2], line['bbox'][3])
-                            lines_data.append({
-                                'text': full_line_text,
-                                'page_no': current_page_no,
-                                'bbox': bbox # Optional, but good to include if needed later
-                            })
-        doc.close()
-        logger.debug(f"Successfully extracted {len(lines_data)} lines from {pdf_path}")
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
-        # Return empty list or re-raise, depending on desired error handling
-        return []
+    for page_lines in iter_page_lines(pdf_path):
+        lines_data.extend(page_lines)
+    logger.debug(f"Successfully extracted {len(lines_data)} lines from {pdf_path}")
     return lines_data
-
@@ -0,0 +1,129 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+from utils.corpus import PdfInput, relative_pdf_path
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+CACHE_MANIFEST_NAME = ".cache_manifest.json"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Returns the hex SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_fingerprint(model_path, tokenizer_path, rules_version, settings=None):
+    """
+    Fingerprints everything besides the PDF itself that decides an output.
+
+    Args:
+        model_path (str): The ONNX model file.
+        tokenizer_path (str): The tokenizer directory (every file in it is hashed).
+        rules_version (str): Version of the post-processing rules.
+        settings (dict, optional): Run options that change the output (e.g.
+            title-only mode or a page selection); must be JSON-serializable.
+
+    Returns:
+        str: A hex digest that changes whenever the model, tokenizer, rules or settings change.
+    """
+    digest = hashlib.sha256()
+    digest.update(file_sha256(model_path).encode())
+    if os.path.isdir(tokenizer_path):
+        for name in sorted(os.listdir(tokenizer_path)):
+            file_path = os.path.join(tokenizer_path, name)
+            if os.path.isfile(file_path):
+                digest.update(name.encode())
+                digest.update(file_sha256(file_path).encode())
+    digest.update(str(rules_version).encode())
+    if settings:
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Manifest of already-produced outputs, stored in the output directory.
+
+    Each entry is keyed by PDF name and records the PDF content hash, the
+    model/tokenizer/rules fingerprint and the output file. A document is
+    fresh only if all three still match, so changing the model invalidates
+    every entry produced with the old one. The file size and mtime are kept
+    too, so an untouched PDF is not re-read just to be hashed again; archive
+    members and stdin buffers have neither and are always hashed.
+    """
+
+    def __init__(self, output_dir, fingerprint, input_root=None):
+        self.output_dir = output_dir
+        self.manifest_path = os.path.join(output_dir, CACHE_MANIFEST_NAME)
+        self.fingerprint = fingerprint
+        # Entries are keyed by the path below input_root (just the file name without one)
+        self.input_root = input_root
+        self.entries = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable cache manifest {self.manifest_path}: {e}")
+
+    def _key(self, pdf_path):
+        return relative_pdf_path(pdf_path, self.input_root)
+
+    def _output_name(self, output_file):
+        return os.path.relpath(output_file, self.output_dir).replace(os.sep, "/")
+
+    def content_hash(self, pdf_path):
+        """Returns the PDF's SHA-256, reusing the stored one if size and mtime are unchanged."""
+        if isinstance(pdf_path, PdfInput):
+            return hashlib.sha256(pdf_path.read()).hexdigest()
+        stat = os.stat(pdf_path)
+        entry = self.entries.get(self._key(pdf_path))
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["content_hash"]
+        return file_sha256(pdf_path)
+
+    def is_fresh(self, pdf_path, content_hash, output_file):
+        entry = self.entries.get(self._key(pdf_path))
+        return bool(entry) and \
+            entry.get("content_hash") == content_hash and \
+            entry.get("fingerprint") == self.fingerprint and \
+            entry.get("output") == self._output_name(output_file) and \
+            os.path.exists(output_file)
+
+    def recorded_output(self, pdf_path):
+        """Returns the output file recorded for pdf_path (relative to the output directory), or None."""
+        entry = self.entries.get(self._key(pdf_path))
+        return entry.get("output") if entry else None
+
+    def record(self, pdf_path, content_hash, output_file):
+        entry = {
+            "content_hash": content_hash,
+            "fingerprint": self.fingerprint,
+            "output": self._output_name(output_file),
+        }
+        if not isinstance(pdf_path, PdfInput):
+            stat = os.stat(pdf_path)
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+        self.entries[self._key(pdf_path)] = entry
+
+    def save(self):
+        """Writes the manifest atomically (temp file + rename)."""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+        logger.debug(f"Cache manifest saved with {len(self.entries)} entries: {self.manifest_path}")
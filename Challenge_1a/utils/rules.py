@@ -0,0 +1,229 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\rules.py
+
+import hashlib
+import json
+import logging
+import os
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick # Optional: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Bump whenever the rule logic below changes, so results cached with the old
+# rules are invalidated. Changes to the phrase config are picked up through
+# RuleEngine.fingerprint automatically.
+RULES_VERSION = "2"
+
+DEFAULT_RULES_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+# Phrase groups matched as substrings of the normalized line text
+INVITATION = "invitation"
+TITLE_PRIORITY = "title_priority"
+TITLE_NOISE = "title_noise"
+TITLE_EXCLUDE = "title_exclude"
+
+ENUMERATORS = frozenset(['i', 'ii', 'iii', 'iv', 'v'])
+HEADING_LEVELS = frozenset(['H1', 'H2', 'H3', 'H4'])
+
+
+def normalize_text(text):
+    """Collapses whitespace and lower-cases, the form all phrase rules compare against."""
+    return " ".join(text.split()).lower()
+
+
+class PhraseMatcher:
+    """
+    Multi-pattern substring matcher (Aho-Corasick) over groups of phrases.
+
+    One scan of a text reports every group that has at least one phrase in
+    it, so the cost per line depends on the line length, not on how many
+    phrases are configured. Uses pyahocorasick when installed and a pure
+    Python automaton otherwise.
+    """
+
+    def __init__(self, phrases_by_group):
+        groups_by_phrase = {}
+        for group, phrases in phrases_by_group.items():
+            for phrase in phrases:
+                groups_by_phrase.setdefault(phrase, set()).add(group)
+
+        self._automaton = None
+        if ahocorasick is not None and groups_by_phrase:
+            self._automaton = ahocorasick.Automaton()
+            for phrase, groups in groups_by_phrase.items():
+                self._automaton.add_word(phrase, frozenset(groups))
+            self._automaton.make_automaton()
+        else:
+            self._build(groups_by_phrase)
+
+    def _build(self, groups_by_phrase):
+        self._goto = [{}]
+        self._outputs = [frozenset()]
+        for phrase, groups in groups_by_phrase.items():
+            node = 0
+            for char in phrase:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._outputs.append(frozenset())
+                node = next_node
+            self._outputs[node] = self._outputs[node] | groups
+
+        # Breadth-first pass to set failure links and inherit their outputs
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] | self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def groups_in(self, text):
+        """Returns the set of groups with a phrase occurring in text."""
+        found = set()
+        if self._automaton is not None:
+            for _, groups in self._automaton.iter(text):
+                found.update(groups)
+            return found
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+
+class RuleEngine:
+    """
+    All heading/title/outline post-processing rules, compiled once.
+
+    Phrase lists come from a JSON config (see rules.json); exact-match lists
+    become frozensets and substring lists are folded into a single
+    PhraseMatcher, so adding phrases does not add per-line scans.
+    """
+
+    def __init__(self, config, fingerprint=None):
+        self.heading_non_headings = frozenset(normalize_text(p) for p in config.get("heading_non_heading_phrases", []))
+        self.outline_non_headings = frozenset(config.get("outline_non_headings", []))
+        self.matcher = PhraseMatcher({
+            INVITATION: [normalize_text(p) for p in config.get("heading_invitation_phrases", [])],
+            TITLE_PRIORITY: [normalize_text(p) for p in config.get("title_priority_phrases", [])],
+            TITLE_NOISE: [normalize_text(p) for p in config.get("title_noise_words", [])],
+            TITLE_EXCLUDE: [normalize_text(p) for p in config.get("title_exclude_phrases", [])],
+        })
+        self.fingerprint = fingerprint or RULES_VERSION
+
+    @classmethod
+    def from_file(cls, config_path):
+        with open(config_path, "rb") as f:
+            raw = f.read()
+        fingerprint = f"{RULES_VERSION}-{hashlib.sha256(raw).hexdigest()[:16]}"
+        return cls(json.loads(raw.decode("utf-8")), fingerprint)
+
+    def phrase_groups(self, normalized_text):
+        return self.matcher.groups_in(normalized_text)
+
+    def heading_label(self, text, predicted_label):
+        """Applies the post-processing rules to one raw model label."""
+        text_stripped = text.strip()
+
+        if predicted_label == 'text':
+            return 'text'
+
+        # --- Enhanced Aggressive Post-processing Rules, especially for file05.pdf ---
+
+        # Rule 1: Demote if text is purely numeric or numeric with single dot/bracket
+        if len(text_stripped) <= 5 and (text_stripped.replace('.', '', 1).isdigit() or \
+                                       text_stripped.replace(')', '', 1).isdigit() or \
+                                       (text_stripped.startswith('(') and text_stripped.endswith(')') and text_stripped[1:-1].isdigit())):
+            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (purely numeric/short numbering)")
+            return 'text'
+        
+        # Rule 2: Demote very short, non-alphanumeric/non-sentence-like strings (e.g., "---", "###")
+        if len(text_stripped) < 3 and not any(char.isalnum() for char in text_stripped):
+             logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (very short non-alphanumeric)")
+             return 'text'
+
+        # Rule 3: Demote common column headers, generic single words, or specific phrases often misclassified
+        normalized_text = normalize_text(text_stripped)
+        if normalized_text in self.heading_non_headings:
+            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (exact match common non-heading phrase)")
+            return 'text'
+
+        # Check for single word classifications that are often mislabeled (retained)
+        words = text_stripped.split()
+        if len(words) == 1 and not text_stripped[0].isupper() and not text_stripped.isupper():
+            logger.debug(f"Demoting single word '{text_stripped}' ({predicted_label}) to 'text' (not capitalized/all-caps)")
+            return 'text'
+
+        # Rule 4: Demote if it's a very short line that starts with a lowercase letter (unlikely to be a main heading) (retained)
+        if len(text_stripped) < 15 and text_stripped and text_stripped[0].islower() and ' ' in text_stripped:
+            logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (short, starts lowercase, sentence-like)")
+            return 'text'
+            
+        # Rule 5: Catch multi-line sentences being broken into "headings" (retained)
+        if text_stripped and text_stripped[-1] in [',', ';', '-', '—'] and len(text_stripped) > 10:
+             logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (ends with punctuation, likely sentence fragment)")
+             return 'text'
+
+        # Rule 6: Specific rule for short, high-level classifications that are not typical headings. (retained)
+        if predicted_label in ['H1', 'H2'] and len(words) <= 5: 
+            if not (words[0].isdigit() or words[0].lower() in ENUMERATORS):
+                if INVITATION in self.phrase_groups(normalized_text):
+                    logger.debug(f"Demoting '{text_stripped}' ({predicted_label}) to 'text' (short H1/H2, invitation phrase)")
+                    return 'text'
+        
+        return predicted_label
+
+    def heading_labels(self, texts, predicted_labels):
+        """Applies heading_label over a whole document's lines in one pass."""
+        return [self.heading_label(text, label) for text, label in zip(texts, predicted_labels)]
+
+    def is_outline_noise(self, text):
+        """True if a heading-labelled line should be kept out of the outline."""
+        # Exclude specific patterns that are often misclassified as headings but are not desired in outline
+        if len(text) <= 3 and text.replace('.', '', 1).isdigit(): # "1.", "2.", "3."
+            return True
+        if len(text.split()) <= 1 and not text.isupper() and not text.istitle(): # Single non-capitalized words
+            return True
+        # Column headers and single words that don't look like real headings, at any level
+        if text in self.outline_non_headings:
+            return True
+        # Check for blank or almost blank "headings"
+        return not text or len(text) < 2
+
+
+_default_engine = None
+
+
+def configure_rules(config_path=None):
+    """Loads the rule engine used by default everywhere in this process."""
+    global _default_engine
+    _default_engine = RuleEngine.from_file(config_path or DEFAULT_RULES_CONFIG)
+    logger.debug(f"Rules loaded from {config_path or DEFAULT_RULES_CONFIG} ({_default_engine.fingerprint})")
+    return _default_engine
+
+
+def get_rule_engine():
+    """Returns the process-wide rule engine, compiling the default config on first use."""
+    if _default_engine is None:
+        configure_rules()
+    return _default_engine
@@ -0,0 +1,189 @@
+# In D:\CONNECTING_DOTS\Challenge_1a\utils\supervisor.py
+
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+try:
+    from utils.logger import setup_logger
+    logger = setup_logger()
+except ImportError:
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+# Sent by a worker once its initializer has run
+_READY = "ready"
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def resident_memory(pid):
+    """Resident set size of process pid in bytes, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn, initializer, initargs, task):
+    initializer(*initargs)
+    conn.send(_READY)
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            return
+        if item is None:
+            return
+        conn.send(task(item))
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "ready", "index", "started")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.index = None # Position of the item being worked on, None when idle
+        self.started = None
+
+
+class SupervisedPool:
+    """
+    Worker processes that are killed when a document takes too long or too much memory.
+
+    Like ProcessPoolExecutor, every worker runs initializer(*initargs) once
+    and then task(item) for each item it is given. Unlike it, the parent
+    watches each document: one that runs past timeout seconds, whose worker's
+    resident memory grows past max_memory bytes, or whose worker dies, gets
+    its worker killed and replaced and is reported as failed, while the other
+    workers carry on. Memory is sampled every poll_interval seconds and
+    includes whatever the initializer loaded (e.g. the model); it is only
+    enforced where /proc is available.
+    """
+
+    def __init__(self, workers, initializer, initargs=(), task=None, timeout=None, max_memory=None, poll_interval=0.1):
+        self.workers = max(1, workers)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.task = task
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.poll_interval = poll_interval
+        self.killed = 0
+        self._pool = []
+        if max_memory and resident_memory(os.getpid()) is None:
+            logger.warning("Cannot read process memory on this platform; the memory ceiling is not enforced.")
+            self.max_memory = None
+
+    def _start_worker(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_worker_main, daemon=True,
+                                          args=(child_conn, self.initializer, self.initargs, self.task))
+        process.start()
+        # Only the child holds its end now, so its death shows up as EOF here
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _kill(self, worker):
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+
+    def _check(self, worker, now):
+        """Returns why a busy worker must be killed, or None."""
+        elapsed = now - worker.started
+        if self.timeout and elapsed > self.timeout:
+            return f"DocumentTimeout: exceeded {self.timeout:g}s"
+        if self.max_memory:
+            rss = resident_memory(worker.process.pid)
+            if rss is not None and rss > self.max_memory:
+                return f"MemoryLimitExceeded: worker reached {rss / 2**20:.0f} MiB (limit {self.max_memory / 2**20:.0f} MiB)"
+        return None
+
+    def map(self, items):
+        """
+        Yields (item, result, failure, elapsed_s) for every item, in input order.
+
+        result is task(item) when failure is None; otherwise failure says why
+        the worker was killed and result is None.
+
+        Raises:
+            RuntimeError: If a worker dies before finishing its initializer.
+        """
+        items = list(items)
+        pending = iter(range(len(items)))
+        finished = {}
+        next_index = 0
+        self._pool = [self._start_worker() for _ in range(min(self.workers, len(items)))]
+
+        def fail(position, worker, reason):
+            self.killed += 1
+            finished[worker.index] = (None, reason, time.perf_counter() - worker.started)
+            self._kill(worker)
+            self._pool[position] = self._start_worker()
+
+        while next_index < len(items):
+            for worker in self._pool:
+                if worker.ready and worker.index is None:
+                    index = next(pending, None)
+                    if index is None:
+                        break
+                    worker.index, worker.started = index, time.perf_counter()
+                    worker.conn.send(items[index])
+
+            readable = wait([worker.conn for worker in self._pool], timeout=self.poll_interval)
+            for position, worker in enumerate(self._pool):
+                if worker.conn not in readable:
+                    continue
+                try:
+                    message = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join()
+                    if worker.index is None:
+                        raise RuntimeError(f"Worker {worker.process.pid} exited during initialization "
+                                           f"(exit code {worker.process.exitcode})")
+                    fail(position, worker, f"WorkerCrashed: exit code {worker.process.exitcode}")
+                    continue
+                if message == _READY:
+                    worker.ready = True
+                else:
+                    finished[worker.index] = (message, None, time.perf_counter() - worker.started)
+                    worker.index = None
+
+            now = time.perf_counter()
+            for position, worker in enumerate(self._pool):
+                if worker.index is not None:
+                    reason = self._check(worker, now)
+                    if reason is not None:
+                        fail(position, worker, reason)
+
+            while next_index in finished:
+                result, failure, elapsed = finished.pop(next_index)
+                yield items[next_index], result, failure, elapsed
+                next_index += 1
+
+    def shutdown(self, grace=5.0):
+        """Asks idle workers to exit (running their finalizers) and kills any that do not within grace seconds."""
+        for worker in self._pool:
+            if worker.index is None:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+        deadline = time.perf_counter() + grace
+        for worker in self._pool:
+            if worker.index is None:
+                worker.process.join(max(0.0, deadline - time.perf_counter()))
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        self._pool = []